@@ -261,6 +261,9 @@ class SaleOrder(models.Model):
             except Exception:
                 vals['name'] = self.env['ir.sequence'].next_by_code('sale.order') or _('New')
         orders = super().create(vals_list)
+        if self.env.context.get('defer_sale_payment_term_generation'):
+            # Bulk callers (e.g. order import) run generate_order_payment_term() once for all orders.
+            return orders
         for order in orders:
             if order.apply_payment_term_per_line:
                 order._update_order_line_payment_terms_from_values()
@@ -452,16 +455,19 @@ class SaleOrder(models.Model):
 
         return lines
 
-    def _create_payment_term_from_plan(self):
+    def _prepare_payment_term_from_plan(self):
         self.ensure_one()
         if self.pay_type == 'fixed' and self.installment_count < 1:
             return False
 
-        PaymentTerm = self.env['account.payment.term']
         term_vals = self._build_payment_term_vals()
-        term_preview = PaymentTerm.new(term_vals)
+        term_preview = self.env['account.payment.term'].new(term_vals)
         term_vals['name'] = term_preview._generate_auto_name() or _("Installments - %s") % self.name
-        return PaymentTerm.create(term_vals)
+        return term_vals
+
+    def _create_payment_term_from_plan(self):
+        term_vals = self._prepare_payment_term_from_plan()
+        return self.env['account.payment.term'].create(term_vals) if term_vals else False
 
     def action_open_order_payment_term(self):
         """Create/open the manual payment term used by irregular sale orders."""
@@ -493,21 +499,28 @@ class SaleOrder(models.Model):
         return action
 
     def generate_order_payment_term(self):
-        for order in self:
-            if not order.apply_payment_term_per_line:
-                if order.payment_type in ('immediate', 'regular'):
-                    term = order._create_payment_term_from_plan()
-                    if term:
-                        order.with_context(skip_auto_generate_sale_payment_term=True).write({
-                            'payment_term_id': term.id,
-                        })
-                    elif order.payment_type == 'regular':
-                        order.with_context(skip_auto_generate_sale_payment_term=True).write({
-                            'payment_term_id': False,
-                        })
-            if order.apply_payment_term_per_line:
-                order.order_line.filtered(lambda line: not line.display_type)._generate_line_payment_terms_from_values()
-            order._regenerate_installment_preview()
+        """Generate the terms and installment previews of all orders with one create per model."""
+        term_orders = []
+        term_vals_list = []
+        cleared = self.env['sale.order']
+        for order in self.filtered(
+            lambda item: not item.apply_payment_term_per_line and item.payment_type in ('immediate', 'regular')
+        ):
+            term_vals = order._prepare_payment_term_from_plan()
+            if term_vals:
+                term_orders.append(order)
+                term_vals_list.append(term_vals)
+            elif order.payment_type == 'regular':
+                cleared |= order
+        terms = self.env['account.payment.term'].create(term_vals_list)
+        for order, term in zip(term_orders, terms):
+            order.with_context(skip_auto_generate_sale_payment_term=True).write({'payment_term_id': term.id})
+        cleared.with_context(skip_auto_generate_sale_payment_term=True).write({'payment_term_id': False})
+
+        self.filtered('apply_payment_term_per_line').order_line.filtered(
+            lambda line: not line.display_type
+        )._generate_line_payment_terms_from_values()
+        self._regenerate_installment_preview()
         return True
 
     def _installment_preview_vals_for_memory(self, vals):
@@ -528,6 +541,8 @@ class SaleOrder(models.Model):
             return
         Installment = self.env['sale.order.installment']
         orders = self.with_context(regenerating_installment_preview=True)
+        stored_orders = orders.browse()
+        installments_vals = []
         for order in orders:
             date_ref = fields.Date.to_date(order.date_order) or fields.Date.today()
             if order.apply_payment_term_per_line:
@@ -559,9 +574,13 @@ class SaleOrder(models.Model):
                 order.installment_preview_ids = preview_commands
                 continue
 
-            order.installment_preview_ids.unlink()
-            if installments:
-                Installment.create(installments)
+            stored_orders |= order
+            installments_vals.extend(installments)
+
+        # One unlink and one create for all stored orders.
+        stored_orders.installment_preview_ids.unlink()
+        if installments_vals:
+            Installment.create(installments_vals)
 
     def _sync_order_lines_from_payment_terms(self):
         """Fill line installment columns from each line's payment term (custom per-lines)."""
@@ -885,6 +904,8 @@ class SaleOrderLine(models.Model):
         for vals in vals_list:
             self._sync_line_plan_values_from_term(vals)
         lines = super().create(vals_list)
+        if self.env.context.get('defer_sale_payment_term_generation'):
+            return lines
         lines_to_generate = lines.filtered(lambda line: generate_flags[lines.ids.index(line.id)])
         lines_to_generate._generate_line_payment_terms_from_values()
         return lines
@@ -1020,6 +1041,8 @@ class SaleOrderLine(models.Model):
 
     def _generate_line_payment_terms_from_values(self):
         PaymentTerm = self.env['account.payment.term']
+        term_lines = []
+        term_vals_list = []
         for line in self.filtered(
             lambda item: item.order_id.apply_payment_term_per_line and item._is_installment_product_line()
         ):
@@ -1048,7 +1071,10 @@ class SaleOrderLine(models.Model):
             ) % (line.name or line.order_id.name or _("Sale Order Line"))
             if base_term:
                 term_vals['name'] = _("%s - %s") % (base_term.name, line.name or _("Sale Order Line"))
-            term = PaymentTerm.create(term_vals)
+            term_lines.append(line)
+            term_vals_list.append(term_vals)
+        terms = PaymentTerm.create(term_vals_list)
+        for line, term in zip(term_lines, terms):
             line.with_context(skip_sale_line_payment_term_generation=True).payment_term_id = term
 
     @api.onchange('payment_term_id')
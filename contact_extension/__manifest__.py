@@ -1,18 +1,20 @@
 {
     "name": "Contact Extension",
     'sequence': 2,
-    "version": "18.0.1.0.9",
+    "version": "18.0.1.0.12",
     "summary": "",
     "license": "LGPL-3",
     "author": "Asmaa Hassaan",
-    "depends": ['base', 'contacts', 'account', 'sale'],
+    "depends": ['base', 'contacts', 'account', 'sale', 'frtz_base'],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron_data.xml",
         "views/contact_addresses_views.xml",
         "views/contact_base_info_views.xml",
         "views/customer_guarantees_view.xml",
         "views/sale_order_views.xml",
         "views/account_move_views.xml",
+        "views/res_partner_duplicate_views.xml",
     ],
 
     'installable': True,
@@ -1,4 +1,5 @@
 from . import dataset
+from . import contact_attachment
 
 
 
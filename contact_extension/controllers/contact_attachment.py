@@ -0,0 +1,34 @@
+from odoo import http, _
+from odoo.http import request
+
+
+class ContactAttachmentController(http.Controller):
+
+    @http.route('/contact_extension/attachment/<int:contact_attachment_id>/download', type='http', auth='user')
+    def download(self, contact_attachment_id, **kwargs):
+        """Stream a contact document from the filestore; Range requests are honoured"""
+        document = request.env['contact.attachment'].browse(contact_attachment_id).exists()
+        if not document or not document.attachment_id:
+            raise request.not_found()
+        document.check_access('read')
+        stream = request.env['ir.binary']._get_stream_from(
+            document.attachment_id, 'raw', filename=document.file_display_name,
+        )
+        return stream.get_response(as_attachment=True)
+
+    @http.route('/contact_extension/attachment/upload', type='http', auth='user', methods=['POST'])
+    def upload(self, partner_id, ufile, name=None, **kwargs):
+        """Create a contact document from a multipart upload, without base64 encoding the payload"""
+        partner = request.env['res.partner'].browse(int(partner_id)).exists()
+        if not partner:
+            raise request.not_found()
+        document = request.env['contact.attachment'].create({
+            'partner_id': partner.id,
+            'name': name or ufile.filename or _('Attachment'),
+        })
+        document._set_file(ufile.read(), ufile.filename)
+        return request.make_json_response({
+            'id': document.id,
+            'attachment_id': document.attachment_id.id,
+            'checksum': document.attachment_id.checksum,
+        })
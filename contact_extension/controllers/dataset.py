@@ -9,13 +9,96 @@ during routing evaluation before JSON data is fully parsed.
 """
 
 import logging
+import threading
+from collections import Counter
+
 from werkzeug.exceptions import NotFound
 
 from odoo import http
 from odoo.http import request
 
+try:
+    from odooenter.odoo.addons.web.controllers import dataset as web_dataset
+except ImportError:
+    from odoo.addons.web.controllers import dataset as web_dataset
+
 _logger = logging.getLogger(__name__)
 
+# (model, method) -> readonly, per database, valid for one registry sequence.
+_readonly_cache = {}
+# Readonly routing counters of this worker process, see call_kw_readonly_stats().
+_readonly_stats = Counter()
+_readonly_stats_lock = threading.Lock()
+READONLY_STATS_LOG_INTERVAL = 1000
+
+_original_get_json_data = http.Request.get_json_data
+
+
+def _cached_get_json_data(self):
+    """
+    Parse the JSON body once per request, so the readonly check and the
+    JSON-RPC dispatcher share the same parsed data.
+    """
+    try:
+        return self._cached_json_data
+    except AttributeError:
+        self._cached_json_data = _original_get_json_data(self)
+        return self._cached_json_data
+
+
+def _count(*keys):
+    with _readonly_stats_lock:
+        _readonly_stats.update(keys)
+        calls = _readonly_stats['calls']
+    if 'calls' in keys and calls % READONLY_STATS_LOG_INTERVAL == 0:
+        _logger.info("call_kw readonly routing: %s", dict(call_kw_readonly_stats()))
+
+
+def call_kw_readonly_stats():
+    """
+    Counters of this worker: calls, readonly / readwrite routing decisions,
+    cache hits / misses, and readonly_cursor, the calls that actually ran on
+    a readonly cursor.
+    """
+    with _readonly_stats_lock:
+        return Counter(_readonly_stats)
+
+
+def _resolve_method_readonly(model_class, method_name):
+    """The _readonly flag of the first method of the MRO that has one."""
+    for cls in model_class.mro():
+        method = getattr(cls, method_name, None)
+        if method is not None and hasattr(method, '_readonly'):
+            return method._readonly
+    return False
+
+
+def _is_method_readonly(registry, model_name, method_name):
+    """
+    Memoized _resolve_method_readonly. The cache of a database is dropped
+    when its registry sequence changes (module install, upgrade, ...).
+    Methods that do not exist are not cached, so the cache stays bounded.
+    """
+    try:
+        model_class = registry[model_name]
+    except KeyError as e:
+        _logger.debug("Model %s not found in registry", model_name)
+        raise NotFound() from e
+
+    sequence, cache = _readonly_cache.get(registry.db_name, (None, None))
+    if sequence != registry.registry_sequence:
+        cache = {}
+        _readonly_cache[registry.db_name] = (registry.registry_sequence, cache)
+    key = (model_name, method_name)
+    if key in cache:
+        _count('cache_hit')
+        return cache[key]
+    _count('cache_miss')
+    readonly = _resolve_method_readonly(model_class, method_name)
+    if getattr(model_class, method_name, None) is not None:
+        cache[key] = readonly
+    return readonly
+
 
 def _patched_call_kw_readonly(self):
     """
@@ -42,22 +125,12 @@ def _patched_call_kw_readonly(self):
             _logger.debug("Params missing 'model' or 'method', defaulting to readonly=False")
             return False
         
-        try:
-            model_class = request.registry[params['model']]
-        except KeyError as e:
-            _logger.debug("Model %s not found in registry", params['model'])
-            raise NotFound() from e
-        
-        method_name = params['method']
-        
-        # Check if method has _readonly attribute
-        for cls in model_class.mro():
-            method = getattr(cls, method_name, None)
-            if method is not None and hasattr(method, '_readonly'):
-                return method._readonly
-        
-        return False
+        readonly = _is_method_readonly(request.registry, params['model'], params['method'])
+        _count('readonly' if readonly else 'readwrite')
+        return readonly
         
+    except NotFound:
+        raise
     except (ValueError, AttributeError, TypeError) as e:
         # Handle cases where JSON parsing fails or request structure is unexpected
         _logger.debug("Error in _call_kw_readonly: %s, defaulting to readonly=False", str(e))
@@ -68,19 +141,27 @@ def _patched_call_kw_readonly(self):
         return False
 
 
+class DataSet(web_dataset.DataSet):
+
+    # The route keeps the readonly callable it was declared with, so it is
+    # redeclared here rather than relying on the class attribute patch alone.
+    @http.route(readonly=_patched_call_kw_readonly)
+    def call_kw(self, model, method, args, kwargs, path=None):
+        if getattr(request.env.cr, 'readonly', False):
+            _count('calls', 'readonly_cursor')
+        else:
+            _count('calls')
+        return super().call_kw(model, method, args, kwargs, path=path)
+
+
 # Patch the DataSet controller when this module is loaded
 def _patch_dataset_controller():
     """Patch the DataSet._call_kw_readonly method to handle missing params"""
     try:
-        # Try to import from enterprise web module first
-        try:
-            from odooenter.odoo.addons.web.controllers import dataset as web_dataset
-        except ImportError:
-            # Fallback to standard web module
-            from odoo.addons.web.controllers import dataset as web_dataset
-        
         # Replace the method with our patched version
         web_dataset.DataSet._call_kw_readonly = _patched_call_kw_readonly
+        # Parse JSON bodies once per request
+        http.Request.get_json_data = _cached_get_json_data
         _logger.info("Successfully patched DataSet._call_kw_readonly to fix KeyError: 'params'")
     except Exception as e:
         _logger.warning("Failed to patch DataSet._call_kw_readonly: %s", str(e))
@@ -0,0 +1,22 @@
+"""Fill the partner search key in SQL so the ORM does not recompute it row by row."""
+
+from odoo.addons.contact_extension.models.res_partner import (
+    SEARCH_KEY_DELETE,
+    SEARCH_KEY_FIELDS,
+    SEARCH_KEY_FROM,
+    SEARCH_KEY_TO,
+)
+
+
+def migrate(cr, version):
+    cr.execute("ALTER TABLE res_partner ADD COLUMN IF NOT EXISTS search_key VARCHAR")
+    cr.execute(
+        f"""
+        UPDATE res_partner
+        SET search_key = NULLIF(lower(btrim(regexp_replace(
+            translate(concat_ws(' ', {', '.join(SEARCH_KEY_FIELDS)}), %s, %s),
+            '\\s+', ' ', 'g'
+        ))), '')
+        """,
+        (SEARCH_KEY_FROM + SEARCH_KEY_DELETE, SEARCH_KEY_TO),
+    )
@@ -0,0 +1,21 @@
+"""
+Create the duplicate blocking key columns up front so the ORM does not compute
+them for every partner on update; the duplicate scan cron backfills them in
+chunks, starting from its keys phase.
+"""
+import json
+
+DUPLICATE_SCAN_PARAM = 'contact_extension.duplicate_scan_state'
+
+
+def migrate(cr, version):
+    for column in ('dedup_name_keys', 'dedup_name_block', 'dedup_birth_block', 'dedup_phone_block'):
+        cr.execute(f"ALTER TABLE res_partner ADD COLUMN IF NOT EXISTS {column} VARCHAR")
+    cr.execute(
+        """
+        INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date)
+        VALUES (%s, %s, 1, now() AT TIME ZONE 'UTC', 1, now() AT TIME ZONE 'UTC')
+        ON CONFLICT (key) DO NOTHING
+        """,
+        [DUPLICATE_SCAN_PARAM, json.dumps({'phase': 'keys', 'last_id': 0})],
+    )
@@ -0,0 +1,32 @@
+"""Store the guarantees count of orders and invoices with one grouped update per table."""
+
+GUARANTEE_PARENTS = (
+    ('sale_order', 'sale_order_id', 'sale_order_customer_guarantees_rel', 'sale_order_id'),
+    ('account_move', 'account_move_id', 'account_move_customer_guarantees_rel', 'account_move_id'),
+)
+
+
+def migrate(cr, version):
+    for table, guarantee_column, rel_table, rel_column in GUARANTEE_PARENTS:
+        cr.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS guarantees_count INTEGER")
+        cr.execute(
+            f"""
+            UPDATE {table} t
+            SET guarantees_count = c.count
+            FROM (
+                SELECT COALESCE(l.id, r.id) AS id, COALESCE(l.count, r.count) AS count
+                FROM (
+                    SELECT {guarantee_column} AS id, count(*) AS count
+                    FROM customer_guarantees
+                    WHERE {guarantee_column} IS NOT NULL
+                    GROUP BY 1
+                ) l
+                FULL JOIN (
+                    SELECT {rel_column} AS id, count(*) AS count
+                    FROM {rel_table}
+                    GROUP BY 1
+                ) r ON r.id = l.id
+            ) c
+            WHERE t.id = c.id
+            """
+        )
@@ -8,3 +8,4 @@ from . import customer_guarantees
 from . import account_move
 from . import sale_order
 
+from . import res_partner_duplicate
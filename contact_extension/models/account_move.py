@@ -1,4 +1,4 @@
-from odoo import api, fields, models, Command
+from odoo import api, fields, models
 
 
 class AccountMove(models.Model):
@@ -22,17 +22,17 @@ class AccountMove(models.Model):
     guarantees_count = fields.Integer(
         string='Guarantees Count',
         compute='_compute_guarantees_count',
+        store=True,
     )
 
     @api.depends('customer_guarantees_list_ids', 'customer_guarantees_ids')
     def _compute_guarantees_count(self):
+        counts = self.env['customer.guarantees']._get_guarantees_counts(self)
         for move in self:
-            move.guarantees_count = len(
-                move.customer_guarantees_list_ids or move.customer_guarantees_ids
-            )
+            if move.id in counts:
+                move.guarantees_count = counts[move.id]
+            else:
+                move.guarantees_count = len(move.customer_guarantees_list_ids or move.customer_guarantees_ids)
 
     def _sync_guarantees_many2many_from_list(self):
-        for move in self:
-            move.customer_guarantees_ids = [
-                Command.set(move.customer_guarantees_list_ids.mapped('customer_id').ids)
-            ]
+        self.env['customer.guarantees']._sync_guarantee_parents(self)
@@ -1,3 +1,5 @@
+import base64
+
 from odoo import fields, models, api
 
 
@@ -38,10 +40,11 @@ class ContactAttachment(models.Model):
     def _compute_file_display_name(self):
         """Return the appropriate filename for display"""
         for record in self:
-            if record.attachment_id and record.attachment_id.name:
-                record.file_display_name = record.attachment_id.name
-            elif record.filename:
+            # Prefer the document's own filename over the attachment name
+            if record.filename:
                 record.file_display_name = record.filename
+            elif record.attachment_id and record.attachment_id.name:
+                record.file_display_name = record.attachment_id.name
             else:
                 record.file_display_name = record.name or 'Attachment'
 
@@ -69,58 +72,70 @@ class ContactAttachment(models.Model):
         # This ensures partner_id is properly set
         pass
 
+    @api.model
+    def _create_attachment(self, raw, name, partner):
+        """
+        Return a new ir.attachment of `partner` holding `raw`, written from the
+        raw bytes without a base64 round-trip. Every document gets its own
+        attachment, owned by its partner; the filestore is addressed by
+        checksum, so a file other contacts already hold is not written again
+        and their attachments share the same stored blob.
+        """
+        return self.env['ir.attachment'].create({
+            'name': name,
+            'type': 'binary',
+            'raw': raw,
+            'res_model': 'res.partner',
+            'res_id': partner.id,
+        })
+
+    def _set_file(self, raw, filename=False):
+        """Attach the raw file content to these documents, dropping the attachments they replace"""
+        for record in self:
+            previous = record.attachment_id
+            attachment = self._create_attachment(raw, filename or record.name or 'Attachment', record.partner_id)
+            record.write({'attachment_id': attachment.id, 'filename': filename or record.filename})
+            if previous and not self.search_count([('attachment_id', '=', previous.id)]):
+                previous.unlink()
+
+    def action_download(self):
+        """Download the file through the streaming route instead of loading it in the client"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/contact_extension/attachment/{self.id}/download',
+            'target': 'self',
+        }
+
     def write(self, vals):
         """Handle file upload on write"""
         # Store file data temporarily
         file_data = vals.pop('file', False)
         filename = vals.pop('filename', False)
+        if filename and not file_data:
+            vals['filename'] = filename
 
         # Write other fields first
         result = super().write(vals)
 
-        # If file was uploaded, create or update attachment
+        # If file was uploaded, attach it to the documents
         if file_data:
-            partner_id = self.partner_id.id if self.partner_id else False
-            attachment_name = filename or self.name or 'Attachment'
-
-            # If there's an existing attachment, update it; otherwise create a new one
-            if self.attachment_id:
-                self.attachment_id.write({
-                    'name': attachment_name,
-                    'datas': file_data,
-                })
-            else:
-                attachment = self.env['ir.attachment'].create({
-                    'name': attachment_name,
-                    'type': 'binary',
-                    'datas': file_data,
-                    'res_model': 'res.partner',
-                    'res_id': partner_id,
-                })
-                self.attachment_id = attachment.id
+            self._set_file(base64.b64decode(file_data), filename)
 
         return result
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Handle file upload on create"""
         # Store file data temporarily
-        file_data = vals.pop('file', False)
-        filename = vals.pop('filename', False)
-
-        # Create the record first to get the partner_id
-        record = super().create(vals)
+        files = [(vals.pop('file', False), vals.get('filename')) for vals in vals_list]
 
-        # If file was uploaded, create attachment now that we have partner_id
-        if file_data:
-            attachment = self.env['ir.attachment'].create({
-                'name': filename or record.name or 'Attachment',
-                'type': 'binary',
-                'datas': file_data,
-                'res_model': 'res.partner',
-                'res_id': record.partner_id.id if record.partner_id else False,
-            })
-            record.attachment_id = attachment.id
+        # Create the records first to get the partner_id
+        records = super().create(vals_list)
 
-        return record
+        # If a file was uploaded, attach it now that we have partner_id
+        for record, (file_data, filename) in zip(records, files):
+            if file_data:
+                record._set_file(base64.b64decode(file_data), filename)
 
+        return records
@@ -1,5 +1,15 @@
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+# Parent document model -> guarantee field linking to it.
+GUARANTEE_PARENT_FIELDS = {
+    'sale.order': 'sale_order_id',
+    'account.move': 'account_move_id',
+}
+GUARANTEE_SYNC_KEY = 'contact_extension.guarantee_sync'
 
 
 class CustomerGuarantees(models.Model):
@@ -58,20 +68,126 @@ class CustomerGuarantees(models.Model):
         return records
 
     def write(self, vals):
+        parent_fields = {'customer_id', 'sale_order_id', 'account_move_id'} & set(vals)
+        if parent_fields:
+            # Parents the guarantees leave must be synchronized as well.
+            self.with_context(defer_guarantee_sync=True)._queue_guarantee_sync(
+                self.sale_order_id, self.account_move_id,
+            )
         result = super().write(vals)
-        if {'customer_id', 'sale_order_id', 'account_move_id'} & set(vals):
+        if parent_fields:
             self._sync_parent_guarantees_many2many()
         return result
 
     def unlink(self):
-        parents = self.mapped('sale_order_id') | self.mapped('account_move_id')
+        orders, moves = self.sale_order_id, self.account_move_id
         result = super().unlink()
-        parents._sync_guarantees_many2many_from_list()
+        self._queue_guarantee_sync(orders, moves)
         return result
 
     def _sync_parent_guarantees_many2many(self):
-        self.mapped('sale_order_id')._sync_guarantees_many2many_from_list()
-        self.mapped('account_move_id')._sync_guarantees_many2many_from_list()
+        self._queue_guarantee_sync(self.sale_order_id, self.account_move_id)
+
+    # ------------------------------------------------------------------
+    # Parent synchronization
+    # ------------------------------------------------------------------
+    @api.model
+    def _queue_guarantee_sync(self, *parents_list):
+        """
+        Record sale orders / invoices whose guarantors must be synchronized from
+        their guarantee lines. The queue lives for the transaction: it is applied
+        right away unless `defer_guarantee_sync` is in the context, in which case
+        the caller applies it (or it is applied before commit).
+        """
+        cr = self.env.cr
+        for parents in parents_list:
+            if not parents:
+                continue
+            pending = cr.precommit.data.get(GUARANTEE_SYNC_KEY)
+            if pending is None:
+                pending = cr.precommit.data[GUARANTEE_SYNC_KEY] = defaultdict(set)
+                cr.precommit.add(self.sudo()._apply_guarantee_sync)
+            pending[parents._name].update(parents._origin.ids)
+        if not self.env.context.get('defer_guarantee_sync'):
+            self._apply_guarantee_sync()
+
+    @api.model
+    def _apply_guarantee_sync(self):
+        """Synchronize every queued parent once"""
+        pending = self.env.cr.precommit.data.get(GUARANTEE_SYNC_KEY)
+        while pending:
+            model_name, parent_ids = pending.popitem()
+            self._sync_guarantee_parents(self.env[model_name].browse(parent_ids).exists())
+
+    @api.model
+    def _sync_guarantee_parents(self, parents):
+        """
+        Make the guarantors many2many of the parents match the customers of
+        their guarantee lines with two set-difference statements, then
+        recompute the stored counts.
+        """
+        if not parents:
+            return
+        field_name = GUARANTEE_PARENT_FIELDS[parents._name]
+        relation = parents._fields['customer_guarantees_ids']
+        self.flush_model([field_name, 'customer_id'])
+        parents.flush_recordset(['customer_guarantees_ids'])
+        rel_table = SQL.identifier(relation.relation)
+        rel_parent = SQL.identifier(relation.column1)
+        rel_partner = SQL.identifier(relation.column2)
+        parent_column = SQL.identifier(field_name)
+        cr = self.env.cr
+        cr.execute(SQL(
+            """
+            DELETE FROM %(rel)s r
+            WHERE r.%(rel_parent)s = ANY(%(ids)s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM customer_guarantees g
+                  WHERE g.%(parent)s = r.%(rel_parent)s AND g.customer_id = r.%(rel_partner)s
+              )
+            """,
+            rel=rel_table, rel_parent=rel_parent, rel_partner=rel_partner, parent=parent_column, ids=parents.ids,
+        ))
+        cr.execute(SQL(
+            """
+            INSERT INTO %(rel)s (%(rel_parent)s, %(rel_partner)s)
+            SELECT DISTINCT g.%(parent)s, g.customer_id
+            FROM customer_guarantees g
+            WHERE g.%(parent)s = ANY(%(ids)s)
+            ON CONFLICT DO NOTHING
+            """,
+            rel=rel_table, rel_parent=rel_parent, rel_partner=rel_partner, parent=parent_column, ids=parents.ids,
+        ))
+        parents.invalidate_recordset(['customer_guarantees_ids'])
+        self.env.add_to_compute(parents._fields['guarantees_count'], parents)
+
+    @api.model
+    def _get_guarantees_counts(self, parents):
+        """
+        Guarantees count of the saved parents with one grouped query per
+        source: the guarantee lines, else the guarantors many2many.
+        """
+        parents = parents.filtered(lambda parent: not isinstance(parent.id, models.NewId))
+        if not parents:
+            return {}
+        field_name = GUARANTEE_PARENT_FIELDS[parents._name]
+        relation = parents._fields['customer_guarantees_ids']
+        line_counts = {
+            parent.id: count
+            for parent, count in self.sudo()._read_group([(field_name, 'in', parents.ids)], [field_name], ['__count'])
+        }
+        parents.flush_recordset(['customer_guarantees_ids'])
+        self.env.cr.execute(SQL(
+            "SELECT %(column)s, count(*) FROM %(rel)s WHERE %(column)s = ANY(%(ids)s) GROUP BY 1",
+            column=SQL.identifier(relation.column1),
+            rel=SQL.identifier(relation.relation),
+            ids=parents.ids,
+        ))
+        relation_counts = dict(self.env.cr.fetchall())
+        return {
+            parent_id: line_counts.get(parent_id) or relation_counts.get(parent_id, 0)
+            for parent_id in parents.ids
+        }
 
     @api.onchange('customer_id')
     def _onchange_customer_id(self):
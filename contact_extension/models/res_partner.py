@@ -1,8 +1,35 @@
-from odoo import fields, models, api
+import logging
+
+import psycopg2
+
+from odoo import fields, models, api, tools
+from odoo.osv import expression
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Arabic spelling variants folded together in the partner search key:
+# alef forms -> alef, alef maksura / farsi yeh -> yeh, teh marbuta -> heh,
+# Arabic-Indic and extended Arabic-Indic digits -> ASCII digits.
+SEARCH_KEY_FROM = 'أإآٱىیة٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹'
+SEARCH_KEY_TO = 'ااااييه01234567890123456789'
+# Tashkeel, superscript alef and tatweel are dropped.
+SEARCH_KEY_DELETE = '\u064b\u064c\u064d\u064e\u064f\u0650\u0651\u0652\u0670\u0640'
+_SEARCH_KEY_TABLE = str.maketrans(SEARCH_KEY_FROM, SEARCH_KEY_TO, SEARCH_KEY_DELETE)
+SEARCH_KEY_FIELDS = ('ref', 'name', 'first_name', 'father_name', 'gfather_name', 'sur_name')
+
+
+def normalize_search_key(value):
+    """Fold Arabic variants, digits, case and spacing of a partner search string."""
+    if not value:
+        return ''
+    return ' '.join(value.translate(_SEARCH_KEY_TABLE).split()).lower()
 
 
 class ResPartner(models.Model):
-    _inherit = "res.partner"
+    _inherit = ["res.partner", "deferred.recompute.mixin"]
+    _deferred_recompute_cron = 'contact_extension.ir_cron_recompute_partner_deferred'
+    _deferred_recompute_param = 'contact_extension.recompute_defer_threshold'
 
     uid = fields.Char(string="UID")
     use_name_parts = fields.Boolean(string="Use Name Details", default=False,
@@ -24,6 +51,13 @@ class ResPartner(models.Model):
         compute='_compute_display_name',
         store=True
     )
+    search_key = fields.Char(
+        string='Search Key',
+        compute='_compute_search_key',
+        store=True,
+        copy=False,
+        help="Normalized reference, name and name parts used by the partner autocomplete.",
+    )
     division_ids = fields.One2many("contact.division", "partner_id", string="Divisions")
     divisions = fields.Many2one(
         "contact.division",
@@ -43,6 +77,22 @@ class ResPartner(models.Model):
         copy=False
     )
 
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        self._init_recompute_pending_index()
+        try:
+            with cr.savepoint(flush=False):
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except psycopg2.Error as e:
+            _logger.warning(f"pg_trgm is not available, partner search runs without trigram indexes: {str(e)}")
+            return
+        for column in ('name', 'ref', 'search_key'):
+            tools.create_index(
+                cr, f'res_partner_{column}_trgm_index', self._table,
+                [f'{column} gin_trgm_ops'], method='gin',
+            )
+
     @api.model
     def create(self, vals):
         partner = super().create(vals)
@@ -70,6 +120,16 @@ class ResPartner(models.Model):
                 name = f"{partner.ref} {name}"
             partner.display_name = name
 
+    @api.depends(*SEARCH_KEY_FIELDS)
+    def _compute_search_key(self):
+        for partner in self:
+            partner.search_key = normalize_search_key(
+                ' '.join(partner[field] for field in SEARCH_KEY_FIELDS if partner[field])
+            ) or False
+
+    def _get_deferred_recompute_fields(self):
+        return super()._get_deferred_recompute_fields() + ['display_name', 'search_key']
+
     @api.onchange('use_name_parts')
     def _onchange_use_name_parts(self):
         """Handle checkbox change - clear name parts if unchecked"""
@@ -205,6 +265,8 @@ class ResPartner(models.Model):
                         del vals['name']
         
         result = super().write(vals)
+        if self._should_defer_recompute():
+            self._defer_recompute()
         
         # Also clear name parts for records where use_name_parts is False
         for record in self:
@@ -219,22 +281,30 @@ class ResPartner(models.Model):
         
         return result
 
-    def name_get(self):
-        """Override name_get to use display_name"""
-        result = []
-        for partner in self:
-            result.append((partner.id, partner.display_name or partner.name))
-        return result
-
     @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
         """
-        Override name_search to include ref in search
+        Match the reference, name and name parts through the normalized search
+        key; exact reference hits come first, then prefix and trigram similarity.
         """
-        args = args or []
-        domain = []
-        if name:
-            domain = ['|', ('name', 'ilike', name), ('ref', 'ilike', name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
+        search_key = normalize_search_key(name)
+        if operator != 'ilike' or not search_key:
+            return super()._name_search(name, domain, operator, limit=limit, order=order)
 
+        ref = name.strip()
+        match_domain = expression.OR([
+            [('ref', '=', ref)],
+            [('search_key', 'like', token) for token in search_key.split()],
+        ])
+        query = self._search(expression.AND([domain or [], match_domain]))
+        table = query.table
+        ranking = [
+            SQL("%s = %s DESC NULLS LAST", SQL.identifier(table, 'ref'), ref),
+            SQL("%s LIKE %s DESC NULLS LAST", SQL.identifier(table, 'search_key'), f'{search_key}%'),
+        ]
+        if self.env.registry.has_trigram:
+            ranking.append(SQL("similarity(%s, %s) DESC NULLS LAST", SQL.identifier(table, 'search_key'), search_key))
+        ranking.append(SQL.identifier(table, 'id'))
+        query.order = SQL(", ").join(ranking)
+        query.limit = limit
+        return query
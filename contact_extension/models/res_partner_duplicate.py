@@ -0,0 +1,402 @@
+import json
+import logging
+import re
+
+from odoo import fields, models, api, tools, _
+from odoo.tools import SQL
+
+from .res_partner import normalize_search_key
+
+_logger = logging.getLogger(__name__)
+
+# Letters that sound alike are folded to one letter; weak letters are dropped
+# after the first position and repeated letters collapsed.
+_PHONETIC_TABLE = str.maketrans({
+    'ث': 'س', 'ص': 'س',
+    'ذ': 'ز', 'ظ': 'ز',
+    'ض': 'د',
+    'ط': 'ت',
+    'ق': 'ك',
+    'ح': 'ه',
+    'ع': 'ا', 'ء': 'ا',
+    'ؤ': 'و', 'ئ': 'ي',
+    'غ': 'خ',
+    'p': 'b', 'v': 'f', 'q': 'k', 'z': 's',
+})
+_WEAK_LETTERS = set('اويaeiouy')
+# Compound names written with or without a space ("عبد الله" / "عبدالله").
+_COMPOUND_PREFIX = re.compile(r'\b(عبد|ابو|abd|abu|abdel|abdul) ')
+_NON_DIGITS = re.compile(r'\D')
+
+# Weights of first, father, grandfather and surname in the duplicate score.
+NAME_PART_WEIGHTS = (0.3, 0.25, 0.15, 0.2)
+# A pair is only scored when name parts worth at least this much are known on both sides.
+MIN_COMPARED_WEIGHT = 0.45
+DUPLICATE_SCORE_THRESHOLD = 0.8
+# Candidates taken per partner and block; bounds the work on very common names.
+DUPLICATE_BLOCK_CAP = 50
+DUPLICATE_SCAN_CHUNK = 5000
+DUPLICATE_BLOCK_FIELDS = ('dedup_name_block', 'dedup_birth_block', 'dedup_phone_block')
+DUPLICATE_KEY_FIELDS = ('dedup_name_keys',) + DUPLICATE_BLOCK_FIELDS
+# Partner fields the blocking keys are computed from.
+DUPLICATE_KEY_DEPENDS = ('name', 'first_name', 'father_name', 'gfather_name', 'sur_name', 'birth_date', 'phone', 'mobile')
+DUPLICATE_SCAN_PARAM = 'contact_extension.duplicate_scan_state'
+
+
+def phonetic_key(token):
+    """Phonetic key of one normalized name token."""
+    if token.startswith('ال') and len(token) > 3:
+        token = token[2:]
+    token = token.translate(_PHONETIC_TABLE)
+    key = token[:1]
+    for char in token[1:]:
+        if char in _WEAK_LETTERS or char == key[-1]:
+            continue
+        key += char
+    return key
+
+
+def split_name_parts(first_name, father_name, gfather_name, sur_name, name):
+    """Normalized (first, father, grandfather, surname), from the name parts or else the full name."""
+    parts = [first_name, father_name, gfather_name, sur_name]
+    if any(parts):
+        return [_COMPOUND_PREFIX.sub(r'\1', normalize_search_key(part)).replace(' ', '') for part in parts]
+    tokens = _COMPOUND_PREFIX.sub(r'\1', normalize_search_key(name)).split()
+    if not tokens:
+        return ['', '', '', '']
+    middle = tokens[1:-1]
+    return [
+        tokens[0],
+        middle[0] if middle else '',
+        middle[1] if len(middle) > 1 else '',
+        tokens[-1] if len(tokens) > 1 else '',
+    ]
+
+
+def phone_key(*numbers):
+    """Last nine digits of the first usable number, Arabic-Indic digits included."""
+    for number in numbers:
+        digits = _NON_DIGITS.sub('', normalize_search_key(number))
+        if len(digits) >= 7:
+            return digits[-9:]
+    return False
+
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    dedup_name_keys = fields.Char(
+        string='Duplicate Name Keys',
+        compute='_compute_dedup_keys',
+        store=True,
+        copy=False,
+        help="Phonetic keys of first, father, grandfather and surname, used to score duplicates.",
+    )
+    dedup_name_block = fields.Char(compute='_compute_dedup_keys', store=True, copy=False, index='btree_not_null')
+    dedup_birth_block = fields.Char(compute='_compute_dedup_keys', store=True, copy=False, index='btree_not_null')
+    dedup_phone_block = fields.Char(compute='_compute_dedup_keys', store=True, copy=False, index='btree_not_null')
+    dedup_pending = fields.Boolean(
+        string='Duplicate Check Pending',
+        copy=False,
+        readonly=True,
+        help="The name, birth date or phone changed since the last duplicate check.",
+    )
+
+    def init(self):
+        super().init()
+        tools.create_index(
+            self.env.cr, 'res_partner_dedup_pending_index', self._table, ['id'], where='dedup_pending',
+        )
+
+    @api.depends(*DUPLICATE_KEY_DEPENDS)
+    def _compute_dedup_keys(self):
+        """Blocking keys: (first, father, grandfather), (first, surname, birth date) and the phone number"""
+        for partner in self:
+            keys = [
+                phonetic_key(part) for part in split_name_parts(
+                    partner.first_name, partner.father_name, partner.gfather_name, partner.sur_name, partner.name,
+                )
+            ]
+            first, father, gfather, sur = keys
+            partner.dedup_name_keys = ' '.join(key or '_' for key in keys) if any(keys) else False
+            partner.dedup_name_block = f'{first}|{father}|{gfather}' if first and father else False
+            partner.dedup_birth_block = (
+                f'{first}|{sur}|{partner.birth_date.isoformat()}' if first and sur and partner.birth_date else False
+            )
+            partner.dedup_phone_block = phone_key(partner.mobile, partner.phone)
+
+    def _get_deferred_recompute_fields(self):
+        return super()._get_deferred_recompute_fields() + list(DUPLICATE_KEY_FIELDS)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partners = super().create(vals_list)
+        if not self.env.context.get('skip_duplicate_check'):
+            partners._detect_duplicates(detected_by='create')
+        return partners
+
+    def write(self, vals):
+        res = super().write(vals)
+        if not set(DUPLICATE_KEY_DEPENDS).isdisjoint(vals):
+            self._mark_duplicate_check_pending()
+        return res
+
+    def _mark_duplicate_check_pending(self):
+        """Queue these partners for the next incremental duplicate check"""
+        if not self.ids:
+            return
+        self.env.cr.execute(
+            "UPDATE res_partner SET dedup_pending = true WHERE id = ANY(%s) AND dedup_pending IS NOT TRUE",
+            [self.ids],
+        )
+        self.invalidate_recordset(['dedup_pending'])
+
+    def _clear_duplicate_check_pending(self):
+        if not self.ids:
+            return
+        self.env.cr.execute(
+            "UPDATE res_partner SET dedup_pending = false WHERE id = ANY(%s) AND dedup_pending",
+            [self.ids],
+        )
+        self.invalidate_recordset(['dedup_pending'])
+
+    def _find_duplicate_candidates(self, forward=False):
+        """
+        Candidate pairs sharing a blocking key with these partners, at most
+        DUPLICATE_BLOCK_CAP per partner and block. With `forward`, only partners
+        with a higher id are paired, so a full scan sees every pair once.
+        """
+        self.flush_model(DUPLICATE_KEY_FIELDS + ('active', 'commercial_partner_id'))
+        pairs = set()
+        for column in DUPLICATE_BLOCK_FIELDS:
+            self.env.cr.execute(SQL(
+                """
+                SELECT a.id, b.id
+                FROM res_partner a
+                CROSS JOIN LATERAL (
+                    SELECT c.id
+                    FROM res_partner c
+                    WHERE c.%(column)s = a.%(column)s
+                      AND c.id != a.id
+                      AND c.active
+                      AND c.commercial_partner_id IS DISTINCT FROM a.commercial_partner_id
+                      AND (NOT %(forward)s OR c.id > a.id)
+                    ORDER BY c.id
+                    LIMIT %(cap)s
+                ) b
+                WHERE a.id = ANY(%(ids)s) AND a.%(column)s IS NOT NULL
+                """,
+                column=SQL.identifier(column),
+                forward=forward,
+                cap=DUPLICATE_BLOCK_CAP,
+                ids=self.ids,
+            ))
+            pairs.update((min(a, b), max(a, b)) for a, b in self.env.cr.fetchall())
+        return pairs
+
+    @api.model
+    def _score_duplicate_pairs(self, pairs):
+        """Score candidate pairs with one read of every partner involved; returns [(a, b, score, reasons)]"""
+        partner_ids = {partner_id for pair in pairs for partner_id in pair}
+        partners = self.with_context(active_test=False).browse(partner_ids)
+        partners.fetch(['dedup_name_keys', 'dedup_phone_block', 'birth_date'])
+        data = {partner.id: partner for partner in partners}
+        threshold = float(self.env['ir.config_parameter'].sudo().get_param(
+            'contact_extension.duplicate_score_threshold', DUPLICATE_SCORE_THRESHOLD,
+        ))
+        results = []
+        for a, b in pairs:
+            first, second = data[a], data[b]
+            keys_a = (first.dedup_name_keys or '').split()
+            keys_b = (second.dedup_name_keys or '').split()
+            compared = matched = 0.0
+            reasons = []
+            for label, weight, key_a, key_b in zip(
+                (_('first name'), _('father name'), _('grandfather name'), _('surname')),
+                NAME_PART_WEIGHTS, keys_a, keys_b,
+            ):
+                if key_a == '_' or key_b == '_':
+                    continue
+                compared += weight
+                if key_a == key_b:
+                    matched += weight
+                    reasons.append(label)
+            if compared < MIN_COMPARED_WEIGHT:
+                continue
+            score = matched / compared
+            if first.birth_date and second.birth_date:
+                if first.birth_date == second.birth_date:
+                    score += 0.1
+                    reasons.append(_('birth date'))
+                else:
+                    score -= 0.3
+            if first.dedup_phone_block and first.dedup_phone_block == second.dedup_phone_block:
+                score += 0.1
+                reasons.append(_('phone'))
+            score = max(0.0, min(1.0, score))
+            if score >= threshold:
+                results.append((a, b, score, ', '.join(reasons)))
+        return results
+
+    def _detect_duplicates(self, detected_by='scan', forward=False):
+        """Generate candidate pairs by block, score them and queue the likely duplicates for review"""
+        pairs = self._find_duplicate_candidates(forward=forward)
+        if not pairs:
+            return 0
+        scored = self._score_duplicate_pairs(pairs)
+        return self.env['res.partner.duplicate']._queue(scored, detected_by)
+
+    # ------------------------------------------------------------------
+    # Full scan (chunked cron)
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_duplicate_scan_state(self):
+        value = self.env['ir.config_parameter'].sudo().get_param(DUPLICATE_SCAN_PARAM)
+        # Until a first scan ran, the blocking keys of existing partners are empty
+        return json.loads(value) if value else {'phase': 'keys', 'last_id': 0}
+
+    @api.model
+    def _set_duplicate_scan_state(self, phase, last_id):
+        self.env['ir.config_parameter'].sudo().set_param(
+            DUPLICATE_SCAN_PARAM, json.dumps({'phase': phase, 'last_id': last_id}),
+        )
+
+    @api.model
+    def action_start_duplicate_scan(self):
+        """Restart the full scan: backfill the blocking keys, then pair every block"""
+        self._set_duplicate_scan_state('keys', 0)
+        cron = self.env.ref('contact_extension.ir_cron_partner_duplicate_scan', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return True
+
+    @api.model
+    def _cron_scan_duplicates(self, chunk_size=DUPLICATE_SCAN_CHUNK):
+        """
+        Process one chunk of partners of the current scan phase and report the
+        progress to the cron; once the full scan is done, re-check the
+        partners whose name, birth date or phone changed since their last check.
+        """
+        state = self._get_duplicate_scan_state()
+        if state['phase'] == 'done':
+            self._check_changed_duplicates(chunk_size)
+            return
+        cr = self.env.cr
+        cr.execute(
+            "SELECT id FROM res_partner WHERE id > %s ORDER BY id LIMIT %s",
+            [state['last_id'], chunk_size],
+        )
+        ids = [row[0] for row in cr.fetchall()]
+        partners = self.with_context(active_test=False).browse(ids)
+        queued = 0
+        if state['phase'] == 'keys':
+            for fname in DUPLICATE_KEY_FIELDS:
+                self.env.add_to_compute(self._fields[fname], partners)
+            partners._recompute_recordset(DUPLICATE_KEY_FIELDS)
+            partners.flush_recordset(DUPLICATE_KEY_FIELDS)
+        elif ids:
+            queued = partners.filtered('active')._detect_duplicates(detected_by='scan', forward=True)
+            partners._clear_duplicate_check_pending()
+
+        if len(ids) < chunk_size:
+            next_phase = 'pairs' if state['phase'] == 'keys' else 'done'
+            self._set_duplicate_scan_state(next_phase, 0)
+            remaining = 1 if next_phase == 'pairs' else 0
+        else:
+            self._set_duplicate_scan_state(state['phase'], ids[-1])
+            cr.execute("SELECT count(*) FROM res_partner WHERE id > %s", [ids[-1]])
+            remaining = cr.fetchone()[0]
+        _logger.info(f"Duplicate scan ({state['phase']}): {len(ids)} partners processed, {queued} pairs queued")
+        partners.invalidate_recordset()
+        self.env['ir.cron']._notify_progress(done=len(ids), remaining=remaining)
+
+    @api.model
+    def _check_changed_duplicates(self, chunk_size=DUPLICATE_SCAN_CHUNK):
+        """
+        Pair one chunk of partners flagged by _mark_duplicate_check_pending with
+        every partner sharing a block. Partners whose keys wait for the deferred
+        recompute are left for a later run.
+        """
+        self.flush_model(DUPLICATE_KEY_FIELDS + ('dedup_pending', 'recompute_pending'))
+        cr = self.env.cr
+        cr.execute(
+            "SELECT id FROM res_partner WHERE dedup_pending AND recompute_pending IS NOT TRUE ORDER BY id LIMIT %s",
+            [chunk_size],
+        )
+        partners = self.with_context(active_test=False).browse([row[0] for row in cr.fetchall()])
+        queued = partners.filtered('active')._detect_duplicates(detected_by='scan') if partners else 0
+        partners._clear_duplicate_check_pending()
+        cr.execute("SELECT count(*) FROM res_partner WHERE dedup_pending AND recompute_pending IS NOT TRUE")
+        remaining = cr.fetchone()[0]
+        _logger.info(f"Duplicate check: {len(partners)} changed partners checked, {queued} pairs queued")
+        partners.invalidate_recordset()
+        self.env['ir.cron']._notify_progress(done=len(partners), remaining=remaining)
+
+
+class ResPartnerDuplicate(models.Model):
+    _name = 'res.partner.duplicate'
+    _description = 'Contact Duplicate Candidate'
+    _order = 'state, score desc, id'
+
+    partner_id = fields.Many2one('res.partner', string='Contact', required=True, ondelete='cascade', index=True)
+    duplicate_id = fields.Many2one('res.partner', string='Possible Duplicate', required=True, ondelete='cascade',
+                                   index=True)
+    score = fields.Float(string='Score', digits=(3, 2), help='Similarity of the two contacts, from 0 to 1.')
+    reasons = fields.Char(string='Matching On')
+    detected_by = fields.Selection([
+        ('scan', 'Full Scan'),
+        ('create', 'On Creation'),
+    ], string='Detected By', default='scan')
+    state = fields.Selection([
+        ('new', 'To Review'),
+        ('duplicate', 'Duplicate'),
+        ('distinct', 'Not a Duplicate'),
+    ], string='Status', default='new', required=True)
+
+    _sql_constraints = [
+        ('partner_duplicate_uniq', 'unique(partner_id, duplicate_id)', 'This pair of contacts is already queued.'),
+    ]
+
+    @api.model
+    def _queue(self, scored, detected_by):
+        """Insert the scored pairs (lower id first) that are not queued yet; returns how many were added"""
+        if not scored:
+            return 0
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO res_partner_duplicate
+                (partner_id, duplicate_id, score, reasons, detected_by, state,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (partner_id, duplicate_id) DO NOTHING
+            """,
+            SQL(", ").join(
+                SQL("(%s, %s, %s, %s, %s, 'new', %s, %s, %s, %s)",
+                    a, b, score, reasons, detected_by, self.env.uid, now, self.env.uid, now)
+                for a, b, score, reasons in scored
+            ),
+        ))
+        return self.env.cr.rowcount
+
+    @api.model
+    def action_start_duplicate_scan(self):
+        return self.env['res.partner'].action_start_duplicate_scan()
+
+    def action_mark_distinct(self):
+        self.write({'state': 'distinct'})
+
+    def action_merge(self):
+        """Open the standard contact merge wizard on the pair"""
+        self.ensure_one()
+        self.state = 'duplicate'
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'base.partner.merge.automatic.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'active_model': 'res.partner',
+                'active_ids': [self.partner_id.id, self.duplicate_id.id],
+            },
+        }
@@ -22,20 +22,28 @@ class SaleOrder(models.Model):
     guarantees_count = fields.Integer(
         string='Guarantees Count',
         compute='_compute_guarantees_count',
+        store=True,
     )
 
     @api.depends('customer_guarantees_list_ids', 'customer_guarantees_ids')
     def _compute_guarantees_count(self):
+        counts = self.env['customer.guarantees']._get_guarantees_counts(self)
         for order in self:
-            order.guarantees_count = len(
-                order.customer_guarantees_list_ids or order.customer_guarantees_ids
-            )
+            if order.id in counts:
+                order.guarantees_count = counts[order.id]
+            else:
+                order.guarantees_count = len(order.customer_guarantees_list_ids or order.customer_guarantees_ids)
 
     def _sync_guarantees_many2many_from_list(self):
-        for order in self:
-            order.customer_guarantees_ids = [
-                Command.set(order.customer_guarantees_list_ids.mapped('customer_id').ids)
-            ]
+        self.env['customer.guarantees']._sync_guarantee_parents(self)
+
+    def _create_invoices(self, grouped=False, final=False, date=None):
+        # The guarantee lines copied on the invoices synchronize their guarantors once, for all invoices.
+        moves = super(SaleOrder, self.with_context(defer_guarantee_sync=True))._create_invoices(
+            grouped=grouped, final=final, date=date,
+        )
+        self.env['customer.guarantees']._apply_guarantee_sync()
+        return moves.with_env(self.env)
 
     def _prepare_invoice(self):
         invoice_vals = super()._prepare_invoice()
@@ -43,9 +51,6 @@ class SaleOrder(models.Model):
         if not guarantee_lines:
             return invoice_vals
 
-        invoice_vals['customer_guarantees_ids'] = [
-            Command.set(guarantee_lines.mapped('customer_id').ids)
-        ]
         invoice_vals['customer_guarantees_list_ids'] = [
             Command.create({
                 'customer_id': line.customer_id.id,
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+{
+    "name": "FRTZ Base",
+    "version": "18.0.1.0.0",
+    "summary": "Technical helpers shared by the FRTZ modules",
+    "description": """
+        Model-level helpers with no business logic of their own, used by
+        several FRTZ modules:
+        - deferred.recompute.mixin: stored recomputes of large writes run by a chunked cron
+    """,
+    "author": "FRTZ",
+    "category": "Hidden",
+    "depends": ["base"],
+    "license": "LGPL-3",
+    "installable": True,
+    "application": False,
+    "auto_install": False,
+}
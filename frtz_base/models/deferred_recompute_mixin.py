@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, fields, models, tools
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Writes touching more records than this defer their stored recomputes to a cron.
+RECOMPUTE_DEFER_THRESHOLD = 1000
+RECOMPUTE_BATCH_SIZE = 5000
+
+
+class DeferredRecomputeMixin(models.AbstractModel):
+    """
+    Defer the stored recomputes of large writes to a chunked cron.
+
+    Inheriting models list the stored fields that may be deferred in
+    _get_deferred_recompute_fields, name the cron recomputing them in
+    _deferred_recompute_cron and their threshold parameter in
+    _deferred_recompute_param, call _init_recompute_pending_index from init()
+    and, after their write, _defer_recompute when _should_defer_recompute.
+    Records whose deferred fields were pending are flagged, and the cron
+    recomputes every deferred field of one chunk of flagged records per run.
+    """
+    _name = 'deferred.recompute.mixin'
+    _description = 'Deferred Stored Recompute'
+
+    # XML id of the cron running _cron_recompute_deferred on the model.
+    _deferred_recompute_cron = None
+    # ir.config_parameter holding the model's threshold, RECOMPUTE_DEFER_THRESHOLD when unset.
+    _deferred_recompute_param = None
+
+    recompute_pending = fields.Boolean(
+        string='Recompute Pending',
+        copy=False,
+        readonly=True,
+        help="Stored fields of this record are waiting to be recomputed by the scheduled action.",
+    )
+
+    def _init_recompute_pending_index(self):
+        tools.create_index(
+            self.env.cr, f'{self._table}_recompute_pending_index', self._table, ['id'],
+            where='recompute_pending',
+        )
+
+    def _get_deferred_recompute_fields(self):
+        """Stored computed fields recomputed by the cron when a large write defers them."""
+        return []
+
+    def _should_defer_recompute(self):
+        """Whether the stored fields of these records are recomputed by the cron instead of inline"""
+        if 'defer_stored_recompute' in self.env.context:
+            return bool(self.env.context['defer_stored_recompute'])
+        threshold = RECOMPUTE_DEFER_THRESHOLD
+        if self._deferred_recompute_param:
+            threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+                self._deferred_recompute_param, RECOMPUTE_DEFER_THRESHOLD,
+            ))
+        return len(self) > threshold
+
+    def _defer_recompute(self):
+        """Drop the pending inline recomputes of the deferred fields and queue the records for the cron"""
+        pending = self.browse()
+        for fname in self._get_deferred_recompute_fields():
+            field = self._fields[fname]
+            records = self.env.records_to_compute(field) & self
+            if records:
+                self.env.remove_to_compute(field, records)
+                pending |= records
+        if not pending:
+            return
+        self.env.cr.execute(SQL(
+            "UPDATE %s SET recompute_pending = true WHERE id = ANY(%s)",
+            SQL.identifier(self._table), pending.ids,
+        ))
+        pending.invalidate_recordset(['recompute_pending'])
+        cron = self.env.ref(self._deferred_recompute_cron, raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _cron_recompute_deferred(self, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Recompute the deferred fields of one chunk of queued records and report the progress to the cron"""
+        self.flush_model(['recompute_pending'])
+        cr = self.env.cr
+        table = SQL.identifier(self._table)
+        cr.execute(SQL("SELECT id FROM %s WHERE recompute_pending ORDER BY id LIMIT %s", table, batch_size))
+        records = self.with_context(active_test=False).browse([row[0] for row in cr.fetchall()])
+        if records:
+            fnames = self._get_deferred_recompute_fields()
+            for fname in fnames:
+                self.env.add_to_compute(self._fields[fname], records)
+            records._recompute_recordset(fnames)
+            records.flush_recordset(fnames)
+            cr.execute(SQL("UPDATE %s SET recompute_pending = false WHERE id = ANY(%s)", table, records.ids))
+            records.invalidate_recordset()
+        cr.execute(SQL("SELECT count(*) FROM %s WHERE recompute_pending", table))
+        remaining = cr.fetchone()[0]
+        _logger.info(f"Recomputed deferred fields of {len(records)} {self._name} records, {remaining} remaining")
+        self.env['ir.cron']._notify_progress(done=len(records), remaining=remaining)
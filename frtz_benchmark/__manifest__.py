@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+{
+    'name': 'FRTZ Benchmark',
+    'version': '18.0.1.0.0',
+    'summary': 'Synthetic data generator and timing suite for the FRTZ modules',
+    'description': """
+FRTZ Benchmark
+==============
+
+Measures the FRTZ suite under realistic volume. NOT meant for production
+databases: it creates synthetic partners, orders, invoices and payments.
+
+* ``frtz.benchmark.data`` generates configurable synthetic data: partners
+  with name parts, sale order types, installment payment terms, orders with
+  per-line plans, posted invoices with installments, subscriptions and
+  pricelist expression rules.
+* ``frtz.benchmark.runner`` times the hot paths (wall time + query count)
+  and writes the results as JSON so releases can be compared.
+
+Run on a throw-away database (the test transaction is rolled back):
+
+    ./odoo-bin -c odoo.conf -d <DB> -i frtz_benchmark --stop-after-init \\
+        --test-tags /frtz_benchmark:TestFrtzBenchmark
+
+Query-count budgets of the hot paths (two data sizes each) are excluded
+from the standard run as well; select them with --test-tags frtz_query_budget.
+
+Environment variables:
+    FRTZ_BENCH_SCALE   small (default) / medium / large
+    FRTZ_BENCH_OUTPUT  path of the JSON report (default: temp directory)
+""",
+    'author': 'FRTZ',
+    'website': 'https://frtz.com',
+    'license': 'LGPL-3',
+    'category': 'Hidden',
+    'depends': [
+        'access_roles',
+        'contact_extension',
+        'sales_order_extension',
+        'account_invoice_installments',
+        'invoice_installment_management',
+        'installment_management_pro',
+        'installment_payment_extension',
+        'pricelist_expression',
+        'subscription_management',
+        'sales_order_import',
+    ],
+    'data': [],
+    'installable': True,
+    'application': False,
+    'auto_install': False,
+}
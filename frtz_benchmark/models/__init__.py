@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import benchmark_data
+from . import benchmark_runner
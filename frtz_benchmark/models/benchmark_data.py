@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from dateutil.relativedelta import relativedelta
+import logging
+import random
+
+_logger = logging.getLogger(__name__)
+
+# Volume presets; any key can be overridden when calling generate().
+SCALES = {
+    'small': {
+        'partners': 20,
+        'products': 10,
+        'orders': 20,
+        'lines_per_order': 3,
+        'subscriptions': 5,
+        'installment_count': 6,
+    },
+    'medium': {
+        'partners': 200,
+        'products': 50,
+        'orders': 200,
+        'lines_per_order': 5,
+        'subscriptions': 50,
+        'installment_count': 12,
+    },
+    'large': {
+        'partners': 2000,
+        'products': 200,
+        'orders': 2000,
+        'lines_per_order': 5,
+        'subscriptions': 500,
+        'installment_count': 24,
+    },
+}
+
+FIRST_NAMES = ['Ahmed', 'Mohamed', 'Omar', 'Ali', 'Youssef', 'Khaled', 'Hassan', 'Mahmoud', 'Asmaa', 'Sara']
+SUR_NAMES = ['Hassaan', 'Mansour', 'Saleh', 'Farouk', 'Nasser', 'Ibrahim', 'Fathy', 'Zaki']
+
+# Uses every builtin variable so the full expression path is exercised.
+BENCH_PRICE_EXPRESSION = (
+    "if(installment_num > 0, "
+    "ceil(price * (1 + installment_num * 0.015) - first_payment * 0.01), "
+    "round(price, 2))"
+)
+
+
+class FrtzBenchmarkData(models.AbstractModel):
+    """
+    Synthetic data generator for the FRTZ suite.
+
+    Creates a self-contained data set (prefixed with ``BENCH``) that covers
+    every module the benchmark measures. Deterministic for a given seed, so
+    two releases are compared on the same data shape.
+    """
+    _name = 'frtz.benchmark.data'
+    _description = 'FRTZ Benchmark Data Generator'
+
+    @api.model
+    def _get_scale_params(self, scale='small', **overrides):
+        if scale not in SCALES:
+            raise UserError(_("Unknown benchmark scale '%s'. Use one of: %s") % (
+                scale, ', '.join(SCALES)))
+        params = dict(SCALES[scale])
+        params.update({key: value for key, value in overrides.items() if value is not None})
+        return params
+
+    @api.model
+    def generate(self, scale='small', seed=42, **overrides):
+        """
+        Generate a complete synthetic data set.
+
+        Args:
+            scale (str): key of SCALES
+            seed (int): random seed
+            **overrides: any SCALES key (partners, orders, ...)
+
+        Returns:
+            dict: params used plus the generated records:
+                  partners, products, order_type, subscription_type,
+                  payment_term, pricelist, orders, subscriptions
+        """
+        params = self._get_scale_params(scale, **overrides)
+        rng = random.Random(seed)
+        _logger.info(f"FRTZ benchmark: generating '{scale}' data set {params}")
+
+        data = {'scale': scale, 'seed': seed, 'params': params}
+        data['partners'] = self._generate_partners(params['partners'], rng)
+        data['products'] = self._generate_products(params['products'], rng)
+        data['order_type'], data['subscription_type'] = self._generate_order_types()
+        data['payment_term'] = self._generate_payment_term(params['installment_count'])
+        data['pricelist'] = self._generate_pricelist()
+        data['orders'] = self._generate_orders(data, params, rng)
+        data['subscriptions'] = self._generate_subscriptions(data, params, rng)
+        return data
+
+    # ── Master data ───────────────────────────────────────────
+
+    @api.model
+    def _generate_partners(self, count, rng):
+        Partner = self.env['res.partner']
+        partners = Partner.browse()
+        for index in range(count):
+            parts = {
+                'first_name': rng.choice(FIRST_NAMES),
+                'father_name': rng.choice(FIRST_NAMES),
+                'gfather_name': rng.choice(FIRST_NAMES),
+                'sur_name': rng.choice(SUR_NAMES),
+            }
+            partners |= Partner.create(dict(
+                parts,
+                name=' '.join(parts.values()),
+                use_name_parts=True,
+                ref=f'BENCH{index:06d}',
+                company_type='person',
+                max_installments_amount=rng.randint(5, 50) * 1000,
+            ))
+        return partners
+
+    @api.model
+    def _generate_products(self, count, rng):
+        category = self.env['product.category'].create({
+            'name': 'BENCH Products',
+            'reference_type': 'manual',
+        })
+        return self.env['product.product'].create([
+            {
+                'name': f'BENCH Product {index:04d}',
+                'type': 'consu',
+                'categ_id': category.id,
+                'list_price': rng.randint(100, 5000),
+                'standard_price': rng.randint(50, 2500),
+            }
+            for index in range(count)
+        ])
+
+    @api.model
+    def _generate_order_types(self):
+        OrderType = self.env['sale.order.type']
+        order_type = OrderType.create({
+            'name': 'BENCH Installment Sale',
+            'order_classification': 'sale',
+            'product_type': 'consu',
+        })
+        subscription_type = OrderType.create({
+            'name': 'BENCH Subscription',
+            'order_classification': 'subscription',
+            'product_type': 'service',
+        })
+        return order_type, subscription_type
+
+    @api.model
+    def _generate_payment_term(self, installment_count):
+        return self.env['account.payment.term'].create({
+            'name': f'BENCH {installment_count} Installments',
+            'is_installment_term': True,
+            'pay_type': 'fixed',
+            'scope': 'per_lines',
+            'installment_count': installment_count,
+            'installment_frequency': 'monthly',
+            'first_payment_type': 'percent',
+            'first_payment_percentage': 10.0,
+        })
+
+    @api.model
+    def _generate_pricelist(self):
+        return self.env['product.pricelist'].create({
+            'name': 'BENCH Expression Pricelist',
+            'currency_id': self.env.company.currency_id.id,
+            'item_ids': [(0, 0, {
+                'applied_on': '3_global',
+                'compute_price': 'expression',
+                'price_expression': BENCH_PRICE_EXPRESSION,
+            })],
+        })
+
+    # ── Transactions ──────────────────────────────────────────
+
+    @api.model
+    def _generate_orders(self, data, params, rng):
+        """Draft installment orders with per-line plans (scope = per_lines)."""
+        partners = data['partners']
+        products = data['products']
+        term = data['payment_term']
+        vals_list = []
+        for index in range(params['orders']):
+            vals_list.append({
+                'partner_id': partners[index % len(partners)].id,
+                'sale_order_type_id': data['order_type'].id,
+                'pricelist_id': data['pricelist'].id,
+                'payment_term_id': term.id,
+                'payment_type': 'regular',
+                'pay_type': 'fixed',
+                'scope': 'per_lines',
+                'installment_count': params['installment_count'],
+                'first_payment_type': 'percent',
+                'first_payment_percentage': 10.0,
+                'order_line': [
+                    (0, 0, {
+                        'product_id': rng.choice(products).id,
+                        'product_uom_qty': rng.randint(1, 3),
+                        'payment_term_id': term.id,
+                    })
+                    for _line in range(params['lines_per_order'])
+                ],
+            })
+        return self.env['sale.order'].create(vals_list)
+
+    @api.model
+    def _generate_subscriptions(self, data, params, rng):
+        """Active monthly subscriptions started in the past, so billing has cycles to catch up."""
+        if not params['subscriptions']:
+            return self.env['sale.order']
+        period = self.env['sale.subscription.period'].create({
+            'name': 'BENCH Monthly',
+            'interval_number': 1,
+            'interval_unit': 'months',
+        })
+        service = self.env['product.product'].create({
+            'name': 'BENCH Subscription Package',
+            'type': 'service',
+            'subscription_ok': True,
+            'list_price': 300.0,
+        })
+        partners = data['partners']
+        start = fields.Date.context_today(self) - relativedelta(months=2)
+        subscriptions = self.env['sale.order'].create([
+            {
+                'partner_id': partners[index % len(partners)].id,
+                'sale_order_type_id': data['subscription_type'].id,
+                'subscription_period_id': period.id,
+                'subscription_start_date': start,
+                'order_line': [(0, 0, {
+                    'product_id': service.id,
+                    'product_uom_qty': rng.randint(1, 2),
+                })],
+            }
+            for index in range(params['subscriptions'])
+        ])
+        subscriptions.action_activate_subscription()
+        return subscriptions
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, release
+from odoo.tools import config
+from dateutil.relativedelta import relativedelta
+import json
+import logging
+import os
+import tempfile
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Modules whose versions are recorded in the report.
+SUITE_MODULES = (
+    'contact_extension',
+    'sales_order_extension',
+    'account_invoice_installments',
+    'invoice_installment_management',
+    'installment_management_pro',
+    'installment_payment_extension',
+    'pricelist_expression',
+    'subscription_management',
+)
+
+
+class FrtzBenchmarkRunner(models.AbstractModel):
+    """
+    Times the FRTZ hot paths on a generated data set.
+
+    Every step is measured with a flushed ORM and an empty cache, and reports
+    wall time and the number of SQL queries it issued. The report is written
+    as JSON so results of two releases can be diffed.
+    """
+    _name = 'frtz.benchmark.runner'
+    _description = 'FRTZ Benchmark Runner'
+
+    @api.model
+    def run(self, scale='small', output=None, seed=42, **overrides):
+        """
+        Generate data, run every benchmark step and write the JSON report.
+
+        Args:
+            scale (str): data volume preset (see benchmark_data.SCALES)
+            output (str): report path; defaults to FRTZ_BENCH_OUTPUT, the
+                          `frtz_benchmark_output` config option, or a temp file
+            seed (int): random seed of the generator
+            **overrides: generator parameters overriding the preset
+
+        Returns:
+            dict: the report that was written
+        """
+        data = {}
+
+        def generate():
+            data.update(self.env['frtz.benchmark.data'].generate(scale=scale, seed=seed, **overrides))
+            return len(data['orders']) + len(data['subscriptions'])
+
+        setup = self._measure('data_generation', generate)
+
+        results = [setup]
+        for name, step in self._get_steps():
+            results.append(self._run_step(name, step, data))
+
+        report = {
+            'suite': 'frtz',
+            'database': self.env.cr.dbname,
+            'date': fields.Datetime.to_string(fields.Datetime.now()),
+            'odoo_version': release.version,
+            'module_versions': self._get_module_versions(),
+            'scale': scale,
+            'seed': seed,
+            'params': data['params'],
+            'results': results,
+        }
+        report['output'] = self._write_report(report, output)
+        return report
+
+    @api.model
+    def _get_steps(self):
+        """Ordered (name, method) pairs; each step may rely on the previous ones."""
+        return [
+            ('expression_repricing', self._step_expression_repricing),
+            ('installment_preview', self._step_installment_preview),
+            ('order_confirmation', self._step_order_confirmation),
+            ('invoice_posting', self._step_invoice_posting),
+            ('control_payments', self._step_control_payments),
+            ('overdue_cron', self._step_overdue_cron),
+            ('subscription_billing_cron', self._step_subscription_billing_cron),
+        ]
+
+    # ── Measurement ───────────────────────────────────────────
+
+    @api.model
+    def _measure(self, name, func):
+        """Run func() with a flushed, empty cache and return its timing entry."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        records = func()
+        self.env.flush_all()
+        return {
+            'name': name,
+            'records': records or 0,
+            'wall_time_s': round(time.perf_counter() - start, 4),
+            'query_count': cr.sql_log_count - queries,
+        }
+
+    @api.model
+    def _run_step(self, name, step, data):
+        try:
+            with self.env.cr.savepoint():
+                result = self._measure(name, lambda: step(data))
+        except Exception as e:
+            _logger.exception(f"FRTZ benchmark: step {name} failed")
+            self.env.invalidate_all()
+            result = {'name': name, 'error': str(e)}
+        if result.get('records'):
+            result['ms_per_record'] = round(result['wall_time_s'] * 1000.0 / result['records'], 3)
+            result['queries_per_record'] = round(result['query_count'] / result['records'], 2)
+        _logger.info(f"FRTZ benchmark: {result}")
+        return result
+
+    # ── Steps ─────────────────────────────────────────────────
+
+    @api.model
+    def _step_expression_repricing(self, data):
+        orders = data['orders']
+        for order in orders:
+            order._recompute_order_line_pricelist_prices()
+        return len(orders.order_line)
+
+    @api.model
+    def _step_installment_preview(self, data):
+        orders = data['orders']
+        orders._regenerate_installment_preview()
+        return len(orders)
+
+    @api.model
+    def _step_order_confirmation(self, data):
+        orders = data['orders']
+        orders.action_confirm()
+        return len(orders)
+
+    @api.model
+    def _step_invoice_posting(self, data):
+        """Invoices are dated in the past so that early installments are overdue."""
+        invoices = data['orders']._create_invoices()
+        invoices.write({
+            'invoice_date': fields.Date.context_today(self) - relativedelta(months=4),
+        })
+        invoices.action_post()
+        data['invoices'] = invoices
+        return len(invoices)
+
+    @api.model
+    def _step_control_payments(self, data):
+        """One payment per partner settling the first open installment of each invoice."""
+        invoices = data.get('invoices') or self.env['account.move']
+        lines_by_partner = {}
+        for invoice in invoices:
+            installment = invoice.installment_ids.filtered(
+                lambda i: i.amount_residual > 0
+            ).sorted('date_due')[:1]
+            if installment:
+                lines_by_partner.setdefault(invoice.partner_id, []).append({
+                    'invoice_id': invoice.id,
+                    'installment_id': installment.id,
+                    'to_pay': installment.amount_residual,
+                })
+        Payment = self.env['account.payment'].with_context(skip_auto_fill_control_payment=True)
+        payments = Payment.create([
+            {
+                'payment_type': 'inbound',
+                'partner_type': 'customer',
+                'partner_id': partner.id,
+                'amount': sum(line['to_pay'] for line in lines),
+                'payment_scope': 'by_all_invoice_lines',
+                'control_payment_ids': [(0, 0, line) for line in lines],
+            }
+            for partner, lines in lines_by_partner.items()
+        ])
+        for payment in payments:
+            payment.action_process_control_payments()
+        return sum(len(lines) for lines in lines_by_partner.values())
+
+    @api.model
+    def _step_overdue_cron(self, data):
+        Installment = self.env['account.move.installment']
+        Installment._cron_update_overdue()
+        return Installment.search_count([('is_overdue', '=', True)])
+
+    @api.model
+    def _step_subscription_billing_cron(self, data):
+        self.env['sale.order']._cron_generate_subscription_invoices()
+        return len(data['subscriptions'])
+
+    # ── Report ────────────────────────────────────────────────
+
+    @api.model
+    def _get_module_versions(self):
+        modules = self.env['ir.module.module'].sudo().search_read(
+            [('name', 'in', SUITE_MODULES)], ['name', 'latest_version'],
+        )
+        return {module['name']: module['latest_version'] for module in modules}
+
+    @api.model
+    def _write_report(self, report, output=None):
+        path = output or os.environ.get('FRTZ_BENCH_OUTPUT') or config.get('frtz_benchmark_output')
+        if not path:
+            path = os.path.join(
+                tempfile.gettempdir(),
+                f"frtz_benchmark_{self.env.cr.dbname}_{report['scale']}_{int(time.time())}.json",
+            )
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, sort_keys=True, default=str)
+        _logger.info(f"FRTZ benchmark: report written to {path}")
+        return path
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import test_benchmark
+from . import test_query_budgets
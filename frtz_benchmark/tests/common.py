@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import random
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase
+
+# The two data sizes every budget is checked at.
+SIZES = (2, 8)
+
+# operation: queries at every size in SIZES
+# The hot paths are batched, so a budget is one constant: the count may not
+# grow with N beyond QUERY_BUDGET_MARGIN, which absorbs cache and sequence
+# noise. The constants are taken from a --test-tags frtz_query_budget run
+# (assertQueryCount logs the real count when it is lower); until they are,
+# the budget tests are excluded from the standard test run.
+QUERY_BUDGET_MARGIN = 3
+QUERY_BUDGETS = {
+    'installment_preview': 24,
+    'invoice_posting': 52,
+    'overdue_cron': 6,
+    'control_payment_by_installment': 34,
+    'control_payment_by_invoice_line': 34,
+    'line_repricing': 22,
+    'subscription_billing_cron': 18,
+    'access_role_propagation': 16,
+    'access_role_rule_domain': 9,
+    'sale_order_import': 120,
+}
+
+
+class FrtzQueryBudgetCase(TransactionCase):
+    """
+    Base class for query-count budgets.
+
+    Shares one synthetic master data set (see frtz.benchmark.data) and
+    provides assertQueryBudget(), which runs an operation at every size in
+    SIZES under assertQueryCount and checks that the count does not grow
+    with N.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.generator = cls.env['frtz.benchmark.data']
+        cls.data = cls.generator.generate(
+            scale='small', partners=max(SIZES), orders=0, subscriptions=0,
+        )
+        cls.rng = random.Random(7)
+
+    def assertQueryBudget(self, operation, prepare, run):
+        """
+        Args:
+            operation (str): key of QUERY_BUDGETS
+            prepare (callable): size -> records, executed outside the count
+            run (callable): records -> None, the measured operation
+        """
+        budget = QUERY_BUDGETS[operation]
+        small, large = SIZES
+        counts = {}
+        for size in SIZES:
+            records = prepare(size)
+            self.env.flush_all()
+            self.env.invalidate_all()
+            start = self.cr.sql_log_count
+            with self.assertQueryCount(budget + QUERY_BUDGET_MARGIN):
+                run(records)
+            counts[size] = self.cr.sql_log_count - start
+
+        self.assertLessEqual(
+            counts[large] - counts[small],
+            QUERY_BUDGET_MARGIN,
+            "%s: query count grows with N (%s)" % (operation, counts),
+        )
+
+    # ── Data helpers ──────────────────────────────────────────
+
+    def _make_orders(self, count, lines_per_order=2):
+        params = dict(self.data['params'], orders=count, lines_per_order=lines_per_order)
+        return self.generator._generate_orders(self.data, params, self.rng)
+
+    def _make_posted_invoices(self, count, months_ago=4, partner=None):
+        """Posted invoices dated in the past so their first installments are due."""
+        orders = self._make_orders(count, lines_per_order=1)
+        if partner:
+            orders.partner_id = partner
+        orders.action_confirm()
+        invoices = orders._create_invoices()
+        invoices.write({
+            'invoice_date': fields.Date.today() - relativedelta(months=months_ago),
+        })
+        invoices.action_post()
+        return invoices
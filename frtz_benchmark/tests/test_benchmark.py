@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import os
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('frtz_benchmark', '-standard', '-at_install', 'post_install')
+class TestFrtzBenchmark(TransactionCase):
+    """
+    Volume benchmark of the FRTZ suite. Excluded from the standard test run;
+    select it explicitly with ``--test-tags frtz_benchmark``.
+    """
+
+    def test_benchmark_suite(self):
+        report = self.env['frtz.benchmark.runner'].run(
+            scale=os.environ.get('FRTZ_BENCH_SCALE', 'small'),
+            output=os.environ.get('FRTZ_BENCH_OUTPUT'),
+        )
+        self.assertTrue(os.path.exists(report['output']))
+        failed = {r['name']: r['error'] for r in report['results'] if r.get('error')}
+        self.assertFalse(failed, "Benchmark steps failed: %s" % failed)
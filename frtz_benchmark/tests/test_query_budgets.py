@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+
+from odoo import Command, fields
+from odoo.tests import tagged
+
+from .common import FrtzQueryBudgetCase
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestInstallmentQueryBudgets(FrtzQueryBudgetCase):
+
+    def test_installment_preview(self):
+        self.assertQueryBudget(
+            'installment_preview',
+            self._make_orders,
+            lambda orders: orders._regenerate_installment_preview(),
+        )
+
+    def test_invoice_posting(self):
+        def prepare(size):
+            orders = self._make_orders(size, lines_per_order=1)
+            orders.action_confirm()
+            return orders._create_invoices()
+
+        self.assertQueryBudget(
+            'invoice_posting',
+            prepare,
+            lambda invoices: invoices.action_post(),
+        )
+
+    def test_overdue_cron(self):
+        Installment = self.env['account.move.installment']
+        self.assertQueryBudget(
+            'overdue_cron',
+            self._make_posted_invoices,
+            lambda invoices: Installment._cron_update_overdue(),
+        )
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestPaymentQueryBudgets(FrtzQueryBudgetCase):
+
+    def _make_control_payment(self, invoices, scope):
+        lines = []
+        for invoice in invoices:
+            installment = invoice.installment_ids.filtered(
+                lambda i: i.amount_residual > 0
+            ).sorted('date_due')[:1]
+            line = {'invoice_id': invoice.id, 'to_pay': installment.amount_residual}
+            if scope == 'by_all_invoice_lines':
+                line['installment_id'] = installment.id
+            else:
+                line['invoice_line_id'] = installment.invoice_line_id.id
+            lines.append(line)
+        return self.env['account.payment'].with_context(
+            skip_auto_fill_control_payment=True,
+        ).create({
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': invoices[0].partner_id.id,
+            'amount': sum(line['to_pay'] for line in lines),
+            'date': fields.Date.today(),
+            'payment_scope': scope,
+            'control_payment_ids': [Command.create(line) for line in lines],
+        })
+
+    def _prepare_payment(self, scope):
+        def prepare(size):
+            invoices = self._make_posted_invoices(size, partner=self.data['partners'][0])
+            return self._make_control_payment(invoices, scope)
+        return prepare
+
+    def test_control_payment_by_installment(self):
+        self.assertQueryBudget(
+            'control_payment_by_installment',
+            self._prepare_payment('by_all_invoice_lines'),
+            lambda payment: payment.action_process_control_payments(),
+        )
+
+    def test_control_payment_by_invoice_line(self):
+        self.assertQueryBudget(
+            'control_payment_by_invoice_line',
+            self._prepare_payment('by_product_invoice'),
+            lambda payment: payment.action_process_control_payments(),
+        )
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestPricingQueryBudgets(FrtzQueryBudgetCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # An installment-model variable forces the per-line installment lookup.
+        installment_model = cls.env['ir.model']._get('sale.order.installment')
+        item = cls.data['pricelist'].item_ids[:1]
+        item.write({
+            'price_expression': 'price + first_due * 0',
+            'expression_variable_ids': [Command.create({
+                'model_id': installment_model.id,
+                'field_id': cls.env['ir.model.fields']._get('sale.order.installment', 'amount_total').id,
+                'variable_name': 'first_due',
+            })],
+        })
+
+    def test_line_repricing(self):
+        self.assertQueryBudget(
+            'line_repricing',
+            lambda size: self._make_orders(1, lines_per_order=size),
+            lambda order: order._recompute_order_line_pricelist_prices(),
+        )
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestSubscriptionQueryBudgets(FrtzQueryBudgetCase):
+
+    def test_subscription_billing_cron(self):
+        def prepare(size):
+            params = dict(self.data['params'], subscriptions=size)
+            return self.generator._generate_subscriptions(self.data, params, self.rng)
+
+        self.assertQueryBudget(
+            'subscription_billing_cron',
+            prepare,
+            lambda subscriptions: self.env['sale.order']._cron_generate_subscription_invoices(),
+        )
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestAccessRoleQueryBudgets(FrtzQueryBudgetCase):
+
+    def _make_role(self, user_count=0, domain_count=0):
+        partner_model = self.env['ir.model']._get('res.partner')
+        management = self.env['role.management'].create({
+            'name': 'BENCH Role Management',
+            'domain_ids': [
+                Command.create({
+                    'name': "[('active', '=', True)]",
+                    'domain_model_id': partner_model.id,
+                })
+                for _index in range(domain_count)
+            ],
+        })
+        role = self.env['access.role'].create({
+            'name': 'BENCH Role',
+            'role_management_id': management.id,
+            'groups_ids': [Command.set([self.env.ref('base.group_user').id])],
+        })
+        users = self.env['res.users'].create([
+            {
+                'name': f'BENCH User {index}',
+                'login': f'bench_{role.id}_{index}',
+            }
+            for index in range(user_count)
+        ])
+        users.write({'access_role_id': role.id})
+        role.write({'user_ids': [Command.set(users.ids)]})
+        return role
+
+    def test_access_role_propagation(self):
+        extra_group = self.env.ref('base.group_partner_manager')
+        self.assertQueryBudget(
+            'access_role_propagation',
+            lambda size: self._make_role(user_count=size),
+            lambda role: role.write({'groups_ids': [Command.link(extra_group.id)]}),
+        )
+
+    def test_access_role_rule_domain(self):
+        def prepare(size):
+            role = self._make_role(user_count=1, domain_count=size)
+            self.env.registry.clear_cache()
+            return role.user_ids
+
+        self.assertQueryBudget(
+            'access_role_rule_domain',
+            prepare,
+            lambda user: self.env['ir.rule'].with_user(user)._compute_domain('res.partner'),
+        )
+
+
+@tagged('post_install', '-at_install', '-standard', 'frtz_query_budget')
+class TestImportQueryBudgets(FrtzQueryBudgetCase):
+
+    def _make_import_job(self, size):
+        """A queued Excel import of `size` one-line orders, one product per row."""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            self.skipTest("openpyxl is not installed")
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['order_ref', 'partner', 'order_type', 'pricelist', 'product', 'quantity'])
+        partners = self.data['partners']
+        products = self.data['products']
+        for index in range(size):
+            sheet.append([
+                f'BENCH-IMP-{size}-{index}',
+                partners[index % len(partners)].ref,
+                self.data['order_type'].name,
+                self.data['pricelist'].name,
+                products[index % len(products)].name,
+                1,
+            ])
+        stream = io.BytesIO()
+        workbook.save(stream)
+        return self.env['sale.order.import.job'].create({
+            'import_file': base64.b64encode(stream.getvalue()),
+            'import_filename': 'bench.xlsx',
+            'state': 'running',
+        })
+
+    def test_sale_order_import(self):
+        self.assertQueryBudget(
+            'sale_order_import',
+            self._make_import_job,
+            lambda job: job._process(),
+        )
@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 from odoo import models, api, fields, _
 from odoo.exceptions import ValidationError, UserError
+from datetime import timedelta
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Fields returned by the paginated overdue API when the caller does not
+# pass an explicit projection. `date_due` and `id` are always added because
+# they make up the keyset cursor.
+OVERDUE_DEFAULT_FIELDS = [
+    'name', 'move_id', 'partner_id', 'company_id', 'date_due',
+    'amount_total', 'amount_paid', 'amount_residual', 'currency_id', 'state',
+]
+OVERDUE_PAGE_MAX_LIMIT = 5000
+
 
 class InstallmentAdapterService(models.Model):
     """
@@ -20,6 +30,7 @@ class InstallmentAdapterService(models.Model):
         adapter.create_installments(move, term)
         adapter.record_payment(installment, amount)
         adapter.get_overdue_installments()
+        adapter.get_overdue_installments_page(cursor=None, limit=500)
     """
     _name = 'installment.adapter.service'
     _description = 'Installment Adapter Service'
@@ -129,7 +140,6 @@ class InstallmentAdapterService(models.Model):
                 _logger.warning("account.move.installment model not available")
                 return self.env['account.move.installment']
 
-            from datetime import timedelta
             today = fields.Date.today()
             overdue_date = today - timedelta(days=days_threshold)
 
@@ -146,6 +156,151 @@ class InstallmentAdapterService(models.Model):
             _logger.error(f"Error getting overdue installments: {str(e)}")
             return self.env['account.move.installment']
 
+    @api.model
+    def get_overdue_installments_page(self, cursor=None, limit=500, field_names=None,
+                                      partner_ids=None, company_ids=None,
+                                      min_days_overdue=0, max_days_overdue=None):
+        """
+        Keyset-paginated read of overdue installments, for RPC consumers.
+
+        Rows are ordered by (date_due, id) and the next page starts strictly
+        after the last row returned, so pages stay stable while installments
+        are paid or created in between calls and the cost of a page does not
+        grow with its position.
+
+        Args:
+            cursor (str): `next_cursor` of the previous page, None for the first page
+            limit (int): Page size (capped to OVERDUE_PAGE_MAX_LIMIT)
+            field_names (list): Field projection, defaults to OVERDUE_DEFAULT_FIELDS
+            partner_ids (list): Restrict to these partners
+            company_ids (list): Restrict to these companies
+            min_days_overdue (int): Minimum days past due (same as `days_threshold`)
+            max_days_overdue (int): Maximum days past due, None for no bound
+
+        Returns:
+            dict: {'records': [dict, ...], 'next_cursor': str or False}
+        """
+        if not self.env.registry.get('account.move.installment'):
+            _logger.warning("account.move.installment model not available")
+            return {'records': [], 'next_cursor': False}
+
+        Installment = self.env['account.move.installment']
+        limit = max(1, min(int(limit or 1), OVERDUE_PAGE_MAX_LIMIT))
+        read_fields = self._get_overdue_read_fields(Installment, field_names)
+
+        domain = self._get_overdue_domain(
+            partner_ids=partner_ids,
+            company_ids=company_ids,
+            min_days_overdue=min_days_overdue,
+            max_days_overdue=max_days_overdue,
+        )
+        if cursor:
+            last_date, last_id = self._decode_overdue_cursor(cursor)
+            domain += [
+                '|',
+                ('date_due', '>', last_date),
+                '&', ('date_due', '=', last_date), ('id', '>', last_id),
+            ]
+
+        records = Installment.search_read(
+            domain, read_fields, limit=limit, order='date_due asc, id asc',
+        )
+        next_cursor = False
+        if len(records) == limit:
+            last = records[-1]
+            next_cursor = self._encode_overdue_cursor(last['date_due'], last['id'])
+
+        # Nothing the caller receives is kept around in the ORM cache.
+        Installment.invalidate_model()
+        return {'records': records, 'next_cursor': next_cursor}
+
+    @api.model
+    def iter_overdue_installments(self, batch_size=1000, **filters):
+        """
+        Yield overdue installments page by page as lists of dicts.
+
+        Server-side counterpart of `get_overdue_installments_page()`: walks the
+        whole keyset in constant memory. Accepts the same filters.
+        """
+        cursor = None
+        while True:
+            page = self.get_overdue_installments_page(cursor=cursor, limit=batch_size, **filters)
+            if page['records']:
+                yield page['records']
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+
+    @api.model
+    def get_installment_statuses(self, installment_ids):
+        """
+        Batched variant of `get_installment_status()`.
+
+        Args:
+            installment_ids (list): Installment ids
+
+        Returns:
+            dict: {installment_id: status dict} with the same keys as get_installment_status
+        """
+        if not installment_ids or not self.env.registry.get('account.move.installment'):
+            return {}
+
+        Installment = self.env['account.move.installment']
+        wanted = ['amount_total', 'amount_paid', 'amount_residual', 'date_due', 'state']
+        read_fields = [f for f in wanted if f in Installment._fields]
+        result = {}
+        for row in Installment.browse(installment_ids).exists().read(read_fields):
+            result[row['id']] = {
+                'id': row['id'],
+                'amount': row.get('amount_total', 0),
+                'amount_paid': row.get('amount_paid', 0),
+                'amount_remaining': row.get('amount_residual', 0),
+                'due_date': row.get('date_due'),
+                'state': row.get('state', 'unknown'),
+            }
+        return result
+
+    @api.model
+    def _get_overdue_domain(self, partner_ids=None, company_ids=None,
+                            min_days_overdue=0, max_days_overdue=None):
+        """Domain shared by the overdue queries (same semantics as get_overdue_installments)."""
+        today = fields.Date.today()
+        domain = [
+            ('state', '!=', 'paid'),
+            ('date_due', '<', today - timedelta(days=min_days_overdue or 0)),
+        ]
+        if max_days_overdue is not None:
+            domain.append(('date_due', '>=', today - timedelta(days=max_days_overdue)))
+        if partner_ids:
+            domain.append(('partner_id', 'in', list(partner_ids)))
+        if company_ids:
+            domain.append(('company_id', 'in', list(company_ids)))
+        return domain
+
+    @api.model
+    def _get_overdue_read_fields(self, Installment, requested):
+        """Validate the caller's projection; the cursor fields are always read."""
+        requested = requested or OVERDUE_DEFAULT_FIELDS
+        unknown = [f for f in requested if f not in Installment._fields]
+        if unknown:
+            raise ValidationError(_("Unknown installment fields: %s") % ", ".join(unknown))
+        read_fields = [f for f in requested if f != 'id']
+        if 'date_due' not in read_fields:
+            read_fields.append('date_due')
+        return read_fields
+
+    @api.model
+    def _encode_overdue_cursor(self, date_due, record_id):
+        return "%s:%d" % (fields.Date.to_string(date_due), record_id)
+
+    @api.model
+    def _decode_overdue_cursor(self, cursor):
+        try:
+            date_part, id_part = cursor.rsplit(':', 1)
+            return fields.Date.to_date(date_part), int(id_part)
+        except (AttributeError, TypeError, ValueError):
+            raise ValidationError(_("Invalid pagination cursor: %s") % cursor)
+
     @api.model
     def reschedule_installment(self, installment, new_due_date, reason=''):
         """
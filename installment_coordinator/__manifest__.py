@@ -20,6 +20,7 @@
         - Automatic overdue detection
         - Dashboard and monitoring
         - Dependency validation
+        - Per-operation timing and throughput metrics
 
         Example:
             coordinator = self.env['installment.coordinator']
@@ -35,7 +36,9 @@
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/installment_coordinator_views.xml',
+        'views/installment_coordinator_metric_views.xml',
     ],
     'post_init_hook': 'post_init_hook',
     'installable': True,
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
+from . import installment_coordinator_metric
 from . import installment_coordinator
 from . import account_move_hook
 
-__all__ = ['installment_coordinator', 'account_move_hook']
+__all__ = ['installment_coordinator_metric', 'installment_coordinator', 'account_move_hook']
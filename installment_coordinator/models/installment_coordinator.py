@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from odoo import models, api, fields, _
 from odoo.exceptions import ValidationError
+from .installment_coordinator_metric import timed_operation
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -46,6 +47,7 @@ class InstallmentCoordinator(models.Model):
     )
 
     @api.model
+    @timed_operation('invoice_posted')
     def process_invoice_posted(self, invoice):
         """
         Called when invoice is posted.
@@ -107,6 +109,7 @@ class InstallmentCoordinator(models.Model):
             return {'status': 'error', 'message': error_msg}
 
     @api.model
+    @timed_operation('payment_received')
     def process_payment_received(self, payment, installment, amount):
         """
         Called when payment is received against an installment.
@@ -151,6 +154,7 @@ class InstallmentCoordinator(models.Model):
             return {'status': 'error', 'message': error_msg}
 
     @api.model
+    @timed_operation('overdue_check')
     def process_overdue_check(self):
         """
         Cron job: Check and flag overdue installments.
@@ -281,6 +285,22 @@ class InstallmentCoordinator(models.Model):
         for module, available in status['module_status'].items():
             message += f"  • {module}: {'✓' if available else '✗'}\n"
 
+        metrics = self.env['installment.coordinator.metric']
+        metrics.flush_metrics()
+        daily = metrics.get_daily_summary(days=7)
+        message += "\nPerformance (last 7 days):\n"
+        if not daily:
+            message += "  • No operations recorded yet\n"
+        for entry in daily:
+            p95 = entry['p95_ms']
+            message += (
+                f"  • {entry['date']} {entry['operation']}: "
+                f"{entry['calls']} calls, {entry['installments']} installments, "
+                f"p50 {entry['p50_ms']:.0f} ms, "
+                f"p95 {'> 60000' if p95 == float('inf') else '%.0f' % p95} ms, "
+                f"errors {entry['errors']}\n"
+            )
+
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
@@ -290,3 +310,14 @@ class InstallmentCoordinator(models.Model):
                 'sticky': True,
             }
         }
+
+    def action_show_metrics(self):
+        """Action button to open the stored operation metrics"""
+        self.env['installment.coordinator.metric'].flush_metrics()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Coordinator Metrics'),
+            'res_model': 'installment.coordinator.metric',
+            'view_mode': 'list,pivot',
+            'context': {'search_default_group_date': 1, 'search_default_group_operation': 1},
+        }
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api, fields, _
+from collections import defaultdict
+from datetime import timedelta
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+DURATION_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+# Minimum seconds between two flushes of a worker's in-memory counters.
+FLUSH_INTERVAL = 60
+
+OPERATION_SELECTION = [
+    ('invoice_posted', 'Invoice Posted'),
+    ('payment_received', 'Payment Received'),
+    ('overdue_check', 'Overdue Check'),
+]
+
+
+class _MetricsBuffer:
+    """
+    Per-process accumulator for coordinator timings.
+
+    One buffer per database; recording is a few dict updates under a lock so
+    it is cheap enough to run on every coordinator call. Data is moved to
+    `installment.coordinator.metric` by `flush_metrics()`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.data = {}
+
+    def record(self, operation, duration_ms, installments, error):
+        bucket = bisect.bisect_left(DURATION_BUCKETS_MS, duration_ms)
+        with self.lock:
+            entry = self.data.get(operation)
+            if entry is None:
+                entry = self.data[operation] = {
+                    'call_count': 0,
+                    'error_count': 0,
+                    'installment_count': 0,
+                    'total_duration_ms': 0.0,
+                    'max_duration_ms': 0.0,
+                    'buckets': [0] * (len(DURATION_BUCKETS_MS) + 1),
+                }
+            entry['call_count'] += 1
+            entry['error_count'] += 1 if error else 0
+            entry['installment_count'] += installments
+            entry['total_duration_ms'] += duration_ms
+            entry['max_duration_ms'] = max(entry['max_duration_ms'], duration_ms)
+            entry['buckets'][bucket] += 1
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+
+    def drain(self):
+        with self.lock:
+            data, self.data = self.data, {}
+            self.last_flush = time.monotonic()
+        return data
+
+    def restore(self, data):
+        """Put back counters whose flush failed so they go out with the next one."""
+        for operation, entry in data.items():
+            with self.lock:
+                current = self.data.setdefault(operation, entry)
+                if current is entry:
+                    continue
+                for key in ('call_count', 'error_count', 'installment_count', 'total_duration_ms'):
+                    current[key] += entry[key]
+                current['max_duration_ms'] = max(current['max_duration_ms'], entry['max_duration_ms'])
+                current['buckets'] = [a + b for a, b in zip(current['buckets'], entry['buckets'])]
+
+
+_buffers = defaultdict(_MetricsBuffer)
+
+
+def timed_operation(operation):
+    """
+    Decorator for coordinator entry points: records duration, the number of
+    installments touched (the `count` key of the returned status dict) and
+    whether the call ended in error.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = method(self, *args, **kwargs)
+                return result
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000.0
+                status = result if isinstance(result, dict) else {}
+                self.env['installment.coordinator.metric']._record(
+                    operation,
+                    duration_ms,
+                    installments=status.get('count', 0) or 0,
+                    error=result is None or status.get('status') == 'error',
+                )
+        return wrapper
+    return decorator
+
+
+class InstallmentCoordinatorMetric(models.Model):
+    """
+    Flushed coordinator timings.
+
+    Each row holds the counters one worker accumulated for one operation
+    between two flushes. Percentiles are derived from the summed histogram
+    buckets, so rows from different workers and flushes merge exactly.
+    """
+    _name = 'installment.coordinator.metric'
+    _description = 'Installment Coordinator Metric'
+    _order = 'date desc, operation'
+
+    date = fields.Date(required=True, index=True, default=fields.Date.context_today)
+    operation = fields.Selection(OPERATION_SELECTION, required=True, index=True)
+    worker_pid = fields.Integer(string='Worker PID', readonly=True)
+    call_count = fields.Integer(string='Calls', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    installment_count = fields.Integer(string='Installments', readonly=True)
+    total_duration_ms = fields.Float(string='Total Duration (ms)', readonly=True)
+    max_duration_ms = fields.Float(string='Max Duration (ms)', readonly=True)
+    avg_duration_ms = fields.Float(
+        string='Avg Duration (ms)',
+        compute='_compute_avg_duration_ms',
+    )
+    bucket_counts = fields.Json(
+        readonly=True,
+        help='Call counts per latency bucket (see DURATION_BUCKETS_MS)',
+    )
+
+    @api.depends('call_count', 'total_duration_ms')
+    def _compute_avg_duration_ms(self):
+        for metric in self:
+            metric.avg_duration_ms = (
+                metric.total_duration_ms / metric.call_count if metric.call_count else 0.0
+            )
+
+    # ── Recording ─────────────────────────────────────────────
+
+    @api.model
+    def _record(self, operation, duration_ms, installments=0, error=False):
+        buffer = _buffers[self.env.cr.dbname]
+        buffer.record(operation, duration_ms, installments, error)
+        if buffer.due():
+            self.flush_metrics()
+
+    @api.model
+    def flush_metrics(self):
+        """
+        Write this worker's buffered counters to the database.
+
+        Uses its own cursor so the metrics survive a rollback of the caller's
+        transaction and never hold locks on it.
+        """
+        buffer = _buffers[self.env.cr.dbname]
+        data = buffer.drain()
+        if not data:
+            return 0
+        vals_list = [
+            {
+                'date': fields.Date.context_today(self),
+                'operation': operation,
+                'worker_pid': os.getpid(),
+                'call_count': entry['call_count'],
+                'error_count': entry['error_count'],
+                'installment_count': entry['installment_count'],
+                'total_duration_ms': entry['total_duration_ms'],
+                'max_duration_ms': entry['max_duration_ms'],
+                'bucket_counts': entry['buckets'],
+            }
+            for operation, entry in data.items()
+        ]
+        try:
+            with self.env.registry.cursor() as cr:
+                self.with_env(self.env(cr=cr)).sudo().create(vals_list)
+        except Exception as e:
+            _logger.warning(f"Coordinator: could not flush metrics: {str(e)}")
+            buffer.restore(data)
+            return 0
+        return len(vals_list)
+
+    @api.model
+    def _cron_flush_metrics(self):
+        """Flush the cron worker's own counters (e.g. from the overdue check)."""
+        self.flush_metrics()
+
+    # ── Reporting ─────────────────────────────────────────────
+
+    @api.model
+    def _percentile(self, buckets, pct):
+        """Upper bound (ms) of the bucket containing the given percentile."""
+        total = sum(buckets)
+        if not total:
+            return 0.0
+        threshold = total * pct / 100.0
+        running = 0
+        for index, count in enumerate(buckets):
+            running += count
+            if running >= threshold:
+                if index < len(DURATION_BUCKETS_MS):
+                    return float(DURATION_BUCKETS_MS[index])
+                return float('inf')
+        return float('inf')
+
+    @api.model
+    def get_daily_summary(self, days=7):
+        """
+        Aggregate stored metrics per (day, operation).
+
+        Returns:
+            list: dicts with date, operation, calls, errors, installments,
+                  avg/p50/p95/max latency (ms), sorted newest day first
+        """
+        date_from = fields.Date.context_today(self) - timedelta(days=days - 1)
+        rows = self.search_read(
+            [('date', '>=', date_from)],
+            ['date', 'operation', 'call_count', 'error_count', 'installment_count',
+             'total_duration_ms', 'max_duration_ms', 'bucket_counts'],
+        )
+        summary = {}
+        for row in rows:
+            key = (row['date'], row['operation'])
+            entry = summary.setdefault(key, {
+                'date': row['date'],
+                'operation': row['operation'],
+                'calls': 0,
+                'errors': 0,
+                'installments': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'buckets': [0] * (len(DURATION_BUCKETS_MS) + 1),
+            })
+            entry['calls'] += row['call_count']
+            entry['errors'] += row['error_count']
+            entry['installments'] += row['installment_count']
+            entry['total_ms'] += row['total_duration_ms']
+            entry['max_ms'] = max(entry['max_ms'], row['max_duration_ms'])
+            for index, count in enumerate(row['bucket_counts'] or []):
+                if index < len(entry['buckets']):
+                    entry['buckets'][index] += count
+
+        result = []
+        for entry in summary.values():
+            buckets = entry.pop('buckets')
+            total_ms = entry.pop('total_ms')
+            entry['avg_ms'] = total_ms / entry['calls'] if entry['calls'] else 0.0
+            entry['p50_ms'] = self._percentile(buckets, 50)
+            entry['p95_ms'] = self._percentile(buckets, 95)
+            result.append(entry)
+        result.sort(key=lambda e: (e['date'], e['operation']), reverse=True)
+        return result
+
+    @api.model
+    def _cron_purge_old_metrics(self, keep_days=90):
+        cutoff = fields.Date.context_today(self) - timedelta(days=keep_days)
+        self.search([('date', '<', cutoff)]).unlink()
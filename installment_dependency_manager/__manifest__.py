@@ -16,6 +16,7 @@
         - Provides capability registry
         - Tracks module dependencies
         - Defines abstract interfaces
+        - Persisted, versioned registry shared by all workers
 
         IMPORTANT: This module does NOT change any existing module logic.
         It provides an optional dependency management layer.
@@ -11,6 +11,9 @@ def post_init_hook(cr, registry):
     This automatically detects which installment modules are installed
     and registers their capabilities in the registry.
 
+    Modules installed or uninstalled later are picked up by the registry's
+    `_register_hook`, which runs the same sync on every registry load.
+
     Args:
         cr: Database cursor
         registry: Module registry
@@ -19,53 +22,11 @@ def post_init_hook(cr, registry):
         env = registry.env(cr)
         dep_registry = env['installment.dependency.registry']
 
-        # Get list of installed modules
-        installed_modules = env['ir.module.module'].search([
-            ('state', '=', 'installed')
-        ])
-        module_names = {m.name for m in installed_modules}
-
         _logger.info("Registering installment module capabilities...")
 
-        # Register payment_term_installment_extension
-        if 'payment_term_installment_extension' in module_names:
-            dep_registry.register(
-                'payment_term_installment_extension',
-                'payment_term_config'
-            )
-            _logger.info("Registered: payment_term_installment_extension -> payment_term_config")
-
-        # Register invoice_installment_management
-        if 'invoice_installment_management' in module_names:
-            dep_registry.register(
-                'invoice_installment_management',
-                'installment_creation'
-            )
-            _logger.info("Registered: invoice_installment_management -> installment_creation")
-
-        # Register installment_payment_extension
-        if 'installment_payment_extension' in module_names:
-            dep_registry.register(
-                'installment_payment_extension',
-                'installment_payment'
-            )
-            _logger.info("Registered: installment_payment_extension -> installment_payment")
-
-        # Register installment_management_pro
-        if 'installment_management_pro' in module_names:
-            dep_registry.register(
-                'installment_management_pro',
-                'installment_analytics'
-            )
-            _logger.info("Registered: installment_management_pro -> installment_analytics")
-
-        # Register account_invoice_installments
-        if 'account_invoice_installments' in module_names:
-            dep_registry.register(
-                'account_invoice_installments',
-                'order_type_classification'
-            )
-            _logger.info("Registered: account_invoice_installments -> order_type_classification")
+        dep_registry._sync_installed_modules()
+        for capability, modules in dep_registry.get_all_capabilities().items():
+            _logger.info(f"Registered: {', '.join(modules)} -> {capability}")
 
         _logger.info("Installment module registration complete")
 
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from . import dependency_capability
 from . import dependency_registry
 
-__all__ = ['dependency_registry']
+__all__ = ['dependency_capability', 'dependency_registry']
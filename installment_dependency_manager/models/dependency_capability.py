@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields
+
+
+class InstallmentDependencyCapability(models.Model):
+    """
+    Persisted (module, capability) pairs behind installment.dependency.registry.
+
+    Rows are shared by every worker and cron process; the registry model
+    keeps a versioned, precomputed snapshot of them in the ormcache.
+    """
+    _name = 'installment.dependency.capability'
+    _description = 'Installment Module Capability'
+    _order = 'capability_name, module_name'
+
+    module_name = fields.Char(required=True, index=True, readonly=True)
+    capability_name = fields.Char(required=True, index=True, readonly=True)
+
+    _sql_constraints = [
+        ('module_capability_uniq', 'unique(module_name, capability_name)',
+         'A module can only register a capability once.'),
+    ]
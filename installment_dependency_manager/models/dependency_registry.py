@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo import models, api
-from collections import defaultdict
+from odoo import models, api, tools, _
 import logging
 
 _logger = logging.getLogger(__name__)
 
+VERSION_PARAM = 'installment_dependency_manager.registry_version'
+
 
 class InstallmentDependencyRegistry(models.Model):
     """
@@ -12,6 +13,13 @@ class InstallmentDependencyRegistry(models.Model):
 
     This allows us to know dependencies WITHOUT hardcoding them in manifest.
 
+    Registrations are stored in `installment.dependency.capability` and every
+    change bumps a version number. Each process keeps one precomputed
+    snapshot (capability -> modules, transitive prerequisites, module chains)
+    in the ormcache; changes clear that cache, and Odoo's registry signaling
+    makes the other workers drop theirs on their next request. Lookups are
+    dict accesses on the snapshot.
+
     Example:
         registry.register('payment_term_installment_extension', 'payment_term_config')
         registry.register('invoice_installment_management', 'installment_creation')
@@ -21,9 +29,6 @@ class InstallmentDependencyRegistry(models.Model):
     _description = 'Installment Dependency Registry'
     _singleton = True
 
-    # In-memory registry of module capabilities
-    _in_memory_registry = defaultdict(set)
-
     # Capability dependency map
     _capability_dependencies = {
         'installment_creation': ['payment_term_config'],
@@ -32,6 +37,99 @@ class InstallmentDependencyRegistry(models.Model):
         'installment_rescheduling': ['installment_analytics'],
     }
 
+    # Capabilities provided by known modules, registered when they are installed
+    _module_capabilities = {
+        'payment_term_installment_extension': ['payment_term_config'],
+        'invoice_installment_management': ['installment_creation'],
+        'installment_payment_extension': ['installment_payment'],
+        'installment_management_pro': ['installment_analytics'],
+        'account_invoice_installments': ['order_type_classification'],
+    }
+
+    def _register_hook(self):
+        """Align stored registrations with installed modules on every registry load."""
+        super()._register_hook()
+        try:
+            with self.env.cr.savepoint():
+                self._sync_installed_modules()
+        except Exception as e:
+            _logger.warning(f"Could not sync installment capability registry: {str(e)}")
+
+    # ── Snapshot ──────────────────────────────────────────────
+
+    @api.model
+    def _get_version(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(VERSION_PARAM, 0))
+
+    @api.model
+    def _bump_version(self):
+        """Record a registry change and make every process rebuild its snapshot."""
+        version = self._get_version() + 1
+        self.env['ir.config_parameter'].sudo().set_param(VERSION_PARAM, version)
+        self.env.registry.clear_cache()
+        return version
+
+    @api.model
+    @tools.ormcache()
+    def _get_snapshot(self):
+        """
+        Build the immutable registry snapshot for the current version.
+
+        Returns:
+            dict: {
+                'version': int,
+                'providers': {capability: frozenset(modules)},
+                'capabilities_of': {module: tuple(capabilities)},
+                'closure': {capability: tuple(prerequisite capabilities)},
+                'chains': {capability: tuple(modules)},
+            }
+        """
+        rows = self.env['installment.dependency.capability'].sudo().search_read(
+            [], ['module_name', 'capability_name'],
+        )
+        providers = {}
+        capabilities_of = {}
+        for row in rows:
+            providers.setdefault(row['capability_name'], set()).add(row['module_name'])
+            capabilities_of.setdefault(row['module_name'], set()).add(row['capability_name'])
+
+        all_capabilities = set(providers) | set(self._capability_dependencies)
+        for deps in self._capability_dependencies.values():
+            all_capabilities.update(deps)
+
+        closure = {cap: self._compute_closure(cap) for cap in all_capabilities}
+        chains = {}
+        for cap, prerequisites in closure.items():
+            modules = set(providers.get(cap, ()))
+            for prerequisite in prerequisites:
+                modules.update(providers.get(prerequisite, ()))
+            chains[cap] = tuple(sorted(modules))
+
+        return {
+            'version': self._get_version(),
+            'providers': {cap: frozenset(mods) for cap, mods in providers.items()},
+            'capabilities_of': {mod: tuple(sorted(caps)) for mod, caps in capabilities_of.items()},
+            'closure': closure,
+            'chains': chains,
+        }
+
+    @api.model
+    def _compute_closure(self, capability_name):
+        """Transitive prerequisites of a capability, nearest first, without cycles."""
+        result = []
+        seen = {capability_name}
+        pending = list(self._capability_dependencies.get(capability_name, []))
+        while pending:
+            cap = pending.pop(0)
+            if cap in seen:
+                continue
+            seen.add(cap)
+            result.append(cap)
+            pending.extend(self._capability_dependencies.get(cap, []))
+        return tuple(result)
+
+    # ── Registration ──────────────────────────────────────────
+
     @api.model
     def register(self, module_name, capability_name):
         """
@@ -45,7 +143,16 @@ class InstallmentDependencyRegistry(models.Model):
             bool: True if registered successfully
         """
         try:
-            self._in_memory_registry[capability_name].add(module_name)
+            Capability = self.env['installment.dependency.capability'].sudo()
+            if not Capability.search_count([
+                ('module_name', '=', module_name),
+                ('capability_name', '=', capability_name),
+            ]):
+                Capability.create({
+                    'module_name': module_name,
+                    'capability_name': capability_name,
+                })
+                self._bump_version()
             _logger.debug(f"Registered {module_name} for capability {capability_name}")
             return True
         except Exception as e:
@@ -65,13 +172,61 @@ class InstallmentDependencyRegistry(models.Model):
             bool: True if unregistered successfully
         """
         try:
-            self._in_memory_registry[capability_name].discard(module_name)
+            rows = self.env['installment.dependency.capability'].sudo().search([
+                ('module_name', '=', module_name),
+                ('capability_name', '=', capability_name),
+            ])
+            if rows:
+                rows.unlink()
+                self._bump_version()
             _logger.debug(f"Unregistered {module_name} from capability {capability_name}")
             return True
         except Exception as e:
             _logger.error(f"Error unregistering {module_name}: {str(e)}")
             return False
 
+    @api.model
+    def _sync_installed_modules(self):
+        """
+        Register known modules that are installed and drop the ones that are not.
+
+        Only writes (and bumps the version) when something actually changed.
+
+        Returns:
+            bool: True if the stored registry was modified
+        """
+        installed = set(self.env['ir.module.module'].sudo().search([
+            ('name', 'in', list(self._module_capabilities)),
+            ('state', '=', 'installed'),
+        ]).mapped('name'))
+        wanted = {
+            (module, cap)
+            for module, caps in self._module_capabilities.items() if module in installed
+            for cap in caps
+        }
+
+        Capability = self.env['installment.dependency.capability'].sudo()
+        stored = Capability.search([('module_name', 'in', list(self._module_capabilities))])
+        current = {(row.module_name, row.capability_name): row for row in stored}
+
+        stale = Capability.browse([row.id for key, row in current.items() if key not in wanted])
+        missing = wanted - set(current)
+        if not stale and not missing:
+            return False
+
+        stale.unlink()
+        Capability.create([
+            {'module_name': module, 'capability_name': cap}
+            for module, cap in sorted(missing)
+        ])
+        self._bump_version()
+        _logger.info(
+            f"Installment capability registry synced: +{len(missing)} / -{len(stale)}"
+        )
+        return True
+
+    # ── Lookups ───────────────────────────────────────────────
+
     @api.model
     def is_available(self, capability_name):
         """
@@ -83,7 +238,7 @@ class InstallmentDependencyRegistry(models.Model):
         Returns:
             bool: True if any module provides this capability
         """
-        return bool(self._in_memory_registry.get(capability_name))
+        return capability_name in self._get_snapshot()['providers']
 
     @api.model
     def get_modules_for(self, capability_name):
@@ -96,7 +251,7 @@ class InstallmentDependencyRegistry(models.Model):
         Returns:
             list: List of module names
         """
-        return sorted(list(self._in_memory_registry.get(capability_name, set())))
+        return sorted(self._get_snapshot()['providers'].get(capability_name, ()))
 
     @api.model
     def get_capabilities_of(self, module_name):
@@ -109,10 +264,7 @@ class InstallmentDependencyRegistry(models.Model):
         Returns:
             list: List of capability names
         """
-        return sorted([
-            cap for cap, modules in self._in_memory_registry.items()
-            if module_name in modules
-        ])
+        return list(self._get_snapshot()['capabilities_of'].get(module_name, ()))
 
     @api.model
     def get_all_capabilities(self):
@@ -123,8 +275,8 @@ class InstallmentDependencyRegistry(models.Model):
             dict: {capability_name: [modules]}
         """
         return {
-            cap: sorted(list(modules))
-            for cap, modules in self._in_memory_registry.items()
+            cap: sorted(modules)
+            for cap, modules in self._get_snapshot()['providers'].items()
         }
 
     @api.model
@@ -138,20 +290,12 @@ class InstallmentDependencyRegistry(models.Model):
         Returns:
             list: Ordered list of required modules
         """
-        try:
-            capabilities_needed = self._get_capability_dependencies(capability_name)
-            modules = set()
-
-            for cap in capabilities_needed:
-                modules.update(self.get_modules_for(cap))
-
-            # Add the capability itself
-            modules.update(self.get_modules_for(capability_name))
-
-            return sorted(modules)  # Deterministic order
-        except Exception as e:
-            _logger.error(f"Error getting dependency chain for {capability_name}: {str(e)}")
-            return []
+        snapshot = self._get_snapshot()
+        chain = snapshot['chains'].get(capability_name)
+        if chain is None:
+            # Unknown capability: only its own providers (if any) are needed
+            chain = tuple(sorted(snapshot['providers'].get(capability_name, ())))
+        return list(chain)
 
     @api.model
     def _get_capability_dependencies(self, capability_name):
@@ -162,9 +306,9 @@ class InstallmentDependencyRegistry(models.Model):
             capability_name (str): Target capability
 
         Returns:
-            list: List of prerequisite capability names
+            list: List of prerequisite capability names (transitive)
         """
-        return self._capability_dependencies.get(capability_name, [])
+        return list(self._get_snapshot()['closure'].get(capability_name, ()))
 
     @api.model
     def validate_capability(self, capability_name):
@@ -181,13 +325,10 @@ class InstallmentDependencyRegistry(models.Model):
                 'chain': [ordered modules needed]
             }
         """
-        dependencies = self._get_capability_dependencies(capability_name)
-        all_deps = [capability_name] + dependencies
-
-        missing = []
-        for cap in all_deps:
-            if not self.is_available(cap):
-                missing.append(cap)
+        snapshot = self._get_snapshot()
+        providers = snapshot['providers']
+        all_deps = (capability_name,) + snapshot['closure'].get(capability_name, ())
+        missing = [cap for cap in all_deps if cap not in providers]
 
         return {
             'valid': len(missing) == 0,
@@ -203,8 +344,46 @@ class InstallmentDependencyRegistry(models.Model):
         Returns:
             dict: Complete registry information
         """
+        snapshot = self._get_snapshot()
+        capabilities = self.get_all_capabilities()
         return {
-            'capabilities': self.get_all_capabilities(),
-            'registry': dict(self._in_memory_registry),
+            'version': snapshot['version'],
+            'capabilities': capabilities,
+            'registry': capabilities,
             'capability_dependencies': self._capability_dependencies,
+            'capability_closure': {cap: list(deps) for cap, deps in snapshot['closure'].items()},
+        }
+
+    # ── Actions ───────────────────────────────────────────────
+
+    def action_refresh_registry(self):
+        """UI button: re-sync registrations with the installed modules."""
+        changed = self._sync_installed_modules()
+        message = _("Registry updated.") if changed else _("Registry already up to date.")
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Installment Dependency Registry"),
+                'message': "%s %s" % (message, _("Version: %s") % self._get_version()),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
+
+    def action_view_status(self):
+        """UI button: show capabilities and their providing modules."""
+        status = self.get_registry_status()
+        lines = [_("Version: %s") % status['version']]
+        for cap, modules in sorted(status['capabilities'].items()):
+            lines.append("%s: %s" % (cap, ", ".join(modules)))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Installment Dependency Registry"),
+                'message': "\n".join(lines),
+                'type': 'info',
+                'sticky': True,
+            },
         }
@@ -2,7 +2,7 @@
 {
     "name": "Inventory Extension",
     'sequence': 3,
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.1.0",
     "summary": "Filter Operation Type based on document type",
     "description": """
         This module filters the Operation Type dropdown in stock pickings
@@ -10,11 +10,18 @@
         - Receipts: Only show incoming operation types
         - Deliveries: Only show outgoing operation types
         - Internal Transfers: Only show internal operation types
+        Consignment receipts leave the goods owned by the consignor; a ledger per
+        consignor, product and month follows the received, sold and returned
+        quantities, and the sold quantities are billed per period in one run.
     """,
     "author": "Asmaa Hassaan",
-    "depends": ["stock"],
+    "depends": ["stock", "account"],
     "data": [
+        "security/ir.model.access.csv",
+        "data/ir_cron_data.xml",
         "views/stock_picking_views.xml",
+        "views/stock_consignment_ledger_views.xml",
+        "wizard/stock_consignment_settlement_views.xml",
     ],
     "license": "LGPL-3",
     'installable': True,
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+
+import psycopg2
+from dateutil.relativedelta import relativedelta
+
+from odoo import api, fields, models, Command, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, float_is_zero
+
+_logger = logging.getLogger(__name__)
+
+# Quantity columns of the ledger, in the product unit of measure.
+LEDGER_QUANTITIES = ('qty_received', 'qty_sold', 'qty_returned', 'qty_invoiced')
+
+
+class StockConsignmentLedger(models.Model):
+    """
+    Consigned quantities per consignor, product, company and month.
+
+    Received goods are the done move lines of consignment receipts (the
+    vendor is set as owner of the stock they bring in); sold and returned
+    goods are the done move lines taking stock owned by a consignor to a
+    customer or back to a vendor. Rows are adjusted with atomic SQL
+    increments when moves are done, so balances and settlements read the
+    ledger (read_group) rather than the stock.move history.
+    """
+    _name = 'stock.consignment.ledger'
+    _description = 'Consignment Ledger'
+    _order = 'period desc, partner_id, product_id'
+    _rec_name = 'product_id'
+
+    partner_id = fields.Many2one('res.partner', string='Consignor', required=True, readonly=True, index=True)
+    product_id = fields.Many2one('product.product', string='Product', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True)
+    period = fields.Date(string='Period', required=True, readonly=True, help='First day of the month of the moves.')
+    uom_id = fields.Many2one(related='product_id.uom_id', string='Unit')
+    qty_received = fields.Float(string='Received', digits='Product Unit of Measure', readonly=True)
+    qty_sold = fields.Float(string='Sold', digits='Product Unit of Measure', readonly=True)
+    qty_returned = fields.Float(
+        string='Returned',
+        digits='Product Unit of Measure',
+        readonly=True,
+        help='Quantity sent back to the consignor.',
+    )
+    qty_invoiced = fields.Float(
+        string='Settled',
+        digits='Product Unit of Measure',
+        readonly=True,
+        help='Sold quantity already billed by a consignment settlement.',
+    )
+    qty_to_invoice = fields.Float(
+        string='To Settle',
+        digits='Product Unit of Measure',
+        readonly=True,
+        help='Sold quantity not billed yet.',
+    )
+    qty_balance = fields.Float(
+        string='Balance',
+        digits='Product Unit of Measure',
+        readonly=True,
+        help='Received minus sold and returned quantity.',
+    )
+
+    _sql_constraints = [
+        (
+            'partner_product_company_period_uniq',
+            'unique(partner_id, product_id, company_id, period)',
+            'There is already a consignment ledger row for this consignor, product and period.',
+        ),
+    ]
+
+    @api.model
+    def _get_move_line_contributions(self, move_lines):
+        """
+        Ledger deltas of done move lines:
+        {(partner_id, product_id, company_id, period): {quantity column: delta}}
+        """
+        move_lines = move_lines.filtered(lambda line: line.owner_id and line.state == 'done')
+        if not move_lines:
+            return {}
+        consignors = self._get_consignors(move_lines)
+        contributions = defaultdict(lambda: defaultdict(float))
+        for line in move_lines:
+            owner = line.owner_id.commercial_partner_id
+            source, destination = line.location_id.usage, line.location_dest_id.usage
+            column, sign = None, 1
+            if line.picking_id.entry_type == 'consignment' and destination == 'internal' and source != 'internal':
+                column = 'qty_received'
+            elif (owner.id, line.product_id.id) not in consignors:
+                continue
+            elif source == 'internal' and destination == 'customer':
+                column = 'qty_sold'
+            elif source == 'customer' and destination == 'internal':
+                column, sign = 'qty_sold', -1
+            elif source == 'internal' and destination == 'supplier':
+                column = 'qty_returned'
+            if not column:
+                continue
+            period = fields.Date.to_date(line.date).replace(day=1)
+            key = (owner.id, line.product_id.id, line.company_id.id, period)
+            contributions[key][column] += sign * line.quantity_product_uom
+        return contributions
+
+    @api.model
+    def _get_consignors(self, move_lines):
+        """(consignor, product) pairs of the move lines that have consigned stock in the ledger."""
+        groups = self._read_group(
+            [
+                ('partner_id', 'in', move_lines.owner_id.commercial_partner_id.ids),
+                ('product_id', 'in', move_lines.product_id.ids),
+            ],
+            ['partner_id', 'product_id'],
+        )
+        return {(partner.id, product.id) for partner, product in groups}
+
+    @api.model
+    def _apply_move_lines(self, move_lines):
+        """Add the contributions of done move lines to the ledger."""
+        rows = []
+        for key, quantities in self._get_move_line_contributions(move_lines).items():
+            if all(float_is_zero(quantity, precision_digits=6) for quantity in quantities.values()):
+                continue
+            rows.append((*key, *(quantities.get(column, 0.0) for column in LEDGER_QUANTITIES)))
+        if rows:
+            self._upsert(rows)
+
+    @api.model
+    def _upsert(self, rows):
+        """
+        Add (partner_id, product_id, company_id, period, *LEDGER_QUANTITIES)
+        rows to the ledger, creating the missing rows, in one statement.
+        """
+        columns = SQL(", ").join(SQL.identifier(name) for name in (
+            'partner_id', 'product_id', 'company_id', 'period', *LEDGER_QUANTITIES,
+        ))
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO stock_consignment_ledger AS l (
+                %(columns)s, qty_to_invoice, qty_balance, create_uid, create_date, write_uid, write_date
+            )
+            SELECT v.*,
+                   v.qty_sold - v.qty_invoiced,
+                   v.qty_received - v.qty_sold - v.qty_returned,
+                   %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM (VALUES %(values)s) AS v(%(columns)s)
+            ON CONFLICT (partner_id, product_id, company_id, period) DO UPDATE SET
+                qty_received = l.qty_received + EXCLUDED.qty_received,
+                qty_sold = l.qty_sold + EXCLUDED.qty_sold,
+                qty_returned = l.qty_returned + EXCLUDED.qty_returned,
+                qty_invoiced = l.qty_invoiced + EXCLUDED.qty_invoiced,
+                qty_to_invoice = l.qty_to_invoice + EXCLUDED.qty_to_invoice,
+                qty_balance = l.qty_balance + EXCLUDED.qty_balance,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+            """,
+            columns=columns,
+            values=SQL(", ").join(
+                SQL("(%s::int, %s::int, %s::int, %s::date, %s::float8, %s::float8, %s::float8, %s::float8)", *row)
+                for row in rows
+            ),
+            uid=self.env.uid,
+            now=now,
+        ))
+        self.invalidate_model()
+
+    # ------------------------------------------------------------------
+    # Settlement
+    # ------------------------------------------------------------------
+    @api.model
+    def _cron_settle(self):
+        """Settle the sold quantities up to the end of the previous month."""
+        self._settle(fields.Date.context_today(self).replace(day=1) - relativedelta(days=1))
+
+    @api.model
+    def _settle(self, date_to, partners=None, companies=None):
+        """
+        Bill the sold quantities not settled yet of the periods up to
+        `date_to`: one vendor bill per consignor and company, created in one
+        batch, and one ledger update marking the quantities as settled.
+        """
+        domain = [('period', '<=', date_to), ('qty_to_invoice', '>', 0)]
+        if partners:
+            domain.append(('partner_id', 'in', partners.ids))
+        if companies:
+            domain.append(('company_id', 'in', companies.ids))
+        rows = self.search(domain)
+        if not rows:
+            return self.env['account.move']
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(SQL(
+                    "SELECT id FROM stock_consignment_ledger WHERE id = ANY(%s) FOR UPDATE NOWAIT", rows.ids,
+                ))
+        except psycopg2.errors.LockNotAvailable:
+            raise UserError(_("A consignment settlement or delivery is updating these consignors, try again later."))
+        rows.invalidate_recordset()
+        rows.fetch(['partner_id', 'product_id', 'company_id', 'period', 'qty_to_invoice'])
+
+        bill_vals = []
+        settled = []
+        for (partner, company), partner_rows in rows.grouped(lambda row: (row.partner_id, row.company_id)).items():
+            quantities = defaultdict(float)
+            for row in partner_rows:
+                quantities[row.product_id] += row.qty_to_invoice
+                settled.append((row.id, row.qty_to_invoice))
+            bill_vals.append({
+                'move_type': 'in_invoice',
+                'partner_id': partner.id,
+                'company_id': company.id,
+                'invoice_date': date_to,
+                'invoice_origin': _("Consignment settlement up to %s", fields.Date.to_string(date_to)),
+                'invoice_line_ids': [
+                    Command.create(self._prepare_settlement_line(partner, company, product, quantity, date_to))
+                    for product, quantity in quantities.items()
+                ],
+            })
+        bills = self.env['account.move'].create(bill_vals)
+
+        self.env.cr.execute(SQL(
+            """
+            UPDATE stock_consignment_ledger l
+            SET qty_invoiced = l.qty_invoiced + v.qty,
+                qty_to_invoice = l.qty_to_invoice - v.qty,
+                write_uid = %s,
+                write_date = %s
+            FROM (VALUES %s) AS v(id, qty)
+            WHERE l.id = v.id
+            """,
+            self.env.uid,
+            fields.Datetime.now(),
+            SQL(", ").join(SQL("(%s::int, %s::float8)", row_id, quantity) for row_id, quantity in settled),
+        ))
+        self.invalidate_model()
+        _logger.info(f"Consignment settlement up to {date_to}: {len(bills)} bills for {len(settled)} ledger rows")
+        return bills
+
+    @api.model
+    def _prepare_settlement_line(self, partner, company, product, quantity, date):
+        """Bill line of a sold consigned product, priced with the consignor's vendor price."""
+        seller = product.with_company(company)._select_seller(
+            partner_id=partner, quantity=quantity, date=date, uom_id=product.uom_id,
+        )
+        if seller:
+            price = seller.product_uom._compute_price(seller.price, product.uom_id)
+            price = seller.currency_id._convert(price, company.currency_id, company, date)
+        else:
+            price = product.with_company(company).standard_price
+        return {
+            'product_id': product.id,
+            'quantity': quantity,
+            'product_uom_id': product.uom_id.id,
+            'price_unit': price,
+        }
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        self.env['stock.consignment.ledger'].sudo()._apply_move_lines(moves.move_line_ids)
+        return moves
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
 
 
 class StockPicking(models.Model):
@@ -48,3 +49,10 @@ class StockPicking(models.Model):
         if self.picking_type_id:
             self.operation_type_code = self.picking_type_id.code
 
+    def _action_done(self):
+        """Consigned goods stay the vendor's: the consignor owns the stock a consignment receipt brings in"""
+        for picking in self.filtered(lambda p: p.entry_type == 'consignment' and not p.owner_id):
+            if not picking.partner_id:
+                raise UserError(_("Set the consignor as partner of the consignment receipt %s.", picking.name))
+            picking.owner_id = picking.partner_id.commercial_partner_id
+        return super()._action_done()
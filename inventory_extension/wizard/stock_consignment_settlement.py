@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from dateutil.relativedelta import relativedelta
+
+from odoo import _, fields, models
+from odoo.exceptions import UserError
+
+
+class StockConsignmentSettlement(models.TransientModel):
+    """Bill the consignors for the consigned goods sold up to a month."""
+    _name = 'stock.consignment.settlement'
+    _description = 'Consignment Settlement'
+
+    date_to = fields.Date(
+        string='Up To',
+        required=True,
+        default=lambda self: fields.Date.context_today(self).replace(day=1) - relativedelta(days=1),
+        help='Sales of the months up to and including the month of this date are settled; it is also the bill date.',
+    )
+    partner_ids = fields.Many2many('res.partner', string='Consignors', help='Leave empty to settle every consignor.')
+    company_ids = fields.Many2many(
+        'res.company',
+        string='Companies',
+        default=lambda self: self.env.company,
+    )
+
+    def action_settle(self):
+        self.ensure_one()
+        bills = self.env['stock.consignment.ledger']._settle(
+            self.date_to, partners=self.partner_ids, companies=self.company_ids,
+        )
+        if not bills:
+            raise UserError(_("There are no sold consigned quantities to settle up to %s.", self.date_to))
+        action = self.env['ir.actions.act_window']._for_xml_id('account.action_move_in_invoice_type')
+        action['domain'] = [('id', 'in', bills.ids)]
+        action['context'] = {'default_move_type': 'in_invoice'}
+        return action
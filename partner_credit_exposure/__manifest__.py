@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+{
+    "name": "Partner Credit Exposure",
+    "version": "18.0.1.0.0",
+    "summary": "Incremental installment exposure ledger and credit limit checks per customer",
+    "description": """
+        Keeps the outstanding installment exposure of each commercial partner:
+        - Residual of installments of posted customer invoices
+        - Residual of installment previews of confirmed orders not invoiced yet
+        The ledger is adjusted incrementally when installments are created, paid,
+        rescheduled or removed and when their invoice or order changes state, so the
+        Max Installments Amount of the customer is checked with one ledger read when
+        an order is confirmed or an invoice is posted. A nightly job rebuilds the
+        ledger from the installments and reports any drift.
+    """,
+    "category": "Accounting/Accounting",
+    "author": "Asmaa Hassaan",
+    "depends": ["contact_extension", "account_invoice_installments"],
+    "data": [
+        "security/ir.model.access.csv",
+        "data/ir_cron_data.xml",
+        "views/partner_credit_exposure_views.xml",
+    ],
+    "license": "LGPL-3",
+    "installable": True,
+    "application": False,
+    "auto_install": False,
+}
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from . import partner_credit_exposure
+from . import account_move_installment
+from . import account_move
+from . import sale_order
+from . import res_partner
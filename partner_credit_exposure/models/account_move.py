@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+from .partner_credit_exposure import CUSTOMER_MOVE_TYPES
+
+# Invoice fields whose change moves the exposure of its installments and of its orders' previews.
+EXPOSURE_MOVE_FIELDS = {'state', 'partner_id', 'move_type', 'company_id'}
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        if not EXPOSURE_MOVE_FIELDS & set(vals):
+            return super().write(vals)
+        orders = self.line_ids.sale_line_ids.order_id
+        with self.env['partner.credit.exposure']._track(self.installment_ids, orders.installment_preview_ids):
+            return super().write(vals)
+
+    def action_post(self):
+        invoices = self.filtered(lambda move: move.move_type in CUSTOMER_MOVE_TYPES)
+        if not invoices:
+            return super().action_post()
+        Exposure = self.env['partner.credit.exposure']
+        partners = invoices.commercial_partner_id
+        totals_before = Exposure._get_exposure_totals(partners)
+        result = super().action_post()
+        Exposure._check_installment_limits(partners, totals_before)
+        return result
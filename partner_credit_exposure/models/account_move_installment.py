@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import api, models
+
+from .partner_credit_exposure import CUSTOMER_MOVE_TYPES
+
+# Installment fields whose change can move the exposure.
+EXPOSURE_INSTALLMENT_FIELDS = {'amount_total', 'amount_paid', 'move_id'}
+
+
+class AccountMoveInstallment(models.Model):
+    _inherit = 'account.move.installment'
+
+    def _get_credit_exposure_contributions(self):
+        """(commercial partner, company, currency) -> [invoice exposure, order exposure]"""
+        contributions = defaultdict(lambda: [0.0, 0.0])
+        for installment in self:
+            move = installment.move_id
+            if move.state == 'posted' and move.move_type in CUSTOMER_MOVE_TYPES \
+                    and move.commercial_partner_id and installment.amount_residual > 0:
+                key = (move.commercial_partner_id.id, move.company_id.id, installment.currency_id.id)
+                contributions[key][0] += installment.amount_residual
+        return contributions
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        installments = super().create(vals_list)
+        self.env['partner.credit.exposure']._apply_contributions(
+            {}, installments._get_credit_exposure_contributions(),
+        )
+        return installments
+
+    def write(self, vals):
+        if not EXPOSURE_INSTALLMENT_FIELDS & set(vals):
+            return super().write(vals)
+        with self.env['partner.credit.exposure']._track(self):
+            return super().write(vals)
+
+    def unlink(self):
+        with self.env['partner.credit.exposure']._track(self):
+            return super().unlink()
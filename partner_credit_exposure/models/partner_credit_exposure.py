@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, float_compare, float_is_zero
+
+_logger = logging.getLogger(__name__)
+
+# Customer documents whose installments count towards the exposure.
+CUSTOMER_MOVE_TYPES = ('out_invoice', 'out_receipt')
+RECONCILE_BATCH_SIZE = 10000
+
+
+def _empty_contributions():
+    return defaultdict(lambda: [0.0, 0.0])
+
+
+class PartnerCreditExposure(models.Model):
+    """
+    Outstanding installment exposure per commercial partner, company and currency.
+
+    invoice_amount is the residual of the installments of posted customer
+    invoices, order_amount the residual of the installment previews of confirmed
+    orders without a posted invoice yet. Rows are adjusted incrementally with
+    atomic SQL increments whenever an installment or the state of its invoice or
+    order changes (see _track); _reconcile_exposure rebuilds them from the
+    installments and records the drift it corrected.
+    """
+    _name = 'partner.credit.exposure'
+    _description = 'Partner Credit Exposure'
+    _order = 'partner_id, company_id, currency_id'
+    _rec_name = 'partner_id'
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Customer',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help='Commercial partner the exposure is accounted on.',
+    )
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one('res.currency', string='Currency', required=True, readonly=True)
+    invoice_amount = fields.Monetary(
+        string='Invoiced Exposure',
+        currency_field='currency_id',
+        readonly=True,
+        help='Remaining amount of the installments of posted customer invoices.',
+    )
+    order_amount = fields.Monetary(
+        string='Ordered Exposure',
+        currency_field='currency_id',
+        readonly=True,
+        help='Remaining amount of the installments of confirmed orders that are not invoiced yet.',
+    )
+    amount_total = fields.Monetary(
+        string='Total Exposure',
+        currency_field='currency_id',
+        compute='_compute_amount_total',
+    )
+    drift_amount = fields.Monetary(
+        string='Last Drift',
+        currency_field='currency_id',
+        readonly=True,
+        help='Difference between the ledger and the installments found by the last reconciliation.',
+    )
+    reconciled_at = fields.Datetime(string='Last Reconciliation', readonly=True)
+
+    _sql_constraints = [
+        (
+            'partner_company_currency_uniq',
+            'unique(partner_id, company_id, currency_id)',
+            'There is already an exposure row for this customer, company and currency.',
+        ),
+    ]
+
+    @api.depends('invoice_amount', 'order_amount')
+    def _compute_amount_total(self):
+        for exposure in self:
+            exposure.amount_total = exposure.invoice_amount + exposure.order_amount
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _track(self, *recordsets):
+        """
+        Adjust the ledger by the change of exposure of the given installments
+        (account.move.installment / sale.order.installment) made in the block.
+        """
+        before = self._get_contributions(recordsets)
+        yield
+        after = self._get_contributions(records.exists() for records in recordsets)
+        self._apply_contributions(before, after)
+
+    @api.model
+    def _get_contributions(self, recordsets):
+        contributions = _empty_contributions()
+        for records in recordsets:
+            for key, (invoice_amount, order_amount) in records._get_credit_exposure_contributions().items():
+                contributions[key][0] += invoice_amount
+                contributions[key][1] += order_amount
+        return contributions
+
+    @api.model
+    def _apply_contributions(self, before, after):
+        """Add `after - before` to the ledger rows, creating missing rows, in one statement."""
+        deltas = []
+        for key in set(before) | set(after):
+            old = before.get(key, (0.0, 0.0))
+            new = after.get(key, (0.0, 0.0))
+            invoice_delta, order_delta = new[0] - old[0], new[1] - old[1]
+            if not (float_is_zero(invoice_delta, precision_digits=6) and float_is_zero(order_delta, precision_digits=6)):
+                deltas.append((*key, invoice_delta, order_delta))
+        if not deltas:
+            return
+        self._upsert(deltas, SQL(
+            """
+            invoice_amount = partner_credit_exposure.invoice_amount + EXCLUDED.invoice_amount,
+            order_amount = partner_credit_exposure.order_amount + EXCLUDED.order_amount,
+            write_uid = EXCLUDED.write_uid,
+            write_date = EXCLUDED.write_date
+            """
+        ))
+
+    @api.model
+    def _upsert(self, rows, on_conflict, extra_columns=()):
+        """
+        Insert (partner_id, company_id, currency_id, invoice_amount, order_amount,
+        *extra_columns) rows, resolving existing keys with the `on_conflict`
+        assignments.
+        """
+        columns = SQL(", ").join(SQL.identifier(name) for name in (
+            'partner_id', 'company_id', 'currency_id', 'invoice_amount', 'order_amount',
+            *extra_columns, 'create_uid', 'create_date', 'write_uid', 'write_date',
+        ))
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO partner_credit_exposure (%s)
+            VALUES %s
+            ON CONFLICT (partner_id, company_id, currency_id) DO UPDATE SET %s
+            """,
+            columns,
+            SQL(", ").join(
+                SQL("(%s)", SQL(", ").join(
+                    [*row, self.env.uid, now, self.env.uid, now]
+                ))
+                for row in rows
+            ),
+            on_conflict,
+        ))
+        self.invalidate_model()
+
+    # ------------------------------------------------------------------
+    # Limit checks
+    # ------------------------------------------------------------------
+    @api.model
+    def _get_exposure_totals(self, partners):
+        """Total exposure of each commercial partner, in its limit currency: one ledger read."""
+        partners = partners.commercial_partner_id
+        totals = dict.fromkeys(partners.ids, 0.0)
+        if not partners:
+            return totals
+        today = fields.Date.context_today(self)
+        for exposure in self.sudo().search_fetch(
+            [('partner_id', 'in', partners.ids)],
+            ['partner_id', 'company_id', 'currency_id', 'invoice_amount', 'order_amount'],
+        ):
+            partner = exposure.partner_id
+            limit_currency = partner.currency_id or exposure.company_id.currency_id
+            totals[partner.id] += exposure.currency_id._convert(
+                exposure.invoice_amount + exposure.order_amount, limit_currency, exposure.company_id, today,
+            )
+        return totals
+
+    @api.model
+    def _check_installment_limits(self, partners, totals_before):
+        """
+        Raise when the operation raised the exposure of a customer above its
+        Max Installments Amount (0 means no limit). Exposure that was already
+        above the limit and did not grow is left alone.
+        """
+        partners = partners.commercial_partner_id.filtered('max_installments_amount')
+        if not partners:
+            return
+        totals = self._get_exposure_totals(partners)
+        errors = []
+        for partner in partners:
+            currency = partner.currency_id or self.env.company.currency_id
+            total = totals[partner.id]
+            if float_compare(total, partner.max_installments_amount, precision_rounding=currency.rounding) > 0 \
+                    and float_compare(total, totals_before.get(partner.id, 0.0), precision_rounding=currency.rounding) > 0:
+                errors.append(_(
+                    "%(partner)s: outstanding installments of %(total)s exceed the maximum installments amount of %(limit)s.",
+                    partner=partner.display_name,
+                    total=currency.format(total),
+                    limit=currency.format(partner.max_installments_amount),
+                ))
+        if errors:
+            raise UserError('\n'.join(errors))
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+    @api.model
+    def _cron_reconcile_exposure(self):
+        self._reconcile_exposure()
+
+    @api.model
+    def _compute_exposure_from_installments(self):
+        """Exposure per (partner, company, currency) computed in SQL from the installments."""
+        self.env.flush_all()
+        cr = self.env.cr
+        exposure = _empty_contributions()
+        cr.execute(
+            """
+            SELECT m.commercial_partner_id, m.company_id, i.currency_id, SUM(i.amount_residual)
+            FROM account_move_installment i
+            JOIN account_move m ON m.id = i.move_id
+            WHERE m.state = 'posted'
+              AND m.move_type IN %s
+              AND m.commercial_partner_id IS NOT NULL
+              AND i.amount_residual > 0
+            GROUP BY 1, 2, 3
+            """,
+            [CUSTOMER_MOVE_TYPES],
+        )
+        for partner_id, company_id, currency_id, amount in cr.fetchall():
+            exposure[partner_id, company_id, currency_id][0] += amount
+        cr.execute(
+            """
+            SELECT p.commercial_partner_id, o.company_id, i.currency_id, SUM(i.amount_residual)
+            FROM sale_order_installment i
+            JOIN sale_order o ON o.id = i.sale_order_id
+            JOIN res_partner p ON p.id = o.partner_id
+            WHERE o.state = 'sale'
+              AND i.amount_residual > 0
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM sale_order_line sol
+                  JOIN sale_order_line_invoice_rel rel ON rel.order_line_id = sol.id
+                  JOIN account_move_line aml ON aml.id = rel.invoice_line_id
+                  JOIN account_move am ON am.id = aml.move_id
+                  WHERE sol.order_id = o.id
+                    AND am.state = 'posted'
+                    AND am.move_type IN ('out_invoice', 'out_refund')
+              )
+            GROUP BY 1, 2, 3
+            """
+        )
+        for partner_id, company_id, currency_id, amount in cr.fetchall():
+            exposure[partner_id, company_id, currency_id][1] += amount
+        return exposure
+
+    @api.model
+    def _reconcile_exposure(self):
+        """
+        Rebuild the ledger from the installments in bulk and record, on every
+        row, the drift the incremental maintenance had accumulated.
+        """
+        expected = self._compute_exposure_from_installments()
+        self.env.cr.execute(
+            "SELECT partner_id, company_id, currency_id, invoice_amount, order_amount FROM partner_credit_exposure"
+        )
+        stored = {
+            (partner_id, company_id, currency_id): (invoice_amount or 0.0, order_amount or 0.0)
+            for partner_id, company_id, currency_id, invoice_amount, order_amount in self.env.cr.fetchall()
+        }
+        now = fields.Datetime.now()
+        rows = []
+        drifted = 0
+        total_drift = 0.0
+        for key in set(expected) | set(stored):
+            invoice_amount, order_amount = expected.get(key, (0.0, 0.0))
+            old_invoice_amount, old_order_amount = stored.get(key, (0.0, 0.0))
+            drift = (old_invoice_amount + old_order_amount) - (invoice_amount + order_amount)
+            if not float_is_zero(drift, precision_digits=2):
+                drifted += 1
+                total_drift += abs(drift)
+            rows.append((*key, invoice_amount, order_amount, drift, now))
+
+        for start in range(0, len(rows), RECONCILE_BATCH_SIZE):
+            self._upsert(
+                rows[start:start + RECONCILE_BATCH_SIZE],
+                SQL(
+                    """
+                    invoice_amount = EXCLUDED.invoice_amount,
+                    order_amount = EXCLUDED.order_amount,
+                    drift_amount = EXCLUDED.drift_amount,
+                    reconciled_at = EXCLUDED.reconciled_at,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                    """
+                ),
+                extra_columns=('drift_amount', 'reconciled_at'),
+            )
+        if drifted:
+            _logger.warning(
+                f"Credit exposure reconciliation corrected {drifted} of {len(rows)} ledger rows, "
+                f"total absolute drift {total_drift:.2f}"
+            )
+        else:
+            _logger.info(f"Credit exposure reconciliation checked {len(rows)} ledger rows, no drift")
+        return {'rows': len(rows), 'drifted': drifted, 'drift': total_drift}
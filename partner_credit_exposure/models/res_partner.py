@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    installment_exposure_amount = fields.Monetary(
+        string='Outstanding Installments',
+        currency_field='currency_id',
+        compute='_compute_installment_exposure_amount',
+        help='Remaining installments of posted invoices and confirmed orders of the commercial partner, '
+             'checked against the Max Installments Amount.',
+    )
+
+    def _compute_installment_exposure_amount(self):
+        totals = self.env['partner.credit.exposure']._get_exposure_totals(self)
+        for partner in self:
+            partner.installment_exposure_amount = totals.get(partner.commercial_partner_id.id, 0.0)
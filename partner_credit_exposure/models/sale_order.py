@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import api, models
+
+# Fields whose change can move the exposure of an order's installment previews.
+EXPOSURE_ORDER_FIELDS = {'state', 'partner_id', 'company_id'}
+EXPOSURE_PREVIEW_FIELDS = {'amount_total', 'amount_paid', 'sale_order_id'}
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    def write(self, vals):
+        if not EXPOSURE_ORDER_FIELDS & set(vals):
+            return super().write(vals)
+        with self.env['partner.credit.exposure']._track(self.installment_preview_ids):
+            return super().write(vals)
+
+    def action_confirm(self):
+        Exposure = self.env['partner.credit.exposure']
+        partners = self.partner_id.commercial_partner_id
+        totals_before = Exposure._get_exposure_totals(partners)
+        result = super().action_confirm()
+        Exposure._check_installment_limits(partners, totals_before)
+        return result
+
+
+class SaleOrderInstallment(models.Model):
+    _inherit = 'sale.order.installment'
+
+    def _get_credit_exposure_contributions(self):
+        """
+        (commercial partner, company, currency) -> [invoice exposure, order exposure];
+        a confirmed order stops counting once one of its invoices is posted.
+        """
+        contributions = defaultdict(lambda: [0.0, 0.0])
+        for installment in self:
+            order = installment.sale_order_id
+            if order.state != 'sale' or installment.amount_residual <= 0:
+                continue
+            if any(invoice.state == 'posted' for invoice in order.invoice_ids):
+                continue
+            key = (order.partner_id.commercial_partner_id.id, order.company_id.id, installment.currency_id.id)
+            contributions[key][1] += installment.amount_residual
+        return contributions
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        installments = super().create(vals_list)
+        self.env['partner.credit.exposure']._apply_contributions(
+            {}, installments._get_credit_exposure_contributions(),
+        )
+        return installments
+
+    def write(self, vals):
+        if not EXPOSURE_PREVIEW_FIELDS & set(vals):
+            return super().write(vals)
+        with self.env['partner.credit.exposure']._track(self):
+            return super().write(vals)
+
+    def unlink(self):
+        with self.env['partner.credit.exposure']._track(self):
+            return super().unlink()
@@ -9,15 +9,20 @@
         - Context variables: price, cost, qty, installment_num, first_payment
         - Safe expression evaluation with error handling
         - Real-time price updates on installment changes
+        - Optional materialized price matrix per pricelist (variant x payment plan)
+        - Catalog-wide simulation of candidate expressions (requires numpy)
     """,
     "version": "18.0.1.0.0",
     "category": "Sales/Price Lists",
     "author": "Your Company",
     "depends": ["product", "sale", "account", "account_invoice_installments"],
     "data": [
+        "wizard/pricelist_item_simulation_views.xml",
         "views/pricelist_item_views.xml",
         "views/account_move_views.xml",
         "views/res_config_settings_views.xml",
+        "views/pricelist_price_matrix_views.xml",
+        "data/ir_cron_data.xml",
         "security/ir.model.access.csv"
     ],
     "i18n": [
@@ -2,6 +2,8 @@
 from . import product_pricelist_item
 from . import product_pricelist_item_variable
 from . import product_pricelist
+from . import product_pricelist_price_matrix
+from . import product_product
 from . import sale_order_line
 from . import account_move
 from . import res_config_settings
\ No newline at end of file
@@ -1,6 +1,29 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models
 from odoo.tools.misc import str2bool
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Models whose fields an expression variable may read from the invoice line
+# itself; they are part of the line's pricing fingerprint.
+_FINGERPRINT_VARIABLE_MODELS = ('account.move.line', 'account.move', 'product.product')
+# Installment inputs of the move and of the line (per-lines scope) that the
+# pricelist sees through the payment plan; part of the line's fingerprint.
+_FINGERPRINT_MOVE_PLAN_FIELDS = (
+    'payment_type',
+    'scope',
+    'apply_payment_term_per_line',
+    'installment_count',
+    'first_payment_type',
+    'first_payment_percentage',
+)
+_FINGERPRINT_LINE_PLAN_FIELDS = (
+    'line_installment_count',
+    'line_first_payment_type',
+    'line_first_payment_percentage',
+)
 
 
 class AccountMove(models.Model):
@@ -56,19 +79,28 @@ class AccountMove(models.Model):
             lambda line: line.product_id and line.display_type in (False, 'product')
         )
 
-    def _get_invoice_pricelist_context(self, line=False):
+    def _get_invoice_pricelist_plan(self, line=False):
+        """Payment plan values the pricelist sees for the move (or the line, per-lines scope)."""
         self.ensure_one()
-        ctx = dict(self.env.context or {})
-        ctx['payment_type'] = getattr(self, 'payment_type', False)
         if (
             (getattr(self, 'scope', False) == 'per_lines' or getattr(self, 'apply_payment_term_per_line', False))
             and line
         ):
-            ctx['installment_num'] = float(getattr(line, 'line_installment_count', 0.0) or 0.0)
-            ctx['first_payment'] = float(getattr(line, 'line_first_payment_percentage', 0.0) or 0.0)
+            installment_num = float(getattr(line, 'line_installment_count', 0.0) or 0.0)
+            first_payment = float(getattr(line, 'line_first_payment_percentage', 0.0) or 0.0)
         else:
-            ctx['installment_num'] = float(getattr(self, 'installment_count', 0.0) or 0.0)
-            ctx['first_payment'] = float(getattr(self, 'first_payment_percentage', 0.0) or 0.0)
+            installment_num = float(getattr(self, 'installment_count', 0.0) or 0.0)
+            first_payment = float(getattr(self, 'first_payment_percentage', 0.0) or 0.0)
+        return {
+            'payment_type': getattr(self, 'payment_type', False),
+            'installment_num': installment_num,
+            'first_payment': first_payment,
+        }
+
+    def _get_invoice_pricelist_context(self, line=False):
+        self.ensure_one()
+        ctx = dict(self.env.context or {})
+        ctx.update(self._get_invoice_pricelist_plan(line))
         if self.invoice_pricelist_id:
             ctx['pricelist_expression_sources'] = self.invoice_pricelist_id._build_expression_sources(
                 move_line=line,
@@ -154,6 +186,24 @@ class AccountMove(models.Model):
 class AccountMoveLine(models.Model):
     _inherit = 'account.move.line'
 
+    # Computed with price_unit, so every path that applies a pricelist price
+    # records the inputs it was applied for.
+    invoice_pricelist_fingerprint = fields.Char(
+        compute='_compute_price_unit',
+        store=True,
+        precompute=True,
+        copy=False,
+        help='Pricing inputs of the line when its pricelist price was last applied.',
+    )
+    invoice_pricelist_price = fields.Float(
+        compute='_compute_price_unit',
+        store=True,
+        precompute=True,
+        digits='Product Price',
+        copy=False,
+        help='Pricelist price applied for invoice_pricelist_fingerprint.',
+    )
+
     def _get_linked_sale_order_price_unit(self):
         """Return SO line unit price when this invoice line comes from a sales order."""
         self.ensure_one()
@@ -171,22 +221,115 @@ class AccountMoveLine(models.Model):
         else:
             self.price_unit = price
 
+    def _get_invoice_pricelist_fingerprints(self):
+        """
+        Fingerprint of the inputs that determine each line's pricelist price.
+
+        Covers product (and its last update), quantity, UoM, pricelist and its
+        rules, currency, pricing date, the installment inputs of the invoice
+        and the line (payment plan, scope, installment count, first payment),
+        the payment plan values derived from them and the line, invoice and
+        product fields read by expression variables.
+
+        Returns:
+            dict: line -> hex digest
+        """
+        pricelist_data = {}
+        fingerprints = {}
+        for line in self:
+            move = line.move_id
+            pricelist = move.invoice_pricelist_id
+            if pricelist not in pricelist_data:
+                pricelist_data[pricelist] = (
+                    pricelist._get_rules_version() if pricelist else False,
+                    sorted(
+                        (model_name, field_name)
+                        for model_name, field_name in pricelist._get_configured_expression_fields()
+                        if model_name in _FINGERPRINT_VARIABLE_MODELS
+                    ) if pricelist else [],
+                )
+            rules_version, variable_fields = pricelist_data[pricelist]
+            product = line.product_id
+            records = {
+                'account.move.line': line,
+                'account.move': move,
+                'product.product': product,
+            }
+            values = (
+                product.id,
+                str(product.write_date),
+                str(product.product_tmpl_id.write_date),
+                line.quantity,
+                (line.product_uom_id or product.uom_id).id,
+                pricelist.id,
+                rules_version,
+                move.currency_id.id,
+                str(move.invoice_date or move.date or ''),
+                sorted(move._get_invoice_pricelist_plan(line).items()),
+                [
+                    (field_name, records[model_name][field_name])
+                    for model_name, field_names in (
+                        ('account.move', _FINGERPRINT_MOVE_PLAN_FIELDS),
+                        ('account.move.line', _FINGERPRINT_LINE_PLAN_FIELDS),
+                    )
+                    for field_name in field_names
+                    if field_name in records[model_name]._fields
+                ],
+                [
+                    (model_name, field_name, repr(records[model_name][field_name]))
+                    for model_name, field_name in variable_fields
+                    if field_name in records[model_name]._fields
+                ],
+            )
+            fingerprints[line] = hashlib.sha1(repr(values).encode()).hexdigest()
+        return fingerprints
+
+    def _get_invoice_pricelist_repricing(self):
+        """
+        New pricelist price of the lines whose pricing inputs changed since
+        their price was last applied. A line with an unchanged fingerprint is
+        not evaluated again and keeps the price the user sees, including a
+        price corrected by hand.
+
+        Returns:
+            dict: line -> (fingerprint, price)
+        """
+        fingerprints = self._get_invoice_pricelist_fingerprints()
+        repricing = {
+            line: (fingerprints[line], line.move_id._get_invoice_pricelist_price(line))
+            for line in self
+            if fingerprints[line] != line.invoice_pricelist_fingerprint
+        }
+        if repricing:
+            _logger.debug(f"Invoice pricelist: repriced {len(repricing)} of {len(self)} lines")
+        return repricing
+
     def _recompute_price_from_invoice_pricelist(self):
         """Update line unit price from invoice pricelist.
 
         During UI onchange the parent move may not be persisted yet; assign
         price_unit in memory instead of write() to avoid unbalanced-move SQL.
         Lines created from sales orders keep the sale order line unit price.
+        Only lines whose pricing inputs changed are evaluated again.
         """
+        to_price = self.env['account.move.line']
         for line in self.filtered(lambda item: item.product_id and item.move_id):
             linked_price = line._get_linked_sale_order_price_unit()
             if linked_price is not None:
                 line._set_invoice_line_price_unit(linked_price)
                 continue
-            if not line.move_id._should_apply_invoice_pricelist():
-                continue
-            price = line.move_id._get_invoice_pricelist_price(line)
-            line._set_invoice_line_price_unit(price)
+            if line.move_id._should_apply_invoice_pricelist():
+                to_price |= line
+        for line, (fingerprint, price) in to_price._get_invoice_pricelist_repricing().items():
+            vals = {
+                'price_unit': price,
+                'invoice_pricelist_fingerprint': fingerprint,
+                'invoice_pricelist_price': price,
+            }
+            if line.id and line.move_id.id:
+                line.with_context(skip_invoice_pricelist_price=True).write(vals)
+            else:
+                line.update(vals)
 
     @api.depends(
         'product_id',
@@ -206,13 +349,26 @@ class AccountMoveLine(models.Model):
         'line_first_payment_percentage',
     )
     def _compute_price_unit(self):
+        # Read before the standard compute resets it: lines whose pricing
+        # inputs did not change keep the price the user sees.
+        current_prices = {line: line.price_unit for line in self}
         super()._compute_price_unit()
         if self.env.context.get('skip_invoice_pricelist_price'):
             return
+        to_price = self.env['account.move.line']
         for line in self.filtered(lambda item: item.product_id and item.move_id):
             linked_price = line._get_linked_sale_order_price_unit()
             if linked_price is not None:
                 line.price_unit = linked_price
                 continue
             if line.move_id._should_apply_invoice_pricelist():
-                line.price_unit = line.move_id._get_invoice_pricelist_price(line)
+                to_price |= line
+        repricing = to_price._get_invoice_pricelist_repricing()
+        for line in to_price:
+            if line not in repricing:
+                line.price_unit = current_prices[line]
+                continue
+            fingerprint, price = repricing[line]
+            line.price_unit = price
+            line.invoice_pricelist_fingerprint = fingerprint
+            line.invoice_pricelist_price = price
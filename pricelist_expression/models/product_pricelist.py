@@ -1,21 +1,259 @@
 # -*- coding: utf-8 -*-
-from odoo import models
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools import split_every
+from collections.abc import Mapping
 import logging
 
 _logger = logging.getLogger(__name__)
 
+
+def parse_number_list(value):
+    """'0, 6,12' -> [0.0, 6.0, 12.0] (sorted, unique); empty -> [0.0]. Raises ValueError."""
+    return sorted({float(part) for part in (value or '').split(',') if part.strip()}) or [0.0]
+
+
+class ExpressionSources(Mapping):
+    """
+    Field-value maps for expression variables, keyed by model name.
+
+    A model's record is only looked up (and its fields read) the first time
+    a variable of that model is resolved, i.e. when the rule that matched
+    actually references it. Installment lookups therefore cost nothing for
+    rules that do not use installment variables.
+    """
+
+    def __init__(self, fields_by_model, loaders):
+        self._fields_by_model = fields_by_model
+        self._loaders = loaders
+        self._loaded = {}
+
+    def __getitem__(self, model_name):
+        if model_name not in self._loaded:
+            field_names = self._fields_by_model[model_name]
+            loader = self._loaders.get(model_name)
+            record = loader() if loader else False
+            values = {}
+            if record:
+                for field_name in field_names:
+                    try:
+                        values[field_name] = record[field_name]
+                    except KeyError:
+                        continue
+            self._loaded[model_name] = values
+        return self._loaded[model_name]
+
+    def __iter__(self):
+        return iter(self._fields_by_model)
+
+    def __len__(self):
+        return len(self._fields_by_model)
+
+
 class ProductPricelist(models.Model):
     _inherit = "product.pricelist"
 
+    use_price_matrix = fields.Boolean(
+        string='Materialize Expression Prices',
+        help='Precompute expression rule prices per variant and payment plan, so '
+             'catalog and order pricing read a stored price instead of evaluating '
+             'the expression. Only rules based on list price / cost that do not use '
+             'qty or custom variables are materialized.',
+    )
+    price_matrix_installment_grid = fields.Char(
+        string='Installment Counts',
+        default='0,3,6,12,18,24,36',
+        help='Comma-separated installment counts to materialize.',
+    )
+    price_matrix_first_payment_grid = fields.Char(
+        string='First Payments',
+        default='0',
+        help='Comma-separated first payment values to materialize.',
+    )
+    price_matrix_count = fields.Integer(
+        string='Materialized Prices',
+        compute='_compute_price_matrix_count',
+    )
+
+    def _compute_price_matrix_count(self):
+        counts = dict(self.env['product.pricelist.price.matrix']._read_group(
+            [('pricelist_id', 'in', self.ids)], ['pricelist_id'], ['__count'],
+        ))
+        for pricelist in self:
+            pricelist.price_matrix_count = counts.get(pricelist, 0)
+
+    @api.constrains('price_matrix_installment_grid', 'price_matrix_first_payment_grid')
+    def _check_price_matrix_grid(self):
+        for pricelist in self:
+            try:
+                pricelist._get_price_matrix_grid()
+            except ValueError:
+                raise ValidationError(_(
+                    "Price matrix grids must be comma-separated numbers, e.g. 0,6,12,24."
+                ))
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & {
+            'use_price_matrix', 'price_matrix_installment_grid',
+            'price_matrix_first_payment_grid', 'currency_id', 'company_id',
+        }:
+            self.env['product.pricelist.price.matrix']._invalidate_pricelists(self)
+        return res
+
+    # ── Price matrix ──────────────────────────────────────────
+
+    def _get_price_matrix_grid(self):
+        """[(installment_num, first_payment), ...] to materialize."""
+        self.ensure_one()
+        return [
+            (installment_num, first_payment)
+            for installment_num in parse_number_list(self.price_matrix_installment_grid)
+            for first_payment in parse_number_list(self.price_matrix_first_payment_grid)
+        ]
+
+    def _refresh_price_matrix(self, batch_size=500):
+        """
+        Fill the missing matrix rows of the eligible expression rules.
+
+        Rows are deleted whenever one of their inputs changes, so this only
+        computes what is missing. Rows of rules that are no longer eligible
+        are dropped.
+
+        Returns:
+            int: number of rows created
+        """
+        Matrix = self.env['product.pricelist.price.matrix'].sudo()
+        Product = self.env['product.product']
+        company = self.env.company
+        today = fields.Date.context_today(self)
+        created = 0
+        for pricelist in self.filtered('use_price_matrix'):
+            grid = pricelist._get_price_matrix_grid()
+            items = pricelist.item_ids.filtered(lambda item: item._is_price_matrix_eligible())
+            Matrix.search([
+                ('pricelist_id', '=', pricelist.id),
+                ('item_id', 'not in', items.ids),
+            ]).unlink()
+            for item in items:
+                done = {
+                    product.id for [product] in Matrix._read_group(
+                        [('item_id', '=', item.id), ('company_id', '=', company.id)],
+                        ['product_id'],
+                    )
+                }
+                todo_ids = [
+                    product_id
+                    for product_id in Product.search(item._get_price_matrix_product_domain()).ids
+                    if product_id not in done
+                ]
+                item_by_plan = [
+                    (installment_num, first_payment, item.with_context(
+                        installment_num=installment_num,
+                        first_payment=first_payment,
+                        pricelist_price_matrix=False,
+                        pricelist_expression_sources={},
+                    ))
+                    for installment_num, first_payment in grid
+                ]
+                for products in split_every(batch_size, todo_ids, Product.browse):
+                    vals_list = []
+                    for product in products:
+                        for installment_num, first_payment, plan_item in item_by_plan:
+                            vals_list.append({
+                                'item_id': item.id,
+                                'company_id': company.id,
+                                'product_id': product.id,
+                                'installment_num': installment_num,
+                                'first_payment': first_payment,
+                                'price': plan_item._compute_price(
+                                    product, 1.0, product.uom_id, today,
+                                    currency=pricelist.currency_id,
+                                ),
+                            })
+                    Matrix.create(vals_list)
+                    created += len(vals_list)
+        if created:
+            _logger.info(f"Price matrix: {created} prices materialized for pricelists {self.ids}")
+        return created
+
+    def _get_price_matrix_prices(self, products):
+        """
+        Load the materialized prices of the given products for the payment
+        plan in context, in one query.
+
+        Returns:
+            dict: {(item_id, product_id): price}
+        """
+        self.ensure_one()
+        variants = products.filtered(lambda product: product._name == 'product.product')
+        if not self.use_price_matrix or not variants:
+            return {}
+        installment_num = float(self.env.context.get('installment_num', 0.0) or 0.0)
+        first_payment = float(self.env.context.get('first_payment', 0.0) or 0.0)
+        rows = self.env['product.pricelist.price.matrix'].sudo().search_read([
+            ('pricelist_id', '=', self.id),
+            ('company_id', '=', self.env.company.id),
+            ('product_id', 'in', variants.ids),
+            ('installment_num', '=', installment_num),
+            ('first_payment', '=', first_payment),
+        ], ['item_id', 'product_id', 'price'], load=None)
+        return {(row['item_id'], row['product_id']): row['price'] for row in rows}
+
+    @api.model
+    def _cron_refresh_price_matrix(self):
+        self.search([('use_price_matrix', '=', True)])._refresh_price_matrix()
+
+    def action_refresh_price_matrix(self):
+        created = self._refresh_price_matrix()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Price Matrix"),
+                'message': _("%s prices materialized.", created),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
+
+    def action_view_price_matrix(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Materialized Prices'),
+            'res_model': 'product.pricelist.price.matrix',
+            'view_mode': 'list',
+            'domain': [('pricelist_id', '=', self.id)],
+        }
+
     def _get_configured_expression_fields(self):
-        """Return {(model_name, field_name), ...} for all custom expression variables."""
+        """Return {(model_name, field_name), ...} for the custom variables the expressions use."""
         configured = set()
         for item in self.item_ids.filtered(lambda i: i.compute_price == 'expression'):
-            for var in item.expression_variable_ids:
+            for var in item._get_used_expression_variables():
                 if var.model_id and var.field_id:
                     configured.add((var.model_id.model, var.field_id.name))
         return configured
 
+    def _get_rules_version(self):
+        """
+        Last change of the pricelist, its rules or their variables (pricing
+        fingerprints). The rule and variable counts change when one of them
+        is deleted, which leaves no write_date behind.
+        """
+        self.ensure_one()
+        [(rule_count, last_rule_write)] = self.env['product.pricelist.item'].with_context(active_test=False)._read_group(
+            [('pricelist_id', '=', self.id)],
+            aggregates=['__count', 'write_date:max'],
+        )
+        [(variable_count, last_variable_write)] = self.env['product.pricelist.item.variable']._read_group(
+            [('item_id.pricelist_id', '=', self.id)],
+            aggregates=['__count', 'write_date:max'],
+        )
+        return f"{self.write_date}|{rule_count}|{last_rule_write}|{variable_count}|{last_variable_write}"
+
     def _get_sale_order_installment(self, sale_line=None, sale_order=None):
         """First installment preview for the line (per-lines) or order (per-invoice)."""
         if 'sale.order.installment' not in self.env:
@@ -111,47 +349,52 @@ class ProductPricelist(models.Model):
         return Installment
 
     def _build_expression_sources(self, sale_line=None, sale_order=None, product=None, move_line=None, move=None):
-        """Build serializable field-value maps for expression variable resolution."""
+        """
+        Build field-value maps for expression variable resolution.
+
+        Only variables referenced by an expression are considered, and each
+        model's record is loaded lazily by the rule that needs it (see
+        ExpressionSources).
+        """
         configured = self._get_configured_expression_fields()
         if not configured:
             return {}
 
-        needed_models = {model_name for model_name, _field_name in configured}
+        fields_by_model = {}
+        for model_name, field_name in configured:
+            fields_by_model.setdefault(model_name, set()).add(field_name)
+
+        order = sale_order or (sale_line.order_id if sale_line else False)
+        invoice = move or (move_line.move_id if move_line else False)
         record_map = {
             'sale.order.line': sale_line,
-            'sale.order': sale_order or (sale_line.order_id if sale_line else False),
+            'sale.order': order,
             'product.product': product or (sale_line.product_id if sale_line else (move_line.product_id if move_line else False)),
             'account.move.line': move_line,
-            'account.move': move or (move_line.move_id if move_line else False),
+            'account.move': invoice,
         }
-        if 'sale.order.installment' in needed_models:
-            record_map['sale.order.installment'] = self._get_sale_order_installment(
-                sale_line=sale_line,
-                sale_order=record_map['sale.order'],
-            )
-        if 'account.move.installment' in needed_models:
-            record_map['account.move.installment'] = self._get_account_move_installment(
-                move_line=move_line,
-                move=record_map['account.move'],
-            )
-
-        sources = {}
-        for model_name, field_name in configured:
-            record = record_map.get(model_name)
-            if not record:
-                continue
-            try:
-                value = record[field_name]
-            except KeyError:
-                continue
-            sources.setdefault(model_name, {})[field_name] = value
-        return sources
+        loaders = {model_name: (lambda record=record: record) for model_name, record in record_map.items()}
+        loaders['sale.order.installment'] = lambda: self._get_sale_order_installment(
+            sale_line=sale_line,
+            sale_order=order,
+        )
+        loaders['account.move.installment'] = lambda: self._get_account_move_installment(
+            move_line=move_line,
+            move=invoice,
+        )
+        return ExpressionSources(fields_by_model, loaders)
 
     def _compute_price_rule(
         self, products, quantity, currency=None, uom=None, date=False, compute_price=True, **kwargs
     ):
         """Enhanced price rule computation with installment support"""
-        res = super()._compute_price_rule(
+        pricelist = self
+        if compute_price and self.use_price_matrix:
+            # Fast path: materialized prices for the whole batch in one query
+            matrix = self._get_price_matrix_prices(products)
+            if matrix:
+                pricelist = self.with_context(pricelist_price_matrix=matrix)
+        res = pricelist._compute_price_rule_by_payment_plan(
             products,
             quantity,
             currency=currency,
@@ -173,28 +416,112 @@ class ProductPricelist(models.Model):
 
         return res
 
+    def _compute_price_rule_by_payment_plan(
+        self, products, quantity, currency=None, uom=None, date=False, compute_price=True, **kwargs
+    ):
+        """
+        Price products with their payment-plan rules; products that none of
+        those rules targets fall back, on their own, to the regular rule order.
+        """
+        params = dict(currency=currency, uom=uom, date=date, compute_price=compute_price, **kwargs)
+        fallback_products = self._get_products_without_payment_plan_rules(products, date, **kwargs)
+        if not fallback_products or fallback_products == products:
+            return super(ProductPricelist, self)._compute_price_rule(products, quantity, **params)
+        res = super(ProductPricelist, self)._compute_price_rule(products - fallback_products, quantity, **params)
+        res.update(super(ProductPricelist, self.with_context(pricelist_any_payment_type=True))._compute_price_rule(
+            fallback_products, quantity, **params
+        ))
+        return res
+
+    def _get_products_without_payment_plan_rules(self, products, date=False, rules=None, **kwargs):
+        """
+        Products that no rule of the context payment plan (generic rules
+        included) targets, whatever the quantity: they use the regular rule
+        order, as _get_product_rule does for a single product.
+        """
+        if (
+            not self or len(products) < 2
+            or not self._context.get('payment_type') or self._context.get('pricelist_any_payment_type')
+        ):
+            return products.browse()
+        if rules is None:
+            rules = self._get_applicable_rules(products, date or fields.Datetime.now(), **kwargs)
+        return products.filtered(
+            lambda product: not any(rule._is_applicable_for(product, rule.min_quantity) for rule in rules)
+        )
+
+    def _get_product_rule(self, product, quantity, uom=None, date=False, **kwargs):
+        """Rules prefetched by sale.order.line._compute_pricelist_item_id for the whole batch."""
+        batch = self._context.get('pricelist_rule_batch')
+        if batch:
+            key = (self.id, product.id, quantity, uom.id if uom else False, date)
+            rule_id = batch.get(key)
+            if rule_id is not None:
+                return rule_id
+        return super()._get_product_rule(product, quantity, uom=uom, date=date, **kwargs)
+
     def _get_applicable_rules_domain(self, products, date, **kwargs):
-        """Keep rule lookup broad; payment-plan filtering is applied after lookup."""
+        """
+        Restrict rules to the payment plan in context (generic rules included).
+
+        The `pricelist_any_payment_type` context key disables the restriction;
+        _get_applicable_rules uses it to fall back to every rule when the plan
+        matches none.
+        """
         domain = super()._get_applicable_rules_domain(products=products, date=date, **kwargs)
+        payment_type = self._context.get('payment_type')
+        if payment_type and not self._context.get('pricelist_any_payment_type'):
+            domain = expression.AND([domain, [('payment_type', 'in', [False, payment_type])]])
         return domain
 
     def _get_applicable_rules(self, products, date, **kwargs):
-        """Override to filter by payment_type after getting rules"""
+        """Payment-plan rules first; without any, fall back to the regular rule order."""
         rules = super()._get_applicable_rules(products=products, date=date, **kwargs)
-        
-        # Additional filtering as safety measure (domain should handle it, but this ensures correctness)
         payment_type = self._context.get('payment_type')
-        if payment_type:
-            # Prefer rules that are generic or explicitly match the payment plan.
-            filtered_rules = rules.filtered(
-                lambda r: not r.payment_type or r.payment_type == payment_type
-            )
-            if filtered_rules:
-                if len(filtered_rules) != len(rules):
-                    _logger.debug(f"Filtered {len(rules)} rules to {len(filtered_rules)} by payment_type={payment_type}")
-                return filtered_rules
+        if not rules and self and products and payment_type and not self._context.get('pricelist_any_payment_type'):
+            rules = super(ProductPricelist, self.with_context(pricelist_any_payment_type=True))._get_applicable_rules(
+                products=products, date=date, **kwargs
+            ).with_context(self.env.context)
             if rules:
-                _logger.debug(f"Filtered {len(rules)} rules to {len(filtered_rules)} by payment_type={payment_type}")
-                _logger.debug("No matching payment-plan rules found; falling back to regular pricelist rule order")
-        
+                _logger.debug(
+                    f"No rule for payment_type={payment_type} on pricelist {self.id}; "
+                    f"falling back to regular pricelist rule order"
+                )
         return rules
+
+    def _get_product_rules_batch(self, lines, date=False):
+        """
+        Rule of each (product, qty, uom) with a single rule lookup.
+
+        Same selection as _get_product_rule, for many products at once: the
+        rules of all products are fetched in one query and matched in memory.
+
+        Args:
+            lines (list): (key, product, quantity, uom) tuples
+            date: pricing date (defaults to now)
+
+        Returns:
+            dict: key -> product.pricelist.item (possibly empty)
+        """
+        self.ensure_one()
+        date = date or fields.Datetime.now()
+        products = self.env['product.product'].concat(*(product for _key, product, _qty, _uom in lines))
+        rules = self._get_applicable_rules(products, date)
+        # Products without a payment-plan rule fall back to the regular rule order, each on its own.
+        fallback_products = self._get_products_without_payment_plan_rules(products, date, rules=rules)
+        fallback_rules = rules
+        if fallback_products and fallback_products != products:
+            fallback_rules = self.with_context(pricelist_any_payment_type=True)._get_applicable_rules(
+                fallback_products, date
+            ).with_context(self.env.context)
+        result = {}
+        for key, product, quantity, uom in lines:
+            qty_in_product_uom = quantity
+            if uom and uom != product.uom_id:
+                qty_in_product_uom = uom._compute_quantity(quantity, product.uom_id, raise_if_failure=False)
+            product_rules = fallback_rules if product in fallback_products else rules
+            result[key] = next(
+                (rule for rule in product_rules if rule._is_applicable_for(product, qty_in_product_uom)),
+                self.env['product.pricelist.item'],
+            )
+        return result
@@ -1,14 +1,24 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.tools.safe_eval import safe_eval
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+import ast
 import logging
 import math
 import re
+import time
 from .product_pricelist_item_variable import ALLOWED_EXPRESSION_MODELS, BUILTIN_EXPRESSION_NAMES
+from .vector_expression import VectorExpression, VectorExpressionError, numpy
 
 _logger = logging.getLogger(__name__)
 
+# Names an expression may use and still be materialized in the price matrix:
+# everything that only depends on the product and the payment plan.
+PRICE_MATRIX_EXPRESSION_NAMES = frozenset({
+    'price', 'cost', 'purchase_price', 'installment_num', 'first_payment',
+    'round', 'ceil', 'iff', 'True', 'False', 'None',
+})
+
 class ProductPricelistItem(models.Model):
     _inherit = "product.pricelist.item"
 
@@ -62,6 +72,17 @@ class ProductPricelistItem(models.Model):
         help="Leave empty to apply this pricelist rule to all payment plans."
     )
 
+    def init(self):
+        super().init()
+        # Rule lookup filters on pricelist and payment plan first, then on the
+        # product / template / category the rule applies to.
+        tools.create_index(
+            self._cr,
+            'product_pricelist_item_rule_lookup_index',
+            self._table,
+            ['pricelist_id', 'payment_type', 'applied_on', 'product_id', 'product_tmpl_id', 'categ_id'],
+        )
+
     @api.depends('expression_variable_ids', 'expression_variable_ids.variable_name', 'expression_variable_ids.field_id')
     def _compute_expression_custom_variable_help(self):
         for item in self:
@@ -90,46 +111,315 @@ class ProductPricelistItem(models.Model):
                 res['expression_model_id'] = model.id
         return res
 
+    @api.model
+    @tools.ormcache('expression')
+    def _parse_price_expression(self, expression):
+        """
+        Normalize and parse an expression once per process.
+
+        Returns:
+            tuple: (normalized expression, frozenset of names it references).
+                   Names are empty when the expression does not parse; it then
+                   fails in safe_eval and the base price is used.
+        """
+        # Replace if( with iff( to avoid the Python keyword conflict, so users
+        # can write if(condition, true, false).
+        normalized = re.sub(r'\bif\s*\(', 'iff(', str(expression or '').strip())
+        try:
+            tree = ast.parse(normalized, mode='eval')
+        except SyntaxError:
+            return normalized, frozenset()
+        names = frozenset(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+        return normalized, names
+
+    def _get_expression_names(self):
+        self.ensure_one()
+        if self.compute_price != 'expression' or not self.price_expression:
+            return frozenset()
+        return self._parse_price_expression(self.price_expression)[1]
+
+    def _get_used_expression_variables(self):
+        """Custom variables that the expression actually references."""
+        self.ensure_one()
+        names = self._get_expression_names()
+        return self.expression_variable_ids.filtered(lambda var: var.variable_name in names)
+
     def _get_custom_expression_env(self):
-        """Merge configured field variables into the expression environment."""
+        """Merge the referenced field variables into the expression environment."""
         self.ensure_one()
         sources = self.env.context.get('pricelist_expression_sources') or {}
         env_vars = {}
-        for var in self.expression_variable_ids:
+        for var in self._get_used_expression_variables():
             env_vars[var.variable_name] = var._resolve_value(sources)
         return env_vars
 
+    # ── Price matrix ──────────────────────────────────────────
+
+    def _is_price_matrix_eligible(self):
+        """
+        True when the rule's price only depends on the variant and the payment
+        plan: an expression on list price / cost, without qty or custom
+        variables, in the company currency.
+        """
+        self.ensure_one()
+        if self.compute_price != 'expression' or not self.price_expression:
+            return False
+        if self.base not in ('list_price', 'standard_price'):
+            return False
+        names = self._get_expression_names()
+        if not names or not names <= PRICE_MATRIX_EXPRESSION_NAMES:
+            return False
+        pricelist = self.pricelist_id
+        company = pricelist.company_id or self.env.company
+        return pricelist.currency_id == company.currency_id
+
+    def _get_price_matrix_product_domain(self):
+        self.ensure_one()
+        if self.applied_on == '0_product_variant':
+            domain = [('id', '=', self.product_id.id)]
+        elif self.applied_on == '1_product':
+            domain = [('product_tmpl_id', '=', self.product_tmpl_id.id)]
+        elif self.applied_on == '2_product_category':
+            domain = [('categ_id', 'child_of', self.categ_id.id)]
+        else:
+            domain = []
+        return domain + [('sale_ok', '=', True)]
+
+    def _get_price_matrix_price(self, product, uom=None, currency=None):
+        """Materialized price prefetched by the pricelist, or None."""
+        matrix = self.env.context.get('pricelist_price_matrix')
+        if not matrix or not product or product._name != 'product.product':
+            return None
+        if uom and uom != product.uom_id:
+            return None
+        if currency and currency != self.pricelist_id.currency_id:
+            return None
+        return matrix.get((self.id, product.id))
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['product.pricelist.price.matrix']._invalidate_items(self)
+        return res
+
+    # ── Simulation ────────────────────────────────────────────
+
+    def _get_simulation_variables(self, names, product_ids):
+        """
+        Column arrays (one value per product) for the product-level names used.
+
+        Custom variables are supported when they read a product.product field;
+        anything that needs an order or invoice cannot be simulated.
+        """
+        self.ensure_one()
+        field_by_name = {}
+        if self.base == 'list_price':
+            field_by_name['price'] = 'lst_price'
+        elif self.base == 'standard_price':
+            field_by_name['price'] = 'standard_price'
+        else:
+            raise UserError(_("Simulation only supports rules based on Sales Price or Cost."))
+        if names & {'cost', 'purchase_price'}:
+            field_by_name['cost'] = field_by_name['purchase_price'] = 'standard_price'
+        for var in self.expression_variable_ids.filtered(lambda v: v.variable_name in names):
+            if var.model_id.model != 'product.product':
+                raise UserError(_(
+                    "Variable '%(name)s' reads %(model)s, which cannot be simulated over the catalog.",
+                    name=var.variable_name, model=var.model_id.model,
+                ))
+            field_by_name[var.variable_name] = var.field_id.name
+
+        rows = self.env['product.product'].browse(product_ids).read(
+            sorted(set(field_by_name.values())), load=None,
+        )
+        to_float = self.env['product.pricelist.item.variable']._to_float
+        variables = {
+            name: numpy.array([to_float(row[field_name]) for row in rows], dtype=numpy.float64)
+            for name, field_name in field_by_name.items()
+        }
+
+        pricelist = self.pricelist_id
+        company = pricelist.company_id or self.env.company
+        if pricelist.currency_id and pricelist.currency_id != company.currency_id:
+            rate = self.env['res.currency']._get_conversion_rate(
+                company.currency_id, pricelist.currency_id, company, fields.Date.context_today(self),
+            )
+            variables['price'] = variables['price'] * rate
+        return variables
+
+    def _get_simulation_current_prices(self, grid_variables, product_ids, qty):
+        """Current prices of the rule, broadcastable to (products, installments, first payments)."""
+        self.ensure_one()
+        price = grid_variables['price']
+        if self.compute_price == 'expression' and self.price_expression:
+            current = VectorExpression(self._parse_price_expression(self.price_expression)[0])
+            return current.evaluate(grid_variables)
+        if self.compute_price == 'fixed':
+            return numpy.full(price.shape, self.fixed_price or 0.0, dtype=numpy.float64)
+        if self.compute_price == 'percentage':
+            return price * (1.0 - (self.percent_price or 0.0) / 100.0)
+        # Formula rules (rounding, surcharge, margins): let the ORM price each product once.
+        today = fields.Date.context_today(self)
+        values = [
+            self._compute_price(product, qty, product.uom_id, today, currency=self.pricelist_id.currency_id)
+            for product in self.env['product.product'].browse(product_ids)
+        ]
+        return numpy.array(values, dtype=numpy.float64)[:, None, None]
+
+    def simulate_price_expression(self, expression=None, installment_nums=(0.0,), first_payments=(0.0,),
+                                  qty=1.0, product_domain=None, top=50):
+        """
+        Evaluate a candidate expression over every product of the rule and a
+        grid of installment_num x first_payment values at once, and compare it
+        with the rule's current prices.
+
+        Args:
+            expression (str): candidate expression (defaults to the current one)
+            installment_nums (list): installment_num values of the grid
+            first_payments (list): first_payment values of the grid
+            qty (float): quantity used for `qty`
+            product_domain (list): extra domain restricting the products
+            top (int): number of largest changes to report
+
+        Returns:
+            dict: {
+                'expression', 'product_count', 'duration_s',
+                'summary': [per grid point: products, changed, increased, decreased,
+                            errors, avg_current, avg_candidate, avg_diff_pct,
+                            min_diff_pct, max_diff_pct],
+                'top_changes': [product_id, installment_num, first_payment,
+                                current, candidate, diff, diff_pct],
+            }
+        """
+        self.ensure_one()
+        if numpy is None:
+            raise UserError(_("The 'numpy' library is required to simulate price expressions."))
+        start = time.perf_counter()
+        normalized = self._parse_price_expression(expression or self.price_expression or '')[0]
+        try:
+            candidate = VectorExpression(normalized)
+        except VectorExpressionError as e:
+            raise UserError(_("Invalid expression: %s", e))
+
+        product_ids = self.env['product.product'].search(
+            self._get_price_matrix_product_domain() + (product_domain or []),
+        ).ids
+        installment_nums = numpy.array(list(installment_nums), dtype=numpy.float64)
+        first_payments = numpy.array(list(first_payments), dtype=numpy.float64)
+        grid_shape = (len(product_ids), len(installment_nums), len(first_payments))
+        report = {
+            'expression': normalized,
+            'product_count': len(product_ids),
+            'summary': [],
+            'top_changes': [],
+        }
+        if not product_ids:
+            report['duration_s'] = round(time.perf_counter() - start, 3)
+            return report
+
+        names = set(candidate.names)
+        if self.compute_price == 'expression' and self.price_expression:
+            names |= self._get_expression_names()
+        variables = self._get_simulation_variables(names, product_ids)
+        # Products on axis 0, installment_num on axis 1, first_payment on axis 2
+        grid_variables = {name: values[:, None, None] for name, values in variables.items()}
+        grid_variables.update({
+            'qty': float(qty or 0.0),
+            'installment_num': installment_nums[None, :, None],
+            'first_payment': first_payments[None, None, :],
+        })
+        try:
+            candidate_prices = numpy.broadcast_to(candidate.evaluate(grid_variables), grid_shape)
+            current_prices = numpy.broadcast_to(
+                self._get_simulation_current_prices(grid_variables, product_ids, qty), grid_shape,
+            )
+        except VectorExpressionError as e:
+            raise UserError(_("Expression cannot be simulated: %s", e))
+
+        # A failing evaluation (e.g. division by zero) falls back to the base price, as at runtime.
+        base = numpy.broadcast_to(variables['price'][:, None, None], grid_shape)
+        errors = ~numpy.isfinite(candidate_prices)
+        candidate_prices = numpy.where(errors, base, candidate_prices)
+        current_prices = numpy.where(numpy.isfinite(current_prices), current_prices, base)
+
+        diff = candidate_prices - current_prices
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            diff_pct = numpy.where(current_prices != 0, diff / numpy.abs(current_prices) * 100.0, 0.0)
+        tolerance = (self.pricelist_id.currency_id.rounding or 0.01) / 2.0
+        changed = numpy.abs(diff) > tolerance
+
+        for i, installment_num in enumerate(installment_nums):
+            for j, first_payment in enumerate(first_payments):
+                point_pct = diff_pct[:, i, j]
+                report['summary'].append({
+                    'installment_num': float(installment_num),
+                    'first_payment': float(first_payment),
+                    'products': len(product_ids),
+                    'changed': int(changed[:, i, j].sum()),
+                    'increased': int((changed[:, i, j] & (diff[:, i, j] > 0)).sum()),
+                    'decreased': int((changed[:, i, j] & (diff[:, i, j] < 0)).sum()),
+                    'errors': int(errors[:, i, j].sum()),
+                    'avg_current': float(current_prices[:, i, j].mean()),
+                    'avg_candidate': float(candidate_prices[:, i, j].mean()),
+                    'avg_diff_pct': float(point_pct.mean()),
+                    'min_diff_pct': float(point_pct.min()),
+                    'max_diff_pct': float(point_pct.max()),
+                })
+
+        flat_changed = numpy.flatnonzero(changed)
+        if top and len(flat_changed):
+            order = numpy.argsort(-numpy.abs(diff_pct.ravel()[flat_changed]), kind='stable')[:top]
+            for flat_index in flat_changed[order]:
+                p, i, j = numpy.unravel_index(flat_index, grid_shape)
+                report['top_changes'].append({
+                    'product_id': product_ids[p],
+                    'installment_num': float(installment_nums[i]),
+                    'first_payment': float(first_payments[j]),
+                    'current': float(current_prices[p, i, j]),
+                    'candidate': float(candidate_prices[p, i, j]),
+                    'diff': float(diff[p, i, j]),
+                    'diff_pct': float(diff_pct[p, i, j]),
+                })
+        report['duration_s'] = round(time.perf_counter() - start, 3)
+        _logger.info(
+            f"Price expression simulation on rule {self.id}: {len(product_ids)} products x "
+            f"{len(installment_nums) * len(first_payments)} plans in {report['duration_s']}s"
+        )
+        return report
+
     def _compute_price(self, *args, **kwargs):
         """Compute price using expression if configured"""
-        base_price = super()._compute_price(*args, **kwargs)
-
         product = args[0] if len(args) >= 1 else kwargs.get("product")
         quantity = args[1] if len(args) >= 2 else kwargs.get("quantity", 1.0)
 
+        if self.compute_price == "expression":
+            matrix_price = self._get_price_matrix_price(
+                product,
+                uom=args[2] if len(args) >= 3 else kwargs.get("uom"),
+                currency=args[4] if len(args) >= 5 else kwargs.get("currency"),
+            )
+            if matrix_price is not None:
+                return matrix_price
+
+        base_price = super()._compute_price(*args, **kwargs)
+
         if self.compute_price == "expression" and self.price_expression:
             try:
-                # Get product cost and purchase price safely
+                expression, names = self._parse_price_expression(self.price_expression)
+
+                # Cost is company-dependent (one read per product); only load it when used
                 cost = 0.0
-                purchase_price = 0.0
-                if product:
+                if product and names & {"cost", "purchase_price"}:
                     cost = float(getattr(product, "standard_price", 0.0) or 0.0)
-                    purchase_price = cost  # purchase_price is same as standard_price (cost)
-                
+
                 # Helper function for conditional expressions (SQL-style: if(condition, true_value, false_value))
                 def iff(condition, true_value, false_value):
                     """Conditional expression: returns true_value if condition is True, else false_value"""
                     return float(true_value) if condition else float(false_value)
-                
-                # Preprocess expression: replace if( with iff( to avoid Python keyword conflict
-                # This allows users to write if(condition, true, false) which gets converted to iff(condition, true, false)
-                expression = str(self.price_expression).strip()
-                # Replace if( with iff( using word boundary to avoid replacing "if " or other variations
-                expression = re.sub(r'\bif\s*\(', 'iff(', expression)
-                
+
                 env = {
                     "price": float(base_price or 0.0),
                     "cost": cost,
-                    "purchase_price": purchase_price,  # Purchase price (same as cost/standard_price)
+                    "purchase_price": cost,  # Purchase price (same as cost/standard_price)
                     "qty": float(quantity or 0.0),
                     "installment_num": float(self.env.context.get("installment_num", 0.0) or 0.0),
                     "first_payment": float(self.env.context.get("first_payment", 0.0) or 0.0),
@@ -138,7 +428,7 @@ class ProductPricelistItem(models.Model):
                     "iff": iff,  # Conditional function: iff(condition, true_value, false_value)
                 }
                 env.update(self._get_custom_expression_env())
-                
+
                 new_price = float(safe_eval(expression, env, nocopy=True))
                 _logger.debug(f"Expression pricing: {self.price_expression} -> {new_price} (processed: {expression})")
                 return new_price
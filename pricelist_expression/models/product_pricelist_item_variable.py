@@ -54,6 +54,22 @@ class ProductPricelistItemVariable(models.Model):
         help='Name used in the expression, e.g. my_field → price + my_field',
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        variables = super().create(vals_list)
+        self.env['product.pricelist.price.matrix']._invalidate_items(variables.item_id)
+        return variables
+
+    def write(self, vals):
+        items = self.item_id
+        res = super().write(vals)
+        self.env['product.pricelist.price.matrix']._invalidate_items(items | self.item_id)
+        return res
+
+    def unlink(self):
+        self.env['product.pricelist.price.matrix']._invalidate_items(self.item_id)
+        return super().unlink()
+
     @api.onchange('model_id')
     def _onchange_model_id(self):
         self.field_id = False
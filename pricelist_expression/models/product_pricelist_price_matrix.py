@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+
+class ProductPricelistPriceMatrix(models.Model):
+    """
+    Materialized expression prices of a pricelist.
+
+    One row per (rule, variant, installment_num, first_payment) for expression
+    rules that only depend on product-level inputs (see
+    product.pricelist.item._is_price_matrix_eligible). Rows are deleted when
+    one of their inputs changes and rebuilt by the refresh cron, so a missing
+    row only means the expression is evaluated as usual.
+    """
+    _name = 'product.pricelist.price.matrix'
+    _description = 'Pricelist Expression Price Matrix'
+    _order = 'pricelist_id, product_id, payment_type, min_quantity, installment_num, first_payment'
+
+    item_id = fields.Many2one(
+        'product.pricelist.item',
+        string='Pricelist Rule',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    pricelist_id = fields.Many2one(
+        related='item_id.pricelist_id',
+        store=True,
+        index=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        required=True,
+        ondelete='cascade',
+        help='Company whose product costs were used.',
+    )
+    product_id = fields.Many2one(
+        'product.product',
+        string='Product Variant',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    min_quantity = fields.Float(related='item_id.min_quantity', store=True)
+    payment_type = fields.Selection(related='item_id.payment_type', store=True)
+    installment_num = fields.Float(string='Installments', required=True)
+    first_payment = fields.Float(string='First Payment', required=True)
+    price = fields.Float(string='Price', digits='Product Price', required=True)
+
+    _sql_constraints = [
+        (
+            'price_matrix_unique',
+            'unique(item_id, company_id, product_id, installment_num, first_payment)',
+            'A price matrix entry already exists for this rule, product and plan.',
+        ),
+    ]
+
+    @api.model
+    def _invalidate_items(self, items):
+        if items:
+            self.sudo().search([('item_id', 'in', items.ids)]).unlink()
+
+    @api.model
+    def _invalidate_products(self, products):
+        if products:
+            self.sudo().search([('product_id', 'in', products.ids)]).unlink()
+
+    @api.model
+    def _invalidate_pricelists(self, pricelists):
+        if pricelists:
+            self.sudo().search([('pricelist_id', 'in', pricelists.ids)]).unlink()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+# Product fields that feed materialized expression prices (price / cost).
+PRICE_MATRIX_PRODUCT_FIELDS = ('list_price', 'lst_price', 'standard_price', 'uom_id', 'currency_id')
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & set(PRICE_MATRIX_PRODUCT_FIELDS):
+            self.env['product.pricelist.price.matrix']._invalidate_products(self)
+        return res
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & set(PRICE_MATRIX_PRODUCT_FIELDS):
+            self.env['product.pricelist.price.matrix']._invalidate_products(
+                self.with_context(active_test=False).product_variant_ids
+            )
+        return res
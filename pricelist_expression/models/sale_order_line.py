@@ -69,6 +69,32 @@ class SaleOrderLine(models.Model):
         )
         return ctx
 
+    @api.depends('product_id', 'product_uom', 'product_uom_qty', 'order_id.payment_type')
+    def _compute_pricelist_item_id(self):
+        """
+        Prefetch the rules with one lookup per pricelist / payment plan / date,
+        then let the standard compute read them through _get_product_rule.
+        """
+        groups = {}
+        for line in self:
+            pricelist = line.order_id.pricelist_id
+            if not line.product_id or line.display_type or not pricelist:
+                continue
+            key = (pricelist, line.order_id.payment_type or False, line._get_order_date())
+            groups.setdefault(key, []).append(line)
+        batch = {}
+        for (pricelist, payment_type, date), lines in groups.items():
+            rules = pricelist.with_context(payment_type=payment_type)._get_product_rules_batch(
+                [(line, line.product_id, line.product_uom_qty or 1.0, line.product_uom) for line in lines],
+                date=date,
+            )
+            for line in lines:
+                key = (pricelist.id, line.product_id.id, line.product_uom_qty or 1.0, line.product_uom.id, date)
+                rule_id = rules[line].id or False
+                # Same key under two payment plans: leave it to the regular lookup.
+                batch[key] = rule_id if batch.get(key, rule_id) == rule_id else None
+        super(SaleOrderLine, self.with_context(pricelist_rule_batch=batch))._compute_pricelist_item_id()
+
     def _refresh_installment_preview(self):
         if (
             self.env.context.get('skip_auto_generate_sale_payment_term')
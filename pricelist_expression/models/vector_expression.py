@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Array evaluation of pricelist expressions.
+
+Evaluates the same expression language as product.pricelist.item._compute_price
+(arithmetic, comparisons, and/or/not, if()/iff(), ceil, round) over NumPy
+arrays instead of one product at a time. Only whitelisted AST nodes are
+accepted, so nothing beyond that language can run.
+"""
+import ast
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_COMPARE_OPS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_CONSTANTS = {'True': True, 'False': False, 'None': 0.0}
+
+
+class VectorExpressionError(ValueError):
+    pass
+
+
+class VectorExpression:
+    """A parsed expression that evaluates over broadcastable arrays."""
+
+    def __init__(self, expression):
+        if numpy is None:
+            raise VectorExpressionError("NumPy is required for expression simulation.")
+        try:
+            self.tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise VectorExpressionError(str(e))
+        self.names = frozenset(
+            node.id for node in ast.walk(self.tree) if isinstance(node, ast.Name)
+        )
+
+    def evaluate(self, variables):
+        """
+        Args:
+            variables (dict): name -> scalar or numpy array (broadcastable)
+
+        Returns:
+            numpy.ndarray of float64
+        """
+        with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            result = self._eval(self.tree.body, variables)
+        return numpy.asarray(result, dtype=numpy.float64)
+
+    def _eval(self, node, variables):
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, (int, float, bool)):
+                return node.value
+            raise VectorExpressionError(f"Unsupported constant: {node.value!r}")
+        if isinstance(node, ast.Name):
+            if node.id in variables:
+                return variables[node.id]
+            if node.id in _CONSTANTS:
+                return _CONSTANTS[node.id]
+            raise VectorExpressionError(f"Unknown variable: {node.id}")
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            left = self._as_float(self._eval(node.left, variables))
+            right = self._as_float(self._eval(node.right, variables))
+            return _BIN_OPS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, variables)
+            if isinstance(node.op, ast.USub):
+                return -self._as_float(operand)
+            if isinstance(node.op, ast.UAdd):
+                return self._as_float(operand)
+            if isinstance(node.op, ast.Not):
+                return numpy.logical_not(operand)
+        if isinstance(node, ast.Compare):
+            result = True
+            left = self._eval(node.left, variables)
+            for op, comparator in zip(node.ops, node.comparators):
+                if type(op) not in _COMPARE_OPS:
+                    raise VectorExpressionError("Unsupported comparison")
+                right = self._eval(comparator, variables)
+                result = numpy.logical_and(result, _COMPARE_OPS[type(op)](left, right))
+                left = right
+            return result
+        if isinstance(node, ast.BoolOp):
+            # Python semantics: `a and b` is b when a is truthy else a, `a or b` the reverse.
+            result = self._eval(node.values[0], variables)
+            for value_node in node.values[1:]:
+                value = self._eval(value_node, variables)
+                truthy = numpy.asarray(result) != 0
+                if isinstance(node.op, ast.And):
+                    result = numpy.where(truthy, value, result)
+                else:
+                    result = numpy.where(truthy, result, value)
+            return result
+        if isinstance(node, ast.IfExp):
+            return numpy.where(
+                numpy.asarray(self._eval(node.test, variables)) != 0,
+                self._eval(node.body, variables),
+                self._eval(node.orelse, variables),
+            )
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            args = [self._eval(arg, variables) for arg in node.args]
+            return self._call(node.func.id, args)
+        raise VectorExpressionError(f"Unsupported syntax: {ast.dump(node)}")
+
+    def _call(self, name, args):
+        if name == 'iff' and len(args) == 3:
+            # iff() returns float(true_value) / float(false_value); both are evaluated.
+            condition, true_value, false_value = args
+            return numpy.where(
+                numpy.asarray(condition) != 0,
+                self._as_float(true_value),
+                self._as_float(false_value),
+            )
+        if name == 'ceil' and len(args) == 1:
+            return numpy.ceil(self._as_float(args[0]))
+        if name == 'round' and len(args) == 1:
+            # Both round half to even on binary floats.
+            return numpy.rint(self._as_float(args[0]))
+        if name == 'round' and len(args) == 2:
+            # numpy.round scales by 10**n and can differ from Python's
+            # correctly-rounded round() on ties; apply the builtin per element.
+            return _python_round(self._as_float(args[0]), self._as_float(args[1]))
+        raise VectorExpressionError(f"Unsupported function call: {name}()")
+
+    def _as_float(self, value):
+        return numpy.asarray(value, dtype=numpy.float64)
+
+
+def _round_scalar(value, ndigits):
+    if not numpy.isfinite(value):
+        return value
+    return round(float(value), int(ndigits))
+
+
+_python_round = numpy.vectorize(_round_scalar, otypes=[float]) if numpy is not None else None
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+from . import pricelist_item_simulation
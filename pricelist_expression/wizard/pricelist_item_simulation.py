@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+from ..models.product_pricelist import parse_number_list
+
+
+class PricelistItemSimulation(models.TransientModel):
+    """Compare a candidate expression with a rule's current prices over the catalog."""
+    _name = 'product.pricelist.item.simulation'
+    _description = 'Pricelist Expression Simulation'
+
+    item_id = fields.Many2one('product.pricelist.item', string='Pricelist Rule', required=True, readonly=True)
+    pricelist_id = fields.Many2one(related='item_id.pricelist_id', readonly=True)
+    currency_id = fields.Many2one(related='item_id.pricelist_id.currency_id', readonly=True)
+    current_expression = fields.Char(related='item_id.price_expression', string='Current Expression')
+    expression = fields.Char(string='Candidate Expression', required=True)
+    installment_grid = fields.Char(
+        string='Installments',
+        default='0,3,6,12,24',
+        help='Comma separated installment_num values to simulate.',
+    )
+    first_payment_grid = fields.Char(
+        string='First Payments',
+        default='0',
+        help='Comma separated first_payment values to simulate.',
+    )
+    quantity = fields.Float(string='Quantity', default=1.0, digits='Product Unit of Measure')
+    top_count = fields.Integer(string='Largest Changes', default=50)
+    product_count = fields.Integer(string='Products', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, digits=(16, 3))
+    line_ids = fields.One2many('product.pricelist.item.simulation.line', 'simulation_id', string='Results')
+    summary_line_ids = fields.One2many(
+        'product.pricelist.item.simulation.line', 'simulation_id',
+        domain=[('line_type', '=', 'summary')], string='Summary',
+    )
+    product_line_ids = fields.One2many(
+        'product.pricelist.item.simulation.line', 'simulation_id',
+        domain=[('line_type', '=', 'product')], string='Largest Changes',
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        item = self.env['product.pricelist.item'].browse(res.get('item_id'))
+        if item and 'expression' in fields_list and not res.get('expression'):
+            res['expression'] = item.price_expression
+        return res
+
+    def _get_grid(self, value, label):
+        try:
+            return parse_number_list(value)
+        except ValueError:
+            raise UserError(_("%s must be a comma separated list of numbers.", label))
+
+    def action_simulate(self):
+        self.ensure_one()
+        report = self.item_id.simulate_price_expression(
+            expression=self.expression,
+            installment_nums=self._get_grid(self.installment_grid, _("Installments")),
+            first_payments=self._get_grid(self.first_payment_grid, _("First Payments")),
+            qty=self.quantity,
+            top=self.top_count,
+        )
+        lines = [(5, 0, 0)]
+        for point in report['summary']:
+            lines.append((0, 0, {
+                'line_type': 'summary',
+                'installment_num': point['installment_num'],
+                'first_payment': point['first_payment'],
+                'changed_count': point['changed'],
+                'increased_count': point['increased'],
+                'decreased_count': point['decreased'],
+                'error_count': point['errors'],
+                'current_price': point['avg_current'],
+                'candidate_price': point['avg_candidate'],
+                'diff_pct': point['avg_diff_pct'],
+                'min_diff_pct': point['min_diff_pct'],
+                'max_diff_pct': point['max_diff_pct'],
+            }))
+        for change in report['top_changes']:
+            lines.append((0, 0, {
+                'line_type': 'product',
+                'product_id': change['product_id'],
+                'installment_num': change['installment_num'],
+                'first_payment': change['first_payment'],
+                'current_price': change['current'],
+                'candidate_price': change['candidate'],
+                'diff': change['diff'],
+                'diff_pct': change['diff_pct'],
+            }))
+        self.write({
+            'product_count': report['product_count'],
+            'duration': report['duration_s'],
+            'line_ids': lines,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_apply(self):
+        self.ensure_one()
+        self.item_id.write({
+            'compute_price': 'expression',
+            'price_expression': self.expression,
+        })
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class PricelistItemSimulationLine(models.TransientModel):
+    _name = 'product.pricelist.item.simulation.line'
+    _description = 'Pricelist Expression Simulation Result'
+    _order = 'line_type desc, id'
+
+    simulation_id = fields.Many2one('product.pricelist.item.simulation', required=True, ondelete='cascade')
+    currency_id = fields.Many2one(related='simulation_id.currency_id')
+    line_type = fields.Selection([('summary', 'Plan Summary'), ('product', 'Product')], required=True)
+    product_id = fields.Many2one('product.product', string='Product', readonly=True)
+    installment_num = fields.Float(string='Installments', readonly=True)
+    first_payment = fields.Float(string='First Payment', readonly=True)
+    changed_count = fields.Integer(string='Changed', readonly=True)
+    increased_count = fields.Integer(string='Increased', readonly=True)
+    decreased_count = fields.Integer(string='Decreased', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    current_price = fields.Monetary(string='Current', readonly=True)
+    candidate_price = fields.Monetary(string='Candidate', readonly=True)
+    diff = fields.Monetary(string='Difference', readonly=True)
+    diff_pct = fields.Float(string='Difference (%)', readonly=True, digits=(16, 2))
+    min_diff_pct = fields.Float(string='Min (%)', readonly=True, digits=(16, 2))
+    max_diff_pct = fields.Float(string='Max (%)', readonly=True, digits=(16, 2))
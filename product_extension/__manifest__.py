@@ -2,7 +2,7 @@
 {
     "name": "Product Extension",
     'sequence': 4,
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.0.1",
     "summary": "Adds code field to products and categories",
     "description": """
         This module extends product functionality with:
@@ -11,10 +11,11 @@
         - Code fields displayed on the same line as name fields
     """,
     "author": "Asmaa Hassaan",
-    "depends": ["product", "stock", "sale_management"],
+    "depends": ["product", "stock", "sale_management", "frtz_base"],
     "data": [
         "security/ir.model.access.csv",
         "data/product_reference_sequences.xml",
+        "data/ir_cron_data.xml",
         "views/product_template_views.xml",
         "views/product_category_views.xml",
         "views/product_attribute_views.xml",
@@ -0,0 +1,78 @@
+"""
+Fill the template, variant and category search keys in SQL so the ORM does
+not recompute them row by row, and drop the prefix indexes short terms no
+longer use (they go through the standard name search).
+
+Same terms and order as _get_search_key_terms: reference, code, name (and
+the attribute values of a variant) in every installed language, the first
+occurrence of a term only, lower-cased with the whitespace collapsed.
+"""
+
+TABLES = ('product_template', 'product_product', 'product_category')
+
+INSTALLED_LANGS = "(SELECT code, row_number() OVER (ORDER BY name) AS lang_order FROM res_lang WHERE active)"
+
+# (table, query returning (id, lang_order, term_index, term))
+SEARCH_KEY_TERMS = (
+    ('product_template', f"""
+        SELECT t.id, l.lang_order, u.term_index, u.term
+        FROM product_template t
+        CROSS JOIN {INSTALLED_LANGS} l
+        CROSS JOIN LATERAL unnest(ARRAY[
+            t.internal_reference_new,
+            t.default_code,
+            COALESCE(t.name->>l.code, t.name->>'en_US')
+        ]) WITH ORDINALITY AS u(term, term_index)
+    """),
+    ('product_product', f"""
+        SELECT p.id, l.lang_order, u.term_index, u.term
+        FROM product_product p
+        JOIN product_template t ON t.id = p.product_tmpl_id
+        CROSS JOIN {INSTALLED_LANGS} l
+        CROSS JOIN LATERAL unnest(
+            ARRAY[
+                t.internal_reference_new,
+                p.default_code,
+                COALESCE(t.name->>l.code, t.name->>'en_US')
+            ] || ARRAY(
+                SELECT COALESCE(v.name->>l.code, v.name->>'en_US')
+                FROM product_variant_combination c
+                JOIN product_template_attribute_value ptav ON ptav.id = c.product_template_attribute_value_id
+                JOIN product_attribute_value v ON v.id = ptav.product_attribute_value_id
+                WHERE c.product_product_id = p.id
+                ORDER BY ptav.id
+            )
+        ) WITH ORDINALITY AS u(term, term_index)
+    """),
+    ('product_category', """
+        SELECT c.id, 1 AS lang_order, u.term_index, u.term
+        FROM product_category c
+        CROSS JOIN LATERAL unnest(ARRAY[c.code, c.name]) WITH ORDINALITY AS u(term, term_index)
+    """),
+)
+
+
+def migrate(cr, version):
+    for table in TABLES:
+        cr.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_key VARCHAR")
+        cr.execute(f"DROP INDEX IF EXISTS {table}_search_key_prefix_index")
+    for table, terms in SEARCH_KEY_TERMS:
+        cr.execute(
+            f"""
+            UPDATE {table} r
+            SET search_key = k.search_key
+            FROM (
+                SELECT id, NULLIF(lower(btrim(regexp_replace(
+                    string_agg(term, ' ' ORDER BY lang_order, term_index), '\\s+', ' ', 'g'
+                ))), '') AS search_key
+                FROM (
+                    SELECT DISTINCT ON (id, term) id, lang_order, term_index, term
+                    FROM ({terms}) terms
+                    WHERE COALESCE(term, '') != ''
+                    ORDER BY id, term, lang_order, term_index
+                ) first_terms
+                GROUP BY id
+            ) k
+            WHERE r.id = k.id
+            """
+        )
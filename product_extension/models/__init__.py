@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from . import ir_sequence
+from . import product_search_mixin
 from . import product_template
 from . import product_product
 from . import product_category
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+from odoo.addons.base.models.ir_sequence import _update_nogap
+
+
+class IrSequence(models.Model):
+    _inherit = "ir.sequence"
+
+    def _next_batch(self, count, sequence_date=None):
+        """Reserve `count` consecutive numbers in one round-trip.
+
+        Same numbers and formatting as `count` calls to next_by_id(); a
+        standard sequence draws them with a single nextval() query, a no-gap
+        sequence with a single increment. Date-range sequences keep the
+        per-number path.
+
+        Returns:
+            list: formatted sequence values
+        """
+        self.ensure_one()
+        if count <= 0:
+            return []
+        if self.use_date_range:
+            return [self._next(sequence_date=sequence_date) for _index in range(count)]
+        if self.implementation == "standard":
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ["ir_sequence_%03d" % self.id, count],
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            first = _update_nogap(self, self.number_increment * count)
+            numbers = [first + index * self.number_increment for index in range(count)]
+        return [self.get_next_char(number) for number in numbers]
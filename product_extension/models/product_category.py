@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, _
+import logging
+
+import psycopg2
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
 
 class ProductCategory(models.Model):
-    _inherit = "product.category"
+    _inherit = ["product.category", "product.search.mixin"]
 
     code = fields.Char(
         string="Code",
@@ -89,13 +95,6 @@ class ProductCategory(models.Model):
                 name = f"{category.code} {name}"
             category.display_name = name
 
-    def name_get(self):
-        """Override to return formatted display name"""
-        result = []
-        for category in self:
-            result.append((category.id, category.display_name or category.name))
-        return result
-
     def write(self, vals):
         """Override write to strip code and ensure uniqueness"""
         if 'code' in vals and vals['code']:
@@ -113,33 +112,58 @@ class ProductCategory(models.Model):
     
     @api.constrains('code')
     def _check_unique_code(self):
-        """Ensure category code is unique (case-insensitive)"""
-        for category in self:
-            if category.code:
-                # Search for other categories with the same code (case-insensitive)
-                duplicate = self.search([
-                    ('code', '=ilike', category.code),
-                    ('id', '!=', category.id)
-                ], limit=1)
-                if duplicate:
-                    raise ValidationError(
-                        _("Category code '%s' already exists in category '%s'. Please use a unique code.") % (
-                            category.code, duplicate.name
-                        )
-                    )
+        """Ensure category codes are unique (case-insensitive), with one grouped query for all categories"""
+        codes = {category.code.lower() for category in self if category.code}
+        if not codes:
+            return
+        self.flush_model(['code', 'name'])
+        self.env.cr.execute(
+            """
+            SELECT lower(code), array_agg(name ORDER BY id)
+            FROM product_category
+            WHERE lower(code) = ANY(%s)
+            GROUP BY lower(code)
+            HAVING count(*) > 1
+            """,
+            [list(codes)],
+        )
+        errors = [
+            _("Category code '%(code)s' is used by several categories: %(categories)s. Please use a unique code.") % {
+                'code': code,
+                'categories': ', '.join(names),
+            }
+            for code, names in self.env.cr.fetchall()
+        ]
+        if errors:
+            raise ValidationError('\n'.join(errors))
+
+    def init(self):
+        super().init()
+        self._init_search_key_indexes()
+        # Back the case-insensitive code uniqueness by an index, unless existing data already violates it
+        try:
+            with self.env.cr.savepoint(flush=False):
+                tools.create_unique_index(
+                    self.env.cr, 'product_category_code_lower_unique', self._table, ['lower(code)'],
+                )
+        except psycopg2.Error as e:
+            _logger.warning(f"Could not create the case-insensitive category code index: {str(e)}")
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        return self._search_by_key(name, domain, operator, limit=limit, order=order)
+
+    @api.depends('code', 'name')
+    def _compute_search_key(self):
+        super()._compute_search_key()
+
+    def _get_search_key_terms(self):
+        self.ensure_one()
+        return [self.code, self.name]
 
     @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        """
-        Override name_search to include code in search
-        Allows searching by both name and code
-        """
-        args = args or []
-        domain = []
-        if name:
-            domain = ['|', ('name', operator, name), ('code', operator, name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
+    def _get_search_reference_fields(self):
+        return ['code']
 
     _sql_constraints = [
         ('unique_code', 'UNIQUE(code)', 'Category code must be unique!')
@@ -3,7 +3,9 @@ from odoo import api, fields, models, _
 
 
 class ProductProduct(models.Model):
-    _inherit = "product.product"
+    _inherit = ["product.product", "product.search.mixin", "deferred.recompute.mixin"]
+    _deferred_recompute_cron = 'product_extension.ir_cron_recompute_variant_deferred'
+    _deferred_recompute_param = 'product_extension.variant_recompute_defer_threshold'
 
     display_name = fields.Char(
         string='Display Name',
@@ -23,23 +25,42 @@ class ProductProduct(models.Model):
                 name = f"{ref} {name}"
             product.display_name = name
 
-    def name_get(self):
-        """Override to return formatted display name"""
-        result = []
-        for product in self:
-            result.append((product.id, product.display_name or product.name))
-        return result
+    def init(self):
+        super().init()
+        self._init_search_key_indexes()
+        self._init_recompute_pending_index()
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._should_defer_recompute():
+            self._defer_recompute()
+        return res
+
+    def _get_deferred_recompute_fields(self):
+        return super()._get_deferred_recompute_fields() + ['display_name', 'search_key']
 
     @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        """
-        Override name_search to include internal_reference_new and default_code in search
-        Allows searching by name, template internal_reference_new, or default_code
-        """
-        args = args or []
-        domain = []
-        if name:
-            domain = ['|', '|', ('name', operator, name), ('product_tmpl_id.internal_reference_new', operator, name), ('default_code', operator, name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        return self._search_by_key(name, domain, operator, limit=limit, order=order)
 
+    @api.depends(
+        'default_code',
+        'product_tmpl_id.internal_reference_new',
+        'product_tmpl_id.name',
+        'product_template_attribute_value_ids.product_attribute_value_id.name',
+    )
+    def _compute_search_key(self):
+        super()._compute_search_key()
+
+    def _get_search_key_terms(self):
+        self.ensure_one()
+        return [
+            self.internal_reference_new,
+            self.default_code,
+            self.name,
+            *self.product_template_attribute_value_ids.mapped('name'),
+        ]
+
+    @api.model
+    def _get_search_reference_fields(self):
+        return ['internal_reference_new', 'default_code', 'barcode']
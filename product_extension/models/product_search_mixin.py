@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+
+from odoo import api, fields, models, tools
+from odoo.modules.db import has_trigram
+from odoo.osv import expression
+from odoo.tools import SQL, escape_psql
+
+# Below this length a trigram index cannot help; the name and reference fields are searched instead.
+SEARCH_KEY_TRIGRAM_MIN_LENGTH = 3
+
+
+def normalize_search_key(value):
+    """Lower-case a product search string and collapse its whitespace."""
+    if not value:
+        return ''
+    return ' '.join(value.split()).lower()
+
+
+class ProductSearchMixin(models.AbstractModel):
+    """
+    Stored search key for product, template and category name searches.
+
+    Inheriting models list their key terms (reference first) in
+    _get_search_key_terms and their exact reference fields in
+    _get_search_reference_fields, and call _init_search_key_indexes from
+    init() and _search_by_key from _name_search (the product models override
+    both, so the mixin cannot hook them itself). The key is indexed with a
+    trigram GIN index; terms shorter than a trigram and other operators
+    than ``ilike`` are matched on the name and reference fields.
+    """
+    _name = 'product.search.mixin'
+    _description = 'Product Search Key'
+
+    search_key = fields.Char(
+        string='Search Key',
+        compute='_compute_search_key',
+        store=True,
+        copy=False,
+        help="Normalized reference, code and name terms used by the name search.",
+    )
+
+    def _init_search_key_indexes(self):
+        cr = self.env.cr
+        if has_trigram(cr):
+            tools.create_index(
+                cr, f'{self._table}_search_key_trgm_index', self._table,
+                ['search_key gin_trgm_ops'], method='gin',
+            )
+
+    def _get_search_key_terms(self):
+        """Terms of the search key of one record, in the current language."""
+        self.ensure_one()
+        return []
+
+    @api.model
+    def _get_search_reference_fields(self):
+        """Fields matched exactly by reference lookups, by precedence."""
+        return []
+
+    def _compute_search_key(self):
+        # Translated names are searchable in every installed language.
+        langs = [code for code, _label in self.env['res.lang'].get_installed()]
+        translated = [self.with_context(lang=lang) for lang in langs]
+        for index, record in enumerate(self):
+            terms = []
+            for records in translated:
+                for term in records[index]._get_search_key_terms():
+                    if term and term not in terms:
+                        terms.append(term)
+            record.search_key = normalize_search_key(' '.join(terms)) or False
+
+    @api.model
+    def _search_by_key(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """
+        Exact reference hits first, then records whose search key contains
+        every term, ranked by key prefix and trigram similarity.
+
+        A search that is not a plain ``ilike`` one on a term of at least
+        SEARCH_KEY_TRIGRAM_MIN_LENGTH characters matches the name and the
+        reference fields with the caller's operator instead.
+        """
+        domain = domain or []
+        search_key = normalize_search_key(name)
+        if operator != 'ilike' or len(search_key) < SEARCH_KEY_TRIGRAM_MIN_LENGTH:
+            return self._search_by_name_or_reference(name, domain, operator, limit=limit, order=order)
+
+        reference = name.strip()
+        reference_fields = self._get_search_reference_fields()
+        ids = []
+        if reference_fields:
+            ids = list(self._search(
+                expression.AND([
+                    domain,
+                    expression.OR([[(field_name, '=', reference)] for field_name in reference_fields]),
+                ]),
+                limit=limit,
+                order=order,
+            ))
+            if limit and len(ids) >= limit:
+                return ids
+
+        key_domain = [('search_key', 'like', token) for token in search_key.split()]
+        if ids:
+            key_domain.append(('id', 'not in', ids))
+        query = self._search(expression.AND([domain, key_domain]))
+        column = SQL.identifier(query.table, 'search_key')
+        ranking = [SQL("%s LIKE %s DESC", column, f'{escape_psql(search_key)}%')]
+        if self.env.registry.has_trigram:
+            ranking.append(SQL("similarity(%s, %s) DESC", column, search_key))
+        ranking.append(SQL.identifier(query.table, 'id'))
+        query.order = SQL(", ").join(ranking)
+        query.limit = limit and limit - len(ids)
+        return ids + list(query)
+
+    @api.model
+    def _search_by_name_or_reference(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Records whose name or one of the reference fields matches ``name`` with ``operator``."""
+        conditions = [
+            [(field_name, operator, name)]
+            for field_name in [self._rec_name, *self._get_search_reference_fields()]
+        ]
+        if operator in expression.NEGATIVE_TERM_OPERATORS:
+            name_domain = expression.AND(conditions)
+        else:
+            name_domain = expression.OR(conditions)
+        return self._search(expression.AND([domain or [], name_domain]), limit=limit, order=order)
+
+    @api.model
+    def _resolve_references(self, references, domain=None):
+        """
+        Resolve many references with one query, e.g. for imports.
+
+        Returns a dict reference -> record id, False when the reference is
+        ambiguous; unknown references are left out. Earlier reference fields
+        take precedence over later ones.
+        """
+        references = sorted({reference.strip() for reference in references if reference and reference.strip()})
+        reference_fields = self._get_search_reference_fields()
+        if not references or not reference_fields:
+            return {}
+        records = self.search_fetch(
+            expression.AND([
+                domain or [],
+                expression.OR([[(field_name, 'in', references)] for field_name in reference_fields]),
+            ]),
+            reference_fields,
+        )
+        index = {field_name: defaultdict(list) for field_name in reference_fields}
+        for record in records:
+            for field_name in reference_fields:
+                if record[field_name]:
+                    index[field_name][record[field_name]].append(record.id)
+        result = {}
+        for reference in references:
+            for field_name in reference_fields:
+                record_ids = index[field_name].get(reference)
+                if record_ids:
+                    result[reference] = record_ids[0] if len(record_ids) == 1 else False
+                    break
+        return result
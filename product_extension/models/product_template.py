@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
-from email.policy import default
+from collections import Counter, defaultdict
 
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 
 class ProductTemplate(models.Model):
-    _inherit = "product.template"
+    _inherit = ["product.template", "product.search.mixin", "deferred.recompute.mixin"]
+    _deferred_recompute_cron = 'product_extension.ir_cron_recompute_template_deferred'
+    _deferred_recompute_param = 'product_extension.template_recompute_defer_threshold'
 
     code = fields.Char(
         string="Code",
@@ -26,7 +29,8 @@ class ProductTemplate(models.Model):
         index=True
     )
     internal_reference_new = fields.Char(
-        string="Internal Reference"
+        string="Internal Reference",
+        index=True
     )
     cost_method = fields.Selection(
         related='categ_id.property_cost_method',
@@ -37,180 +41,248 @@ class ProductTemplate(models.Model):
     def write(self, vals):
         """Override write to auto-generate reference when category changes to automatic"""
         # Check if category is being changed
+        references = {}
         if 'categ_id' in vals and not vals.get('internal_reference_new'):
             category = self.env['product.category'].browse(vals['categ_id'])
             if category.reference_type == 'automatic':
-                # Generate reference for records that don't have one
-                for product in self:
-                    if not product.internal_reference_new:
-                        generated_ref = self._generate_automatic_reference(category)
-                        if generated_ref:
-                            product.internal_reference_new = generated_ref
-        
-        return super().write(vals)
+                # Generate reference for records that don't have one, in one sequence call
+                products = self.filtered(lambda product: not product.internal_reference_new)
+                references = dict(zip(products, self._reserve_automatic_references(category, len(products))))
+                self._write_internal_references(references)
 
-    def _generate_automatic_reference(self, category):
-        """Generate automatic reference based on category configuration"""
-        # Get sequence from category or use default
-        sequence = category.reference_sequence_id
-        if not sequence:
-            # Use default sequence
-            sequence = self.env.ref(
-                'product_extension.seq_product_reference_default',
-                raise_if_not_found=False
-            )
-        
-        if not sequence:
-            return False
-        
-        # Generate reference using sequence
-        generated_ref = sequence.next_by_id()
-        if not generated_ref:
-            return False
-        
-        # Apply validation rules if set (for formatting)
+        res = super().write(vals)
+        if self._should_defer_recompute():
+            self._defer_recompute()
+        if references or {'name', 'internal_reference_new'} & set(vals):
+            # The variants' stored display names and search keys are built from the template name and reference
+            variants = self.with_context(active_test=False).product_variant_ids
+            if variants._should_defer_recompute():
+                variants._defer_recompute()
+        return res
+
+    def _get_deferred_recompute_fields(self):
+        return super()._get_deferred_recompute_fields() + ['display_name', 'search_key']
+
+    def _get_reference_sequence(self, category):
+        """Sequence of the category, or the default product reference sequence"""
+        return category.reference_sequence_id or self.env.ref(
+            'product_extension.seq_product_reference_default',
+            raise_if_not_found=False
+        )
+
+    def _format_automatic_reference(self, category, generated_ref):
+        """Apply the category length and character rules to a sequence value"""
         if category.validate_length and category.reference_length:
             # Pad or truncate to required length
             if category.validate_type and category.reference_char_type == 'number':
                 # Ensure numeric and pad with zeros
-                try:
-                    num = int(''.join(filter(str.isdigit, generated_ref)) or '0')
-                    generated_ref = str(num).zfill(category.reference_length)
-                except:
-                    generated_ref = generated_ref[:category.reference_length].zfill(category.reference_length)
+                num = int(''.join(filter(str.isdigit, generated_ref)) or '0')
+                generated_ref = str(num).zfill(category.reference_length)
             else:
                 # Mixed: truncate or pad
                 generated_ref = generated_ref[:category.reference_length].ljust(
                     category.reference_length, '0'
                 )
-        
         return generated_ref
 
+    def _reserve_automatic_references(self, category, count):
+        """
+        Reserve `count` references of an automatic category: one sequence call,
+        formatting in memory and one uniqueness query for the whole batch.
+        """
+        sequence = self._get_reference_sequence(category)
+        if not sequence or count <= 0:
+            return []
+        sequence.check_access('read')
+        references = [
+            self._format_automatic_reference(category, generated_ref)
+            for generated_ref in sequence._next_batch(count)
+            if generated_ref
+        ]
+        self._check_automatic_references_unique(category, references)
+        return references
+
+    def _check_automatic_references_unique(self, category, references):
+        """Raise when formatting made references collide, within the batch or with existing products"""
+        duplicates = {reference for reference, count in Counter(references).items() if count > 1}
+        existing = self.with_context(active_test=False).search_fetch(
+            [('internal_reference_new', 'in', references)], ['internal_reference_new'],
+        )
+        duplicates.update(existing.mapped('internal_reference_new'))
+        if duplicates:
+            raise ValidationError(
+                _("The automatic references %(references)s generated for category '%(category)s' are already used. "
+                  "Check the sequence and the reference length of the category.") % {
+                    'references': ', '.join(sorted(duplicates)),
+                    'category': category.name,
+                }
+            )
+
+    def _write_internal_references(self, references):
+        """
+        Write a distinct reference per product ({product: reference}) with one
+        UPDATE and mark the dependent stored fields for one recompute. The
+        reference rules are validated by the write of the new category.
+        """
+        if not references:
+            return
+        products = self.browse([product.id for product in references])
+        products.flush_recordset(['internal_reference_new'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE product_template t
+            SET internal_reference_new = v.reference
+            FROM (VALUES %s) AS v(id, reference)
+            WHERE t.id = v.id
+            """,
+            SQL(", ").join(SQL("(%s::int, %s)", product.id, reference) for product, reference in references.items()),
+        ))
+        products.invalidate_recordset(['internal_reference_new'])
+        products.modified(['internal_reference_new'])
+
+    def _generate_automatic_reference(self, category):
+        """Generate automatic reference based on category configuration"""
+        references = self._reserve_automatic_references(category, 1)
+        return references[0] if references else False
+
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to auto-generate internal reference when category is set to automatic"""
-        # vals_list is always a list when using @api.model_create_multi
+        # Group the products that need a reference by category, one sequence call per category
+        pending = defaultdict(list)
         for vals in vals_list:
-            # Generate reference if category is set to automatic and reference is not provided
-            if not vals.get('internal_reference_new'):
-                categ_id = vals.get('categ_id')
-                if categ_id:
-                    category = self.env['product.category'].browse(categ_id)
-                    if category.reference_type == 'automatic':
-                        generated_ref = self._generate_automatic_reference(category)
-                        if generated_ref:
-                            vals['internal_reference_new'] = generated_ref
-        
+            if not vals.get('internal_reference_new') and vals.get('categ_id'):
+                pending[vals['categ_id']].append(vals)
+        for category in self.env['product.category'].browse(list(pending)):
+            if category.reference_type != 'automatic':
+                continue
+            references = self._reserve_automatic_references(category, len(pending[category.id]))
+            for vals, reference in zip(pending[category.id], references):
+                vals['internal_reference_new'] = reference
+
         return super().create(vals_list)
 
+    def _format_constraint_products(self, limit=10):
+        """Comma separated product names for a validation message, truncated to `limit` names"""
+        names = ', '.join(self[:limit].mapped('display_name'))
+        if len(self) > limit:
+            names = _("%(names)s and %(count)d more") % {'names': names, 'count': len(self) - limit}
+        return names
+
     @api.constrains('type', 'categ_id')
     def _check_product_type_in_category(self):
-        """Validate that product type is allowed in the selected category"""
-        for product in self:
-            if not product.categ_id:
-                continue  # No category, allow any type
-            
-            category = product.categ_id
-            
-            # Check if any restrictions are set (any boolean is True)
-            has_restrictions = category.allow_consu or category.allow_service or category.allow_combo
-            
-            if not has_restrictions:
-                continue  # No restrictions set, allow any type
-            
-            # Check if the product type is allowed based on boolean fields
-            type_allowed = False
-            if product.type == 'consu' and category.allow_consu:
-                type_allowed = True
-            elif product.type == 'service' and category.allow_service:
-                type_allowed = True
-            elif product.type == 'combo' and category.allow_combo:
-                type_allowed = True
-            
-            if not type_allowed:
-                type_labels = {
-                    'consu': 'Goods',
-                    'service': 'Service',
-                    'combo': 'Combo'
-                }
-                current_label = type_labels.get(product.type, product.type)
-                
-                # Build list of allowed types
-                allowed_labels = []
-                if category.allow_consu:
-                    allowed_labels.append('Goods')
-                if category.allow_service:
-                    allowed_labels.append('Service')
-                if category.allow_combo:
-                    allowed_labels.append('Combo')
-                
-                raise ValidationError(
+        """Validate that product type is allowed in the selected category, for all products at once"""
+        type_labels = {
+            'consu': _('Goods'),
+            'service': _('Service'),
+            'combo': _('Combo'),
+        }
+        errors = []
+        self.categ_id.fetch(['name', 'allow_consu', 'allow_service', 'allow_combo'])
+        for category, products in self.grouped('categ_id').items():
+            # No category or no restrictions set: allow any type
+            allowed_types = {
+                product_type
+                for product_type, allowed in (
+                    ('consu', category.allow_consu),
+                    ('service', category.allow_service),
+                    ('combo', category.allow_combo),
+                )
+                if allowed
+            }
+            if not category or not allowed_types:
+                continue
+            for product_type, invalid in products.filtered(lambda p: p.type not in allowed_types).grouped('type').items():
+                errors.append(
                     _("Product type '%(current)s' is not allowed in category '%(category)s'. "
-                      "Allowed types: %(allowed)s") % {
-                        'current': current_label,
+                      "Allowed types: %(allowed)s (products: %(products)s)") % {
+                        'current': type_labels.get(product_type, product_type),
                         'category': category.name,
-                        'allowed': ', '.join(allowed_labels)
+                        'allowed': ', '.join(type_labels[t] for t in ('consu', 'service', 'combo') if t in allowed_types),
+                        'products': invalid._format_constraint_products(),
                     }
                 )
+        if errors:
+            raise ValidationError('\n'.join(errors))
 
     @api.constrains('internal_reference_new', 'categ_id')
     def _check_internal_reference_new(self):
-        """Enhanced validation for internal reference based on category rules"""
-        for product in self:
-            cat = product.categ_id
-            ref = product.internal_reference_new or ''
-
+        """Enhanced validation for internal reference based on category rules, for all products at once"""
+        errors = []
+        self.categ_id.fetch([
+            'name', 'reference_type', 'validate_length', 'reference_length',
+            'validate_type', 'reference_char_type',
+        ])
+        for cat, products in self.grouped('categ_id').items():
             # Skip validation if no category or manual mode
             if not cat or cat.reference_type == 'manual':
                 continue
-            
-            # Skip validation if automatic (system generates, should be valid)
-            if cat.reference_type == 'automatic':
-                # Just ensure it's not empty (should be generated)
-                if not ref:
-                    raise ValidationError(
-                        _("Internal Reference should be automatically generated for category '%s'. "
-                          "Please save the product again or check the sequence configuration.") % cat.name
+
+            missing = products.filtered(lambda p: not p.internal_reference_new)
+            if missing:
+                if cat.reference_type == 'automatic':
+                    errors.append(
+                        _("Internal Reference should be automatically generated for category '%(category)s'. "
+                          "Please save the product again or check the sequence configuration. "
+                          "(products: %(products)s)") % {
+                            'category': cat.name,
+                            'products': missing._format_constraint_products(),
+                        }
+                    )
+                elif cat.reference_type == 'validation':
+                    errors.append(
+                        _("Internal Reference is required for category '%(category)s'. (products: %(products)s)") % {
+                            'category': cat.name,
+                            'products': missing._format_constraint_products(),
+                        }
                     )
+
+            # Automatic references are generated by the system and valid by construction
+            if cat.reference_type != 'validation':
                 continue
-            
-            # Validation mode: enforce rules
-            if cat.reference_type == 'validation':
-                # Check if reference is provided (required when validation is enabled)
-                if not ref:
-                    raise ValidationError(
-                        _("Internal Reference is required for category '%s'.") % cat.name
+            products -= missing
+
+            # Length validation (if enabled and a length is set)
+            if cat.validate_length and cat.reference_length:
+                wrong_length = products.filtered(lambda p: len(p.internal_reference_new) != cat.reference_length)
+                if wrong_length:
+                    errors.append(
+                        _("Internal Reference must be exactly %(length)d characters for category '%(category)s'. "
+                          "(products: %(products)s)") % {
+                            'length': cat.reference_length,
+                            'category': cat.name,
+                            'products': wrong_length._format_constraint_products(),
+                        }
                     )
-                
-                # Length validation (if enabled)
-                if cat.validate_length:
-                    if not cat.reference_length:
-                        continue  # No length set, skip length validation
-                    if len(ref) != cat.reference_length:  # Fixed: use != instead of >
-                        raise ValidationError(
-                            _("Internal Reference must be exactly %(length)d characters for category '%(category)s'. "
-                              "Current length: %(current)d") % {
-                                'length': cat.reference_length,
-                                'category': cat.name,
-                                'current': len(ref)
-                            }
-                        )
-                
-                # Type validation (if enabled)
-                if cat.validate_type:
-                    if cat.reference_char_type == 'number':
-                        if not ref.isdigit():
-                            raise ValidationError(
-                                _("Internal Reference must contain numbers only for category '%s'.") % cat.name
-                            )
-                    elif cat.reference_char_type == 'mix':
-                        # Enhanced mix validation: must contain both letters and numbers
-                        has_letter = any(c.isalpha() for c in ref)
-                        has_digit = any(c.isdigit() for c in ref)
-                        if not (has_letter and has_digit):
-                            raise ValidationError(
-                                _("Internal Reference must contain both letters and numbers for category '%s'.") % cat.name
-                            )
+                    products -= wrong_length
+
+            # Type validation (if enabled)
+            if cat.validate_type and cat.reference_char_type == 'number':
+                invalid = products.filtered(lambda p: not p.internal_reference_new.isdigit())
+                if invalid:
+                    errors.append(
+                        _("Internal Reference must contain numbers only for category '%(category)s'. "
+                          "(products: %(products)s)") % {
+                            'category': cat.name,
+                            'products': invalid._format_constraint_products(),
+                        }
+                    )
+            elif cat.validate_type and cat.reference_char_type == 'mix':
+                # Mix validation: must contain both letters and numbers
+                invalid = products.filtered(lambda p: not (
+                    any(c.isalpha() for c in p.internal_reference_new)
+                    and any(c.isdigit() for c in p.internal_reference_new)
+                ))
+                if invalid:
+                    errors.append(
+                        _("Internal Reference must contain both letters and numbers for category '%(category)s'. "
+                          "(products: %(products)s)") % {
+                            'category': cat.name,
+                            'products': invalid._format_constraint_products(),
+                        }
+                    )
+        if errors:
+            raise ValidationError('\n'.join(errors))
 
     @api.depends('name', 'internal_reference_new')
     def _compute_display_name(self):
@@ -221,22 +293,23 @@ class ProductTemplate(models.Model):
                 name = f"{product.internal_reference_new} {name}"
             product.display_name = name
 
-    def name_get(self):
-        """Override to return formatted display name"""
-        result = []
-        for product in self:
-            result.append((product.id, product.display_name or product.name))
-        return result
+    def init(self):
+        super().init()
+        self._init_search_key_indexes()
+        self._init_recompute_pending_index()
 
     @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        """
-        Override name_search to include internal_reference_new in search
-        Allows searching by both name and internal reference
-        """
-        args = args or []
-        domain = []
-        if name:
-            domain = ['|', ('name', operator, name), ('internal_reference_new', operator, name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        return self._search_by_key(name, domain, operator, limit=limit, order=order)
+
+    @api.depends('internal_reference_new', 'default_code', 'name')
+    def _compute_search_key(self):
+        super()._compute_search_key()
+
+    def _get_search_key_terms(self):
+        self.ensure_one()
+        return [self.internal_reference_new, self.default_code, self.name]
+
+    @api.model
+    def _get_search_reference_fields(self):
+        return ['internal_reference_new', 'default_code']
@@ -1,6 +1,8 @@
 from . import sale_order_type
 from . import sale_order
 from . import sale_order_line
+from . import product_category
 from . import product_product
 from . import product_template
-from . import account_move
\ No newline at end of file
+from . import account_move
+from . import ir_sequence
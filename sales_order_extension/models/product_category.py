@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+from .restriction_cache import clear_restriction_cache, init_restriction_cache, restriction_cached
+
+
+class ProductCategory(models.Model):
+    _inherit = "product.category"
+
+    def init(self):
+        super().init()
+        init_restriction_cache(self.env.cr)
+
+    @api.model
+    @restriction_cached
+    def _get_category_closure(self, category_ids):
+        """Ids of the given categories and all their subcategories, in the restriction cache.
+
+        Resolved from parent_path in one query instead of a child_of search;
+        the cache is cleared whenever the category tree changes.
+
+        Args:
+            category_ids (tuple): sorted category ids
+
+        Returns:
+            frozenset: category ids
+        """
+        if not category_ids:
+            return frozenset()
+        self.flush_model(["parent_path"])
+        self.env.cr.execute(
+            """
+            SELECT child.id
+              FROM product_category root
+              JOIN product_category child ON child.parent_path LIKE root.parent_path || '%%'
+             WHERE root.id IN %s
+            """,
+            [tuple(category_ids)],
+        )
+        return frozenset(row[0] for row in self.env.cr.fetchall())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        clear_restriction_cache(self.env)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "parent_id" in vals:
+            clear_restriction_cache(self.env)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        clear_restriction_cache(self.env)
+        return res
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, models
+from odoo import api, models, tools
 from odoo.osv import expression
 
+from .restriction_cache import restriction_cached
+
 
 class ProductTemplate(models.Model):
     _inherit = "product.template"
@@ -81,15 +83,31 @@ class ProductTemplate(models.Model):
             return True
         return False
 
+    @api.model
+    def _sale_order_type_id_from_context(self):
+        """Sale order type id from SO context, without reading the type itself."""
+        ctx = self.env.context
+        sot_id = self._normalize_context_id(ctx.get("sale_order_type_id"))
+        if not sot_id:
+            sot_id = self._normalize_context_id(ctx.get("default_sale_order_type_id"))
+        if sot_id:
+            return sot_id
+        order_id = self._normalize_context_id(ctx.get("order_id"))
+        if order_id:
+            order = self.env["sale.order"].browse(order_id)
+            if order.exists():
+                return order.sale_order_type_id.id
+        return False
+
     @api.model
     def _sale_order_product_type_from_context(self):
         """Resolve consu/service/combo from SO context (no nested fields in XML — use order_id / sale_order_type_id)."""
         pt = self.env.context.get("restrict_order_product_type")
         if pt:
             return pt
-        sot = self._resolve_sale_order_type_from_context()
-        if sot:
-            return sot.product_type
+        sot_id = self._sale_order_type_id_from_context()
+        if sot_id:
+            return self.env["sale.order.type"]._get_product_restriction(sot_id)[0]
         return False
 
     @api.model
@@ -107,19 +125,25 @@ class ProductTemplate(models.Model):
 
     @api.model
     def _sale_order_allowed_category_ids(self):
-        cat_ids = self._sale_order_product_categories_from_context()
-        if not cat_ids:
-            return []
-        return self.env["product.category"].search([("id", "child_of", cat_ids)]).ids
+        """Allowed category closure for the SO context (cached), None when unrestricted."""
+        cat_ids = self._normalize_context_id_list(
+            self.env.context.get("restrict_order_product_category_ids")
+        )
+        if cat_ids:
+            return self.env["product.category"]._get_category_closure(tuple(sorted(set(cat_ids))))
+        sot_id = self._sale_order_type_id_from_context()
+        if sot_id:
+            return self.env["sale.order.type"]._get_product_restriction(sot_id)[1]
+        return None
 
     @api.model
     def _sale_order_product_category_domain(self, categ_field="categ_id"):
         allowed = self._sale_order_allowed_category_ids()
-        if not allowed:
-            if self._sale_order_product_categories_from_context():
-                return [(categ_field, "=", False)]
+        if allowed is None:
             return []
-        return [(categ_field, "in", allowed)]
+        if not allowed:
+            return [(categ_field, "=", False)]
+        return [(categ_field, "in", sorted(allowed))]
 
     @api.model
     def default_get(self, fields_list):
@@ -153,18 +177,79 @@ class ProductTemplate(models.Model):
                 return True
         return False
 
+    @api.model
+    def _sale_order_product_restriction_key(self):
+        """Frozen restriction of the SO context, () outside a sale order product context.
+
+        Only context values are normalized here (no type is read), so the key
+        is cheap to build on every search; extend it to add contributors.
+
+        Returns:
+            tuple: sorted (name, value) pairs
+        """
+        ctx = self.env.context
+        if ctx.get("skip_sale_order_product_type_search") or not self._in_sale_order_product_context():
+            return ()
+        return tuple(sorted({
+            "type_id": self._sale_order_type_id_from_context(),
+            "product_type": ctx.get("restrict_order_product_type") or False,
+            "category_ids": tuple(sorted(set(
+                self._normalize_context_id_list(ctx.get("restrict_order_product_category_ids"))
+            ))),
+        }.items()))
+
+    @api.model
+    def _sale_order_product_domain_parts(self, restriction):
+        """Domains restricting order products for a restriction (dict of the key).
+
+        Leaves only use fields available on both product.template and
+        product.product, so the combined domain applies to both models.
+        """
+        parts = []
+        type_restriction = (False, None, False)
+        if restriction["type_id"]:
+            type_restriction = self.env["sale.order.type"]._get_product_restriction(restriction["type_id"])
+        product_type = restriction["product_type"] or type_restriction[0]
+        if product_type:
+            parts.append([("type", "=", product_type)])
+        if restriction["category_ids"]:
+            allowed = self.env["product.category"]._get_category_closure(restriction["category_ids"])
+        else:
+            allowed = type_restriction[1]
+        if allowed is not None:
+            parts.append([("categ_id", "in", tuple(sorted(allowed)))] if allowed else [("categ_id", "=", False)])
+        return parts
+
+    @api.model
+    @restriction_cached
+    def _get_sale_order_product_domain(self, key):
+        """Combined domain of all contributors for a restriction key, in the restriction cache."""
+        parts = self._sale_order_product_domain_parts(dict(key))
+        return tuple(expression.AND(parts)) if parts else ()
+
+    @api.model
+    def _sale_order_product_search_domain(self, domain):
+        """Domain to inject into a product search in a sale order context, [] when none applies."""
+        if self._domain_targets_explicit_ids(domain):
+            return []
+        key = self._sale_order_product_restriction_key()
+        if not key:
+            return []
+        return list(self._get_sale_order_product_domain(key))
+
+    def init(self):
+        super().init()
+        # Order product searches filter templates on type and category together.
+        tools.create_index(
+            self._cr,
+            "product_template_type_categ_id_index",
+            self._table,
+            ["type", "categ_id"],
+        )
+
     @api.model
     def _search(self, domain, *args, **kwargs):
-        domain = list(domain or [])
-        if (
-            not self.env.context.get("skip_sale_order_product_type_search")
-            and not self._domain_targets_explicit_ids(domain)
-            and self._in_sale_order_product_context()
-        ):
-            pt = self._sale_order_product_type_from_context()
-            if pt:
-                domain = expression.AND([domain, [("type", "=", pt)]])
-            cat_domain = self._sale_order_product_category_domain()
-            if cat_domain:
-                domain = expression.AND([domain, cat_domain])
+        restriction = self._sale_order_product_search_domain(domain)
+        if restriction:
+            domain = expression.AND([list(domain or []), restriction])
         return super()._search(domain, *args, **kwargs)
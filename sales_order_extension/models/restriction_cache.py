@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Cache of the sale order product restrictions (category closures, type
+restrictions and the combined product domains).
+
+They change with the category tree and the order types, which would
+otherwise clear the whole registry cache. Values live in the registry and
+are keyed by the last value of a dedicated sequence: a change clears this
+worker's values right away and bumps the sequence once its transaction is
+committed, so the other workers drop theirs on their next transaction.
+"""
+import functools
+
+from odoo.tools import SQL
+from odoo.tools.lru import LRU
+
+RESTRICTION_CACHE_SIZE = 1024
+RESTRICTION_CACHE_SEQUENCE = "sales_order_extension_restriction_cache_seq"
+RESTRICTION_CACHE_VERSION_KEY = "sales_order_extension.restriction_cache_version"
+RESTRICTION_CACHE_SIGNAL_KEY = "sales_order_extension.restriction_cache_signal"
+
+
+def init_restriction_cache(cr):
+    cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(RESTRICTION_CACHE_SEQUENCE)))
+
+
+def _get_restriction_cache(env):
+    """This worker's values for the current sequence value, read once per transaction."""
+    cr = env.cr
+    version = cr.precommit.data.get(RESTRICTION_CACHE_VERSION_KEY)
+    if version is None:
+        cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(RESTRICTION_CACHE_SEQUENCE)))
+        version = cr.precommit.data[RESTRICTION_CACHE_VERSION_KEY] = cr.fetchone()[0]
+    cache = getattr(env.registry, "_sale_order_restriction_cache", None)
+    if cache is None or cache[0] != version:
+        cache = env.registry._sale_order_restriction_cache = (version, LRU(RESTRICTION_CACHE_SIZE))
+    return cache[1]
+
+
+def _clear_worker_restriction_cache(registry):
+    registry._sale_order_restriction_cache = None
+
+
+def _signal_restriction_cache(registry):
+    with registry.cursor() as cr:
+        cr.execute(SQL("SELECT nextval(%s)", RESTRICTION_CACHE_SEQUENCE))
+
+
+def clear_restriction_cache(env):
+    """Drop the cached restrictions here now and in every worker after commit."""
+    registry = env.registry
+    cr = env.cr
+    _clear_worker_restriction_cache(registry)
+    if not cr.postcommit.data.get(RESTRICTION_CACHE_SIGNAL_KEY):
+        cr.postcommit.data[RESTRICTION_CACHE_SIGNAL_KEY] = True
+        cr.postcommit.add(functools.partial(_signal_restriction_cache, registry))
+        # Values computed from the changes must not outlive a rollback.
+        cr.postrollback.add(functools.partial(_clear_worker_restriction_cache, registry))
+
+
+def restriction_cached(method):
+    """Cache an @api.model method of one hashable argument in the restriction cache."""
+    @functools.wraps(method)
+    def wrapper(self, arg):
+        cache = _get_restriction_cache(self.env)
+        key = (method.__qualname__, arg)
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = method(self, arg)
+            return value
+    return wrapper
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 
 
@@ -229,35 +231,48 @@ class SaleOrder(models.Model):
     @api.model
     def _assign_order_name_from_type(self, vals):
         """Assign SO name from the sale order type's own ir.sequence."""
-        if vals.get("name", "New") != _("New"):
-            return True
-        sot_id = self._resolve_sale_order_type_id(vals)
-        if not sot_id:
-            return False
-        sot = self.env["sale.order.type"].browse(sot_id)
-        if not sot.exists():
-            return False
-        vals.setdefault("sale_order_type_id", sot.id)
-        seq_date = None
-        if vals.get("date_order"):
-            seq_date = fields.Datetime.context_timestamp(
-                self, fields.Datetime.to_datetime(vals["date_order"])
-            )
-        name = sot._get_next_order_name(sequence_date=seq_date)
-        if name:
-            vals["name"] = name
-            return True
-        return False
+        self._assign_order_names_from_types([vals])
+        return vals.get("name", "New") != _("New")
+
+    @api.model
+    def _assign_order_names_from_types(self, vals_list):
+        """Name new orders from their types' sequences, reserving the numbers
+        of each (type, sequence date) group in a single sequence call."""
+        types = self.env["sale.order.type"].browse(
+            {self._resolve_sale_order_type_id(vals) for vals in vals_list} - {False, None}
+        ).exists()
+        groups = defaultdict(list)
+        for vals in vals_list:
+            if vals.get("name", "New") != _("New"):
+                continue
+            sot_id = self._resolve_sale_order_type_id(vals)
+            if sot_id not in types.ids:
+                continue
+            vals.setdefault("sale_order_type_id", sot_id)
+            seq_date = None
+            if vals.get("date_order"):
+                seq_date = fields.Datetime.context_timestamp(
+                    self, fields.Datetime.to_datetime(vals["date_order"])
+                ).date()
+            groups[(sot_id, seq_date)].append(vals)
+        for (sot_id, seq_date), group in groups.items():
+            names = types.browse(sot_id)._reserve_order_names(len(group), sequence_date=seq_date)
+            for vals, name in zip(group, names):
+                if name:
+                    vals["name"] = name
 
     @api.model_create_multi
     def create(self, vals_list):
+        types = self.env["sale.order.type"].browse(
+            {self._resolve_sale_order_type_id(vals) for vals in vals_list} - {False, None}
+        ).exists()
         for vals in vals_list:
             sot_id = self._resolve_sale_order_type_id(vals)
-            if sot_id:
-                sot = self.env["sale.order.type"].browse(sot_id)
-                if sot.exists() and sot.company_id:
-                    vals["company_id"] = sot.company_id.id
-            if not self._assign_order_name_from_type(vals) and vals.get("name", "New") == _("New"):
+            if sot_id in types.ids and types.browse(sot_id).company_id:
+                vals["company_id"] = types.browse(sot_id).company_id.id
+        self._assign_order_names_from_types(vals_list)
+        for vals in vals_list:
+            if vals.get("name", "New") == _("New"):
                 try:
                     seq_date = fields.Datetime.context_timestamp(
                         self, fields.Datetime.to_datetime(vals.get("date_order"))
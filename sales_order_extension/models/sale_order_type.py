@@ -2,6 +2,8 @@ import re
 
 from odoo import api, fields, models, _
 
+from .restriction_cache import clear_restriction_cache, restriction_cached
+
 
 class SaleOrderType(models.Model):
     _name = "sale.order.type"
@@ -144,27 +146,49 @@ class SaleOrderType(models.Model):
         ("name_uniq", "unique(name)", "This sale order type name already exists."),
     ]
 
+    def _get_allowed_category_ids(self):
+        """Allowed category ids (selected categories and their subcategories), None when unrestricted."""
+        self.ensure_one()
+        if not self.product_category_ids:
+            return None
+        return self.env["product.category"]._get_category_closure(
+            tuple(sorted(self.product_category_ids.ids))
+        )
+
     def _is_category_allowed(self, category):
         """Return True if category is empty restriction or product category is within allowed tree."""
         self.ensure_one()
-        if not self.product_category_ids:
+        allowed = self._get_allowed_category_ids()
+        if allowed is None:
             return True
         if not category:
             return False
-        return bool(
-            category.id in self.env["product.category"]
-            .search([("id", "child_of", self.product_category_ids.ids)])
-            .ids
-        )
+        return category.id in allowed
 
     def _product_category_domain(self):
         self.ensure_one()
-        if not self.product_category_ids:
+        allowed = self._get_allowed_category_ids()
+        if allowed is None:
             return []
-        allowed = self.env["product.category"].search(
-            [("id", "child_of", self.product_category_ids.ids)]
-        ).ids
-        return [("categ_id", "in", allowed)] if allowed else [("categ_id", "=", False)]
+        return [("categ_id", "in", sorted(allowed))] if allowed else [("categ_id", "=", False)]
+
+    @api.model
+    @restriction_cached
+    def _get_product_restriction(self, type_id):
+        """Product restriction of a type by id, in the restriction cache.
+
+        Used by the product _search overrides, which run on every autocomplete
+        keystroke in orders, so they do not read the type again.
+
+        Returns:
+            tuple: (product_type, allowed category ids or None when unrestricted,
+                    order_classification); (False, None, False) when the type
+                    does not exist.
+        """
+        sot = self.sudo().browse(type_id).exists()
+        if not sot:
+            return (False, None, False)
+        return (sot.product_type, sot._get_allowed_category_ids(), sot.order_classification)
 
     @api.model
     def _suggest_sequence_prefix(self, name, order_classification=None):
@@ -259,13 +283,36 @@ class SaleOrderType(models.Model):
             seq = IrSequence.create(vals)
             rec.write({"sequence_id": seq.id, "sequence_auto": True})
 
+    def _is_sequence_synced(self):
+        """True when the type's sequence exists and already matches _sequence_values()."""
+        self.ensure_one()
+        seq = self.sequence_id.sudo()
+        if not seq:
+            return False
+        vals = self._sequence_values()
+        return (
+            seq.name == vals["name"]
+            and seq.code == vals["code"]
+            and seq.prefix == vals["prefix"]
+            and seq.padding == vals["padding"]
+            and seq.company_id.id == vals["company_id"]
+        )
+
     def _get_next_order_name(self, sequence_date=None):
         """Return the next order number using this type's dedicated sequence."""
         self.ensure_one()
-        self._ensure_sequence()
+        names = self._reserve_order_names(1, sequence_date=sequence_date)
+        return names[0] if names else False
+
+    def _reserve_order_names(self, count, sequence_date=None):
+        """Reserve `count` order numbers from this type's sequence in one sequence call."""
+        self.ensure_one()
+        if not self._is_sequence_synced():
+            self._ensure_sequence()
         if not self.sequence_id:
-            return False
-        return self.sequence_id.next_by_id(sequence_date=sequence_date)
+            return []
+        self.sequence_id.check_access("read")
+        return self.sequence_id._next_batch(count, sequence_date=sequence_date)
 
     def _sync_default_search_filter(self):
         """Do NOT keep a saved default search filter on the type's screen.
@@ -346,10 +393,13 @@ class SaleOrderType(models.Model):
         records = super().create(vals_list)
         records._ensure_sequence()
         records._ensure_dynamic_menu_and_action()
+        clear_restriction_cache(self.env)
         return records
 
     def write(self, vals):
         res = super().write(vals)
+        if any(k in vals for k in ("product_type", "product_category_ids", "order_classification")):
+            clear_restriction_cache(self.env)
         if any(
             k in vals
             for k in (
@@ -384,4 +434,5 @@ class SaleOrderType(models.Model):
         res = super().unlink()
         if seqs:
             seqs.sudo().unlink()
+        clear_restriction_cache(self.env)
         return res
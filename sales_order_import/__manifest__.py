@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+{
+    "name": "Sales Order Import",
+    "version": "18.0.1.0.1",
+    "summary": "Chunked, resumable import of sale orders with installment plans",
+    "description": """
+        High-volume import of sale orders (XLSX or CSV, one row per order line):
+        - Rows are streamed and grouped into orders by their order reference
+        - Partners, products, order types and pricelists are resolved through
+          per-chunk lookup caches (one search per model and chunk)
+        - Orders are validated and created in batches; payment terms, installment
+          previews and expression repricing run once per chunk instead of per order
+        - Each chunk is committed on its own; an interrupted job resumes after the
+          last committed row, and rejected rows are kept in a downloadable report
+    """,
+    "category": "Sales/Sales",
+    "author": "Your Company",
+    "depends": ["sales_order_extension", "account_invoice_installments", "pricelist_expression"],
+    "data": [
+        "security/ir.model.access.csv",
+        "data/ir_cron_data.xml",
+        "views/sale_order_import_job_views.xml",
+    ],
+    "license": "LGPL-3",
+    "installable": True,
+    "application": False,
+    "auto_install": False,
+}
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import sale_order_import_job
+from . import sale_order_import_error
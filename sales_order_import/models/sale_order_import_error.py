@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+
+class SaleOrderImportError(models.Model):
+    _name = 'sale.order.import.error'
+    _description = 'Sale Order Import Error'
+    _order = 'job_id, row_number, id'
+
+    job_id = fields.Many2one('sale.order.import.job', required=True, ondelete='cascade', index=True)
+    row_number = fields.Integer(string='Row', help='First file row of the rejected order.')
+    order_ref = fields.Char(string='Order Reference')
+    message = fields.Text(string='Error', required=True)
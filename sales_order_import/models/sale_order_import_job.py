@@ -0,0 +1,575 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from odoo import Command, api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+
+_logger = logging.getLogger(__name__)
+
+# Internal column name -> accepted header spellings (lower case).
+IMPORT_COLUMNS = {
+    'order_ref': ('order_ref', 'order reference', 'order', 'reference'),
+    'customer_ref': ('customer_ref', 'customer reference', 'client reference'),
+    'partner': ('partner', 'customer', 'partner reference'),
+    'order_type': ('order_type', 'order type', 'type'),
+    'date_order': ('date_order', 'order date', 'date'),
+    'pricelist': ('pricelist',),
+    'payment_type': ('payment_type', 'payment plan'),
+    'scope': ('scope',),
+    'installment_count': ('installment_count', 'installments'),
+    'first_payment_type': ('first_payment_type', 'first payment type'),
+    'first_payment': ('first_payment', 'first payment', 'first_payment_percentage'),
+    'product': ('product', 'product reference', 'internal reference'),
+    'description': ('description', 'label'),
+    'quantity': ('quantity', 'qty'),
+    'price_unit': ('price_unit', 'unit price', 'price'),
+    'discount': ('discount', 'discount (%)'),
+    'line_installment_count': ('line_installment_count', 'line installments'),
+    'line_first_payment_type': ('line_first_payment_type', 'line first payment type'),
+    'line_first_payment': ('line_first_payment', 'line first payment', 'line_first_payment_percentage'),
+}
+REQUIRED_COLUMNS = ('order_ref', 'partner', 'product', 'quantity')
+
+PAYMENT_TYPES = ('immediate', 'regular', 'irregular')
+SCOPES = ('per_invoice', 'per_lines')
+FIRST_PAYMENT_TYPES = ('percent', 'fixed')
+# A running job whose heartbeat is older than this lost its worker; the cron resumes it.
+STALE_JOB_DELAY = timedelta(minutes=30)
+
+
+class SaleOrderImportRowError(ValueError):
+    pass
+
+
+class SaleOrderImportJob(models.Model):
+    """
+    Chunked, resumable import of sale orders.
+
+    The file holds one row per order line; consecutive rows sharing an order
+    reference form one order. Orders are validated and created `chunk_size`
+    at a time with payment-term generation deferred, then terms, installment
+    previews and installment-dependent repricing run once for the chunk.
+    Every chunk is committed with the job's progress (`last_row`), so an
+    interrupted job resumes after the last committed order. Jobs only run in
+    the cron, which claims each job atomically (see _claim) so a job is never
+    processed by two workers at once.
+    """
+    _name = 'sale.order.import.job'
+    _description = 'Sale Order Import'
+    _order = 'id desc'
+
+    name = fields.Char(required=True, default=lambda self: _('Order Import %s', fields.Date.today()))
+    import_file = fields.Binary(string='File', required=True, attachment=True)
+    import_filename = fields.Char(string='File Name')
+    chunk_size = fields.Integer(default=200, help='Orders created and committed together.')
+    state = fields.Selection(
+        [
+            ('draft', 'Draft'),
+            ('queued', 'Queued'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ],
+        default='draft',
+        required=True,
+        readonly=True,
+        copy=False,
+    )
+    last_row = fields.Integer(
+        readonly=True,
+        copy=False,
+        help='Last file row of the last committed chunk; processing resumes after it.',
+    )
+    order_count = fields.Integer(string='Imported Orders', readonly=True, copy=False)
+    error_count = fields.Integer(string='Rejected Orders', readonly=True, copy=False)
+    duration = fields.Float(string='Duration (s)', readonly=True, copy=False, digits=(16, 1))
+    failure_message = fields.Text(readonly=True, copy=False)
+    heartbeat = fields.Datetime(
+        readonly=True,
+        copy=False,
+        help='Last sign of life of the worker running the job, refreshed with every chunk.',
+    )
+    error_ids = fields.One2many('sale.order.import.error', 'job_id', string='Errors', copy=False)
+    company_id = fields.Many2one('res.company', default=lambda self: self.env.company, required=True)
+
+    # ------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------
+    def action_queue(self):
+        """Process in the background (the cron resumes interrupted jobs)."""
+        self.filtered(lambda job: job.state in ('draft', 'failed')).write({'state': 'queued', 'failure_message': False})
+        cron = self.env.ref('sales_order_import.ir_cron_process_sale_order_import', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return True
+
+    def action_process_now(self):
+        """Start the import right away, in the cron worker rather than in the user's request."""
+        return self.action_queue()
+
+    def action_reset(self):
+        self.filtered(lambda job: job.state != 'running').write({'state': 'draft', 'failure_message': False})
+        return True
+
+    def action_view_orders(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Imported Orders'),
+            'res_model': 'sale.order',
+            'view_mode': 'list,form',
+            'domain': [('origin', '=like', f'{self._get_origin_prefix()}%')],
+        }
+
+    def action_download_errors(self):
+        self.ensure_one()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['row', 'order_ref', 'error'])
+        for error in self.error_ids:
+            writer.writerow([error.row_number, error.order_ref or '', error.message])
+        attachment = self.env['ir.attachment'].create({
+            'name': f'{self.name} - errors.csv',
+            'datas': base64.b64encode(buffer.getvalue().encode('utf-8-sig')),
+            'mimetype': 'text/csv',
+            'res_model': self._name,
+            'res_id': self.id,
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'self',
+        }
+
+    @api.model
+    def _cron_process_import_jobs(self):
+        stale_before = fields.Datetime.now() - STALE_JOB_DELAY
+        jobs = self.search(
+            [
+                '|',
+                ('state', '=', 'queued'),
+                '&', ('state', '=', 'running'),
+                '|', ('heartbeat', '=', False), ('heartbeat', '<', stale_before),
+            ],
+            order='id',
+        )
+        for job in jobs:
+            if job._claim(stale_before):
+                job._process()
+
+    def _claim(self, stale_before):
+        """
+        Atomically move a queued (or stale running) job to running and commit,
+        so concurrent cron workers cannot both process it.
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            UPDATE sale_order_import_job
+            SET state = 'running', heartbeat = %s, failure_message = NULL
+            WHERE id = %s
+              AND (state = 'queued' OR (state = 'running' AND (heartbeat IS NULL OR heartbeat < %s)))
+            RETURNING id
+            """,
+            [fields.Datetime.now(), self.id, stale_before],
+        )
+        claimed = bool(self.env.cr.fetchone())
+        self.invalidate_recordset(['state', 'heartbeat', 'failure_message'])
+        self._commit()
+        return claimed
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+    def _process(self):
+        """Import the remaining orders of a claimed job, one committed chunk at a time."""
+        self.ensure_one()
+        if self.state != 'running':
+            return
+        start = time.perf_counter()
+        lookups = {}
+        chunk = []
+        try:
+            for order in self._iter_orders():
+                chunk.append(order)
+                if len(chunk) >= max(self.chunk_size, 1):
+                    self._process_chunk(chunk, lookups)
+                    chunk = []
+            if chunk:
+                self._process_chunk(chunk, lookups)
+        except Exception as exc:
+            self._rollback()
+            _logger.exception(f"Sale order import {self.id} stopped at row {self.last_row}")
+            self.write({'state': 'failed', 'failure_message': str(exc)})
+            self._commit()
+            return
+        self.write({'state': 'done', 'duration': self.duration + time.perf_counter() - start})
+        self._commit()
+        _logger.info(
+            f"Sale order import {self.id}: {self.order_count} orders imported, "
+            f"{self.error_count} rejected in {self.duration:.1f}s"
+        )
+
+    def _process_chunk(self, chunk, lookups):
+        """Validate, create and finalize a chunk of orders, then commit it with the job progress."""
+        self._prefetch_lookups(chunk, lookups)
+        vals_by_order = []
+        errors = []
+        for order in chunk:
+            try:
+                vals_by_order.append((order, self._prepare_order_vals(order, lookups)))
+            except SaleOrderImportRowError as exc:
+                errors.append((order, str(exc)))
+
+        created = self.env['sale.order']
+        try:
+            with self.env.cr.savepoint():
+                created = self._create_orders([vals for _order, vals in vals_by_order])
+        except Exception:
+            # Isolate the offending orders; the others are still imported.
+            for order, vals in vals_by_order:
+                try:
+                    with self.env.cr.savepoint():
+                        created |= self._create_orders([vals])
+                except Exception as exc:
+                    errors.append((order, str(exc)))
+
+        self.env['sale.order.import.error'].create([
+            {
+                'job_id': self.id,
+                'row_number': order['row_number'],
+                'order_ref': order['order_ref'],
+                'message': message,
+            }
+            for order, message in errors
+        ])
+        self.write({
+            'last_row': chunk[-1]['last_row'],
+            'order_count': self.order_count + len(created),
+            'error_count': self.error_count + len(errors),
+            'heartbeat': fields.Datetime.now(),
+        })
+        self._commit()
+
+    def _create_orders(self, vals_list):
+        """Create orders with per-order hooks deferred, then run them once for the batch."""
+        if not vals_list:
+            return self.env['sale.order']
+        orders = self.env['sale.order'].with_context(
+            defer_sale_payment_term_generation=True,
+            skip_auto_generate_sale_payment_term=True,
+            skip_recompute_price_from_installments=True,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_notrack=True,
+        ).create(vals_list)
+        orders = orders.with_context(self.env.context)
+        # One batched call for the chunk: terms, line terms and installment previews.
+        orders.with_context(skip_auto_generate_sale_payment_term=True).generate_order_payment_term()
+
+        # Expression rules reading installment previews can only be priced now.
+        repriced = self.env['sale.order']
+        for pricelist, pricelist_orders in orders.grouped('pricelist_id').items():
+            models_used = {model_name for model_name, _field in pricelist._get_configured_expression_fields()}
+            if 'sale.order.installment' in models_used:
+                repriced |= pricelist_orders
+        if repriced:
+            totals = {order.id: order.amount_total for order in repriced}
+            lines = repriced.order_line.filtered(lambda line: line.product_id and not line.display_type)
+            lines.with_context(skip_auto_generate_sale_payment_term=True)._recompute_price_from_installments()
+            # Only orders whose total moved need their previews again.
+            changed = repriced.filtered(
+                lambda order: order.currency_id.compare_amounts(order.amount_total, totals[order.id]) != 0
+            )
+            changed._regenerate_installment_preview()
+        return orders
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _iter_rows(self):
+        """Yield (row number, {column: value}) for the data rows, streamed from the file."""
+        self.ensure_one()
+        data = base64.b64decode(self.import_file or b'')
+        if (self.import_filename or '').lower().endswith(('.xlsx', '.xlsm')):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise UserError(_("The 'openpyxl' library is required to read Excel files."))
+            workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+        else:
+            text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig', newline='')
+            sample = text.read(4096)
+            text.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            rows = csv.reader(text, dialect)
+
+        header = next(rows, None)
+        if not header:
+            raise UserError(_("The file is empty."))
+        columns = self._map_columns(header)
+        for row_number, row in enumerate(rows, start=2):
+            if not row or all(value in (None, '') for value in row):
+                continue
+            yield row_number, {
+                name: row[index] if index < len(row) else None
+                for name, index in columns.items()
+            }
+
+    def _map_columns(self, header):
+        labels = [str(label or '').strip().lower() for label in header]
+        columns = {}
+        for name, spellings in IMPORT_COLUMNS.items():
+            for spelling in spellings:
+                if spelling in labels:
+                    columns[name] = labels.index(spelling)
+                    break
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise UserError(_("Missing required columns: %s", ", ".join(missing)))
+        return columns
+
+    def _iter_orders(self):
+        """
+        Group consecutive rows by order reference.
+
+        Yields:
+            dict: {'order_ref', 'row_number', 'last_row', 'header', 'lines'}
+                  for the orders after `last_row`; rows before it are only
+                  scanned so non-contiguous references are still detected.
+        """
+        seen = set()
+        current = None
+        for row_number, values in self._iter_rows():
+            ref = self._to_text(values.get('order_ref'))
+            if current and ref == current['order_ref']:
+                current['lines'].append((row_number, values))
+                current['last_row'] = row_number
+                continue
+            if current and current['row_number'] > self.last_row:
+                yield current
+            if ref in seen:
+                current = {
+                    'order_ref': ref,
+                    'row_number': row_number,
+                    'last_row': row_number,
+                    'header': values,
+                    'lines': [],
+                    'error': _("Rows of order %s are not contiguous.", ref),
+                }
+                continue
+            seen.add(ref)
+            current = {
+                'order_ref': ref,
+                'row_number': row_number,
+                'last_row': row_number,
+                'header': values,
+                'lines': [(row_number, values)],
+            }
+        if current and current['row_number'] > self.last_row:
+            yield current
+
+    # ------------------------------------------------------------------
+    # Lookups and validation
+    # ------------------------------------------------------------------
+    def _prefetch_lookups(self, chunk, lookups):
+        """Resolve every partner, product, type and pricelist key of the chunk with one search per model."""
+        keys = {'partner': set(), 'product': set(), 'order_type': set(), 'pricelist': set()}
+        for order in chunk:
+            for name in ('partner', 'order_type', 'pricelist'):
+                value = self._to_text(order['header'].get(name))
+                if value:
+                    keys[name].add(value)
+            for _row_number, values in order['lines']:
+                value = self._to_text(values.get('product'))
+                if value:
+                    keys['product'].add(value)
+        company_domain = [('company_id', 'in', [False, self.company_id.id])]
+        self._lookup(lookups, 'partner', 'res.partner', keys['partner'], ('ref', 'vat', 'name'), company_domain)
+        self._lookup(
+            lookups, 'product', 'product.product', keys['product'], ('default_code', 'barcode', 'name'),
+            expression.AND([company_domain, [('sale_ok', '=', True)]]),
+        )
+        self._lookup(lookups, 'order_type', 'sale.order.type', keys['order_type'], ('name',), company_domain)
+        self._lookup(lookups, 'pricelist', 'product.pricelist', keys['pricelist'], ('name',), company_domain)
+
+    def _lookup(self, lookups, kind, model_name, keys, match_fields, domain):
+        """
+        Fill lookups[kind] with key -> record id (False when ambiguous) for
+        the keys not resolved yet; earlier match fields take precedence.
+        """
+        cache = lookups.setdefault(kind, {})
+        missing = sorted(key for key in keys if key not in cache)
+        if not missing:
+            return
+        records = self.env[model_name].search_fetch(
+            expression.AND([
+                domain,
+                expression.OR([[(field_name, 'in', missing)] for field_name in match_fields]),
+            ]),
+            list(match_fields),
+        )
+        index = {field_name: defaultdict(list) for field_name in match_fields}
+        for record in records:
+            for field_name in match_fields:
+                if record[field_name]:
+                    index[field_name][record[field_name]].append(record.id)
+        for key in missing:
+            cache[key] = None
+            for field_name in match_fields:
+                record_ids = index[field_name].get(key)
+                if record_ids:
+                    cache[key] = record_ids[0] if len(record_ids) == 1 else False
+                    break
+
+    def _resolve(self, lookups, kind, value, label):
+        key = self._to_text(value)
+        record_id = lookups.get(kind, {}).get(key)
+        if record_id is None:
+            raise SaleOrderImportRowError(_("%(label)s '%(key)s' not found.", label=label, key=key))
+        if record_id is False:
+            raise SaleOrderImportRowError(_("%(label)s '%(key)s' matches several records.", label=label, key=key))
+        return record_id
+
+    def _prepare_order_vals(self, order, lookups):
+        """sale.order create values of a grouped order; raises SaleOrderImportRowError."""
+        if order.get('error'):
+            raise SaleOrderImportRowError(order['error'])
+        if not order['order_ref']:
+            raise SaleOrderImportRowError(_("Missing order reference."))
+        header = order['header']
+        vals = {
+            'partner_id': self._resolve(lookups, 'partner', header.get('partner'), _("Customer")),
+            'origin': f"{self._get_origin_prefix()}{order['order_ref']}",
+        }
+        if self._to_text(header.get('customer_ref')):
+            vals['client_order_ref'] = self._to_text(header.get('customer_ref'))
+        sale_order_type = self.env['sale.order.type']
+        if self._to_text(header.get('order_type')):
+            sale_order_type = sale_order_type.browse(
+                self._resolve(lookups, 'order_type', header.get('order_type'), _("Order type"))
+            )
+            vals['sale_order_type_id'] = sale_order_type.id
+        if self._to_text(header.get('pricelist')):
+            vals['pricelist_id'] = self._resolve(lookups, 'pricelist', header.get('pricelist'), _("Pricelist"))
+        if header.get('date_order') not in (None, ''):
+            vals['date_order'] = self._to_datetime(header.get('date_order'))
+        for column, field_name, allowed in (
+            ('payment_type', 'payment_type', PAYMENT_TYPES),
+            ('scope', 'scope', SCOPES),
+            ('first_payment_type', 'first_payment_type', FIRST_PAYMENT_TYPES),
+        ):
+            value = self._to_text(header.get(column))
+            if value:
+                if value not in allowed:
+                    raise SaleOrderImportRowError(_(
+                        "Invalid %(column)s '%(value)s' (expected one of: %(allowed)s).",
+                        column=column, value=value, allowed=", ".join(allowed),
+                    ))
+                vals[field_name] = value
+        if header.get('installment_count') not in (None, ''):
+            vals['installment_count'] = int(self._to_float(header.get('installment_count'), 'installment_count'))
+        if header.get('first_payment') not in (None, ''):
+            vals['first_payment_percentage'] = self._to_float(header.get('first_payment'), 'first_payment')
+
+        Product = self.env['product.product']
+        lines = []
+        for row_number, values in order['lines']:
+            try:
+                product = Product.browse(self._resolve(lookups, 'product', values.get('product'), _("Product")))
+                if sale_order_type:
+                    if sale_order_type.product_type and product.type != sale_order_type.product_type:
+                        raise SaleOrderImportRowError(_(
+                            "Product '%(product)s' is not of the order type's product type (%(type)s).",
+                            product=product.display_name, type=sale_order_type.product_type,
+                        ))
+                    if not sale_order_type._is_category_allowed(product.categ_id):
+                        raise SaleOrderImportRowError(_(
+                            "Product '%s' is not in an allowed category for the order type.", product.display_name,
+                        ))
+                quantity = self._to_float(values.get('quantity'), 'quantity')
+                if quantity <= 0:
+                    raise SaleOrderImportRowError(_("Quantity must be positive."))
+                line_vals = {'product_id': product.id, 'product_uom_qty': quantity}
+                if self._to_text(values.get('description')):
+                    line_vals['name'] = self._to_text(values.get('description'))
+                if values.get('price_unit') not in (None, ''):
+                    line_vals['price_unit'] = self._to_float(values.get('price_unit'), 'price_unit')
+                if values.get('discount') not in (None, ''):
+                    line_vals['discount'] = self._to_float(values.get('discount'), 'discount')
+                if values.get('line_installment_count') not in (None, ''):
+                    line_vals['line_installment_count'] = int(
+                        self._to_float(values.get('line_installment_count'), 'line_installment_count')
+                    )
+                line_first_payment_type = self._to_text(values.get('line_first_payment_type'))
+                if line_first_payment_type:
+                    if line_first_payment_type not in FIRST_PAYMENT_TYPES:
+                        raise SaleOrderImportRowError(_(
+                            "Invalid line_first_payment_type '%s'.", line_first_payment_type,
+                        ))
+                    line_vals['line_first_payment_type'] = line_first_payment_type
+                if values.get('line_first_payment') not in (None, ''):
+                    line_vals['line_first_payment_percentage'] = self._to_float(
+                        values.get('line_first_payment'), 'line_first_payment'
+                    )
+            except SaleOrderImportRowError as exc:
+                raise SaleOrderImportRowError(_("Row %(row)s: %(error)s", row=row_number, error=exc))
+            lines.append(Command.create(line_vals))
+        vals['order_line'] = lines
+        return vals
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _get_origin_prefix(self):
+        self.ensure_one()
+        return f"IMP{self.id}/"
+
+    @api.model
+    def _to_text(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @api.model
+    def _to_float(self, value, column):
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            return float(str(value).strip().replace(',', '.'))
+        except ValueError:
+            raise SaleOrderImportRowError(_("Invalid number '%(value)s' in %(column)s.", value=value, column=column))
+
+    @api.model
+    def _to_datetime(self, value):
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, date):
+            return datetime.combine(value, datetime.min.time())
+        try:
+            return fields.Datetime.to_datetime(self._to_text(value))
+        except ValueError:
+            raise SaleOrderImportRowError(_("Invalid date '%s'.", value))
+
+    def _commit(self):
+        # Chunks are the unit of progress; tests run inside one transaction.
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+
+    def _rollback(self):
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.rollback()
@@ -1,5 +1,4 @@
 from odoo import api, models
-from odoo.osv import expression
 
 
 class ProductTemplate(models.Model):
@@ -10,36 +9,26 @@ class ProductTemplate(models.Model):
         classification = self.env.context.get("restrict_order_classification")
         if classification:
             return classification
-        sot = self._resolve_sale_order_type_from_context()
-        if sot:
-            return sot.order_classification
+        sot_id = self._sale_order_type_id_from_context()
+        if sot_id:
+            return self.env["sale.order.type"]._get_product_restriction(sot_id)[2]
         return False
 
     @api.model
-    def _search(self, domain, *args, **kwargs):
-        domain = list(domain or [])
-        if (
-            not self.env.context.get("skip_sale_order_product_type_search")
-            and not self._domain_targets_explicit_ids(domain)
-            and self._in_sale_order_product_context()
-            and self._subscription_classification_from_context() == "subscription"
-        ):
-            domain = expression.AND([domain, [("is_recurring", "=", True)]])
-        return super()._search(domain, *args, **kwargs)
-
-
-class ProductProduct(models.Model):
-    _inherit = "product.product"
+    def _sale_order_product_restriction_key(self):
+        key = super()._sale_order_product_restriction_key()
+        if not key:
+            return key
+        classification = self.env.context.get("restrict_order_classification") or False
+        return tuple(sorted(key + (("classification", classification),)))
 
     @api.model
-    def _search(self, domain, *args, **kwargs):
-        domain = list(domain or [])
-        Template = self.env["product.template"]
-        if (
-            not self.env.context.get("skip_sale_order_product_type_search")
-            and not Template._domain_targets_explicit_ids(domain)
-            and Template._in_sale_order_product_context()
-            and Template._subscription_classification_from_context() == "subscription"
-        ):
-            domain = expression.AND([domain, [("is_recurring", "=", True)]])
-        return super()._search(domain, *args, **kwargs)
+    def _sale_order_product_domain_parts(self, restriction):
+        # is_recurring exists on both product.template and product.product.
+        parts = super()._sale_order_product_domain_parts(restriction)
+        classification = restriction.get("classification")
+        if not classification and restriction["type_id"]:
+            classification = self.env["sale.order.type"]._get_product_restriction(restriction["type_id"])[2]
+        if classification == "subscription":
+            parts.append([("is_recurring", "=", True)])
+        return parts